@@ -0,0 +1,220 @@
+"""
+Local JSON HTTP API over a shared, warm UnifiedSearchManager.
+
+One process keeps the manager (worker pool, keep-alive connection pools, result cache
+and local library) alive and serves every request from it, so concurrent callers
+share connections and cache entries instead of paying the setup cost each time.
+Identical searches arriving while one is already running wait for that one instead
+of fanning out again.
+
+Endpoints:
+    GET  /health                   {"status": "ok", "sources": [...], "stats": {...}}
+    GET  /search?term=...&sources=PubMed,OpenAlex&limit=5&start_year=2015&only_free=1&mode=local_first
+    POST /search                   same fields as a JSON object ("sources" as a list)
+
+since (optional) is a YYYY-MM-DD date; in a POST body it can also be a {source: date}
+object.
+
+/search answers {"results": [...], "meta": {...}, "stats": {...}}. Bad input is a
+400 and a failed search a 500, both as {"error": "..."}.
+"""
+import concurrent.futures
+import datetime
+import http.server
+import json
+import threading
+from urllib.parse import parse_qsl, urlsplit
+from records import json_default
+from unified_client import SOURCE_NAMES, UnifiedSearchManager
+
+SEARCH_FIELDS = ("term", "sources", "limit", "start_year", "only_free", "mode", "since", "deadline")
+# Largest request body accepted (bytes)
+MAX_BODY = 64 * 1024
+
+
+class BadRequest(ValueError):
+    pass
+
+
+def _check_date(value, field):
+    try:
+        datetime.datetime.strptime(value, "%Y-%m-%d")
+    except (TypeError, ValueError):
+        raise BadRequest(f"{field} must be a YYYY-MM-DD date") from None
+    return value
+
+
+def parse_since(since):
+    """since is one YYYY-MM-DD date for every source or a {source: date} object."""
+    if since in (None, ""):
+        return None
+    if isinstance(since, dict):
+        bad = [s for s in since if s not in SOURCE_NAMES]
+        if bad:
+            raise BadRequest(f"unknown sources in since: {', '.join(bad)}")
+        return {name: _check_date(date, f"since[{name}]") for name, date in since.items()}
+    return _check_date(since, "since")
+
+
+def parse_search(params):
+    """Validate /search parameters (query string or JSON) into search_all keyword arguments."""
+    unknown = set(params) - set(SEARCH_FIELDS)
+    if unknown:
+        raise BadRequest(f"unknown fields: {', '.join(sorted(unknown))}")
+    term = str(params.get("term") or "").strip()
+    if not term:
+        raise BadRequest("term is required")
+    sources = params.get("sources")
+    if isinstance(sources, str):
+        sources = [s.strip() for s in sources.split(",") if s.strip()]
+    if sources is not None:
+        bad = [s for s in sources if s not in SOURCE_NAMES]
+        if bad:
+            raise BadRequest(f"unknown sources: {', '.join(bad)}")
+    try:
+        limit = int(params.get("limit", 5))
+        start_year = int(params["start_year"]) if params.get("start_year") not in (None, "") else None
+        deadline = float(params["deadline"]) if params.get("deadline") not in (None, "") else None
+    except (TypeError, ValueError) as e:
+        raise BadRequest(f"invalid number: {e}") from None
+    if not 1 <= limit <= 1000:
+        raise BadRequest("limit must be between 1 and 1000")
+    mode = params.get("mode") or None
+    if mode is not None and mode not in UnifiedSearchManager.MODES:
+        raise BadRequest(f"mode must be one of {', '.join(UnifiedSearchManager.MODES)}")
+    only_free = params.get("only_free", False)
+    if isinstance(only_free, str):
+        only_free = only_free.lower() in ("1", "true", "yes")
+    return {"term": term, "active_sources": sources, "limit_per_source": limit, "start_year": start_year,
+            "only_free": bool(only_free), "mode": mode, "since": parse_since(params.get("since")),
+            "deadline": deadline}
+
+
+class SearchApiServer:
+    """Threaded local HTTP server answering search requests from one shared manager."""
+
+    def __init__(self, manager, host="127.0.0.1", port=8080, warm=True):
+        self.manager = manager
+        self.warm = warm
+        self.stats = {"requests": 0, "searches": 0, "coalesced": 0, "errors": 0}
+        self._lock = threading.Lock()
+        self._inflight = {}
+        self._httpd = http.server.ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def search(self, kwargs):
+        """Run search_all, sharing the result with identical requests already in flight."""
+        key = json.dumps(kwargs, sort_keys=True)
+        with self._lock:
+            future = self._inflight.get(key)
+            owner = future is None
+            if owner:
+                future = self._inflight[key] = concurrent.futures.Future()
+                self.stats["searches"] += 1
+            else:
+                self.stats["coalesced"] += 1
+        if not owner:
+            return future.result()
+        try:
+            results = self.manager.search_all(**kwargs)
+            payload = json.dumps({"results": results, "meta": results.meta,
+                                  "stats": results.stats.to_dict() if results.stats else None},
+                                 default=json_default)
+            future.set_result(payload)
+            return payload
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _error(self, status, message):
+                with server._lock:
+                    server.stats["errors"] += 1
+                self._reply(status, json.dumps({"error": message}))
+
+            def _route(self, params):
+                with server._lock:
+                    server.stats["requests"] += 1
+                path = urlsplit(self.path).path.rstrip("/")
+                if path == "/health":
+                    with server._lock:
+                        stats = dict(server.stats)
+                    return self._reply(200, json.dumps({"status": "ok", "sources": list(SOURCE_NAMES), "stats": stats}))
+                if path != "/search":
+                    return self._error(404, f"no such endpoint: {path or '/'}")
+                try:
+                    kwargs = parse_search(params)
+                except BadRequest as e:
+                    return self._error(400, str(e))
+                try:
+                    self._reply(200, server.search(kwargs))
+                except Exception as e:
+                    print(f"API Search Error: {e}")
+                    self._error(500, str(e) or type(e).__name__)
+
+            def do_GET(self):
+                self._route(dict(parse_qsl(urlsplit(self.path).query)))
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                if length > MAX_BODY:
+                    # The unread body would be parsed as the next request
+                    self.close_connection = True
+                    return self._error(413, "request body too large")
+                try:
+                    params = json.loads(self.rfile.read(length) or b"{}")
+                except ValueError:
+                    return self._error(400, "body is not valid JSON")
+                if not isinstance(params, dict):
+                    return self._error(400, "body must be a JSON object")
+                self._route(params)
+
+        return Handler
+
+    def start(self):
+        if self.warm:
+            # Import the HTTP stack and build every client before the first request
+            self.manager.warm_up()
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="api-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def serve_forever(self):
+        if self.warm:
+            self.manager.warm_up()
+        self._httpd.serve_forever()
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
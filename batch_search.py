@@ -0,0 +1,180 @@
+"""
+Batch query mode: run many search terms against the selected sources.
+
+Every (term, source) pair is one task on a single shared worker pool. Concurrency is
+bounded globally (--workers) and per source (--per-source), on top of the per-host
+rate limits applied by the shared HTTP session. Records are appended to a JSON Lines
+file as each task finishes and completed tasks are logged to a checkpoint file, so
+re-running the same command after a crash resumes where it stopped.
+
+Usage:
+    python batch_search.py terms.txt -o results.jsonl --sources PubMed "Europe PMC" --limit 20
+"""
+import argparse
+import concurrent.futures
+import csv
+import json
+import os
+import sys
+import threading
+import time
+from unified_client import UnifiedSearchManager, get_current_year
+from search_cache import SQLiteCache
+from exporters import JsonlWriter, export_parquet, load_records
+
+
+def read_terms(path):
+    """Read search terms from a .txt (one per line, # comments) or .csv (a 'term' column, else the first column)."""
+    terms = []
+    with open(path, newline='', encoding='utf-8-sig') as f:
+        if path.lower().endswith(".csv"):
+            rows = list(csv.reader(f))
+            if not rows:
+                return []
+            header = [h.strip().lower() for h in rows[0]]
+            if "term" in header:
+                col = header.index("term")
+                rows = rows[1:]
+            else:
+                col = 0
+            terms = [row[col] for row in rows if len(row) > col]
+        else:
+            terms = [line for line in f if not line.lstrip().startswith("#")]
+    # Strip, drop blanks and repeated terms while keeping file order
+    return list(dict.fromkeys(t.strip() for t in terms if t.strip()))
+
+
+def task_key(term, source):
+    return json.dumps([term, source], ensure_ascii=False)
+
+
+class BatchRunner:
+    """Runs (term x source) tasks with bounded concurrency, checkpointing and streamed output."""
+
+    def __init__(self, manager, output_path, checkpoint_path=None, sources=None, limit_per_source=5,
+                 start_year=None, only_free=False, max_workers=8, per_source=2):
+        self.manager = manager
+        self.output_path = output_path
+        self.checkpoint_path = checkpoint_path or output_path + ".checkpoint"
+        self.sources = list(sources or manager.clients.keys())
+        self.limit_per_source = limit_per_source
+        self.start_year = start_year if start_year is not None else get_current_year() - 10
+        self.only_free = only_free
+        self.max_workers = max_workers
+        self.source_slots = {name: threading.Semaphore(per_source) for name in self.sources}
+        self.stats = {"done": 0, "failed": 0, "skipped_done": 0, "records": 0}
+        self._write_lock = threading.Lock()
+
+    def load_checkpoint(self):
+        if not os.path.exists(self.checkpoint_path):
+            return set()
+        with open(self.checkpoint_path, encoding='utf-8') as f:
+            return {line.rstrip("\n") for line in f if line.strip()}
+
+    def _run_task(self, term, source):
+        with self.source_slots[source]:
+            data = self.manager.search_source(source, term, self.start_year, self.limit_per_source, self.only_free)
+        self.manager.rank_results(data, term)
+        for item in data:
+            item['query'] = term
+            item['year'] = self.manager._extract_year(item.get('year'))
+        return data
+
+    def _write(self, out, checkpoint, term, source, data):
+        # Records first, then the checkpoint line: a crash in between re-runs the task
+        # on resume (at-least-once), it never loses records
+        with self._write_lock:
+            out.write_many(data)
+            out.flush()
+            checkpoint.write(task_key(term, source) + "\n")
+            checkpoint.flush()
+            self.stats["done"] += 1
+            self.stats["records"] += len(data)
+
+    def run(self, terms, progress=None):
+        completed = self.load_checkpoint()
+        tasks = []
+        for term in terms:
+            for source in self.sources:
+                if task_key(term, source) in completed:
+                    self.stats["skipped_done"] += 1
+                else:
+                    tasks.append((term, source))
+
+        total = len(tasks)
+        with JsonlWriter(self.output_path, append=True) as out, \
+                open(self.checkpoint_path, 'a', encoding='utf-8') as checkpoint, \
+                concurrent.futures.ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="batch") as executor:
+            # Keep a bounded window of submitted tasks so huge term lists do not queue up in memory
+            window = self.max_workers * 2
+            task_iter = iter(tasks)
+            in_flight = {}
+            finished = 0
+
+            def submit_next():
+                task = next(task_iter, None)
+                if task is not None:
+                    in_flight[executor.submit(self._run_task, *task)] = task
+
+            for _ in range(window):
+                submit_next()
+
+            while in_flight:
+                done, _ = concurrent.futures.wait(in_flight, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    term, source = in_flight.pop(future)
+                    finished += 1
+                    try:
+                        self._write(out, checkpoint, term, source, future.result())
+                    except Exception as e:
+                        # Failed tasks are not checkpointed, so the next run retries them
+                        self.stats["failed"] += 1
+                        print(f"Batch Error [{source}] '{term}': {e}")
+                    if progress:
+                        progress(finished, total, self.stats)
+                    submit_next()
+        return self.stats
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Run many search terms against the scientific sources.")
+    parser.add_argument("terms_file", help="Text file (one term per line) or CSV with a 'term' column")
+    parser.add_argument("-o", "--output", default="batch_results.jsonl", help="JSON Lines output file (appended)")
+    parser.add_argument("--checkpoint", help="Checkpoint file (default: <output>.checkpoint)")
+    parser.add_argument("--sources", nargs="+", help="Sources to query (default: all)")
+    parser.add_argument("--limit", type=int, default=5, help="Results per source per term")
+    parser.add_argument("--start-year", type=int, help="Earliest publication year (default: 10 years back)")
+    parser.add_argument("--free-only", action="store_true", help="Only free full text")
+    parser.add_argument("--workers", type=int, default=8, help="Total concurrent tasks")
+    parser.add_argument("--per-source", type=int, default=2, help="Concurrent tasks per source")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk result cache")
+    parser.add_argument("--api-key", help="NCBI API key for PubMed (default: $NCBI_API_KEY)")
+    parser.add_argument("--parquet", help="Also write the whole output file as typed Parquet (needs pyarrow)")
+    args = parser.parse_args(argv)
+
+    terms = read_terms(args.terms_file)
+    manager = UnifiedSearchManager(cache=None if args.no_cache else SQLiteCache(), api_key=args.api_key)
+    unknown = [s for s in (args.sources or []) if s not in manager.clients]
+    if unknown:
+        parser.error(f"unknown sources: {', '.join(unknown)} (choose from {', '.join(manager.clients)})")
+
+    runner = BatchRunner(manager, args.output, args.checkpoint, args.sources, args.limit,
+                         args.start_year, args.free_only, args.workers, args.per_source)
+    started = time.monotonic()
+
+    def progress(finished, total, stats):
+        print(f"\r[{finished}/{total}] records: {stats['records']} failed: {stats['failed']}", end="", file=sys.stderr)
+
+    stats = runner.run(terms, progress)
+    print(file=sys.stderr)
+    print(f"Done in {time.monotonic() - started:.1f}s: {stats['done']} tasks, {stats['records']} records, "
+          f"{stats['failed']} failed, {stats['skipped_done']} already done -> {args.output}")
+    if args.parquet:
+        # Streamed record by record from the JSONL file, so the output never has to fit in memory
+        count = export_parquet(load_records(args.output), args.parquet)
+        print(f"Wrote {count} records -> {args.parquet}")
+    return 1 if stats["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Compare OpenAlex abstract reconstruction: sorted (pos, word) tuples vs. the
+preallocated list used by reconstruct_abstract.
+
+Usage:
+    python benchmarks/bench_abstracts.py [--works 2000] [--words 250]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from unified_client import reconstruct_abstract
+
+
+def legacy_reconstruct(abs_idx):
+    """The previous implementation (tuple list + full sort)."""
+    word_list = sorted([(pos, w) for w, positions in abs_idx.items() for pos in positions])
+    return " ".join([w[1] for w in word_list])
+
+
+def synthetic_index(words, rng):
+    vocab = [f"w{i}" for i in range(words // 2)]
+    index = {}
+    for pos in range(words):
+        index.setdefault(rng.choice(vocab), []).append(pos)
+    return index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--works", type=int, default=2000)
+    parser.add_argument("--words", type=int, default=250, help="Words per abstract")
+    args = parser.parse_args()
+
+    rng = random.Random(3)
+    indexes = [synthetic_index(args.words, rng) for _ in range(args.works)]
+    assert all(legacy_reconstruct(i) == reconstruct_abstract(i) for i in indexes[:50])
+
+    for label, func in (("sorted", legacy_reconstruct), ("prealloc", reconstruct_abstract)):
+        started = time.perf_counter()
+        for index in indexes:
+            func(index)
+        elapsed = time.perf_counter() - started
+        print(f"{label:<9} {elapsed * 1000:8.1f} ms for {args.works} abstracts of {args.words} words")
+
+
+if __name__ == "__main__":
+    main()
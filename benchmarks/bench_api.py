@@ -0,0 +1,108 @@
+"""
+Load test of the local JSON search API (api_server.py / `python cli.py serve`).
+
+By default starts a replay server with synthetic fixtures (--latency/--jitter/--error-rate)
+and an in-process API server whose shared manager talks to it, then sends --requests
+POST /search calls from --concurrency keep-alive client threads, cycling through
+--unique-terms distinct terms. Reports p50/p95/p99 latency, requests/s and errors, plus
+how many searches the server actually ran versus coalesced or answered from cache.
+Pass --url to load-test an API server that is already running instead.
+
+Usage:
+    python benchmarks/bench_api.py [--requests 200] [--concurrency 16] [--unique-terms 10]
+        [--latency 0.05] [--jitter 0.02] [--error-rate 0.0] [--limit 10] [--cache] [--url URL]
+"""
+import argparse
+import concurrent.futures
+import http.client
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from api_server import SearchApiServer
+from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+from search_cache import MemoryCache
+from unified_client import UnifiedSearchManager
+
+
+def load(url, requests, concurrency, unique_terms, limit):
+    parts = urlsplit(url)
+    local = threading.local()
+
+    def one(i):
+        conn = getattr(local, "conn", None)
+        if conn is None:
+            conn = local.conn = http.client.HTTPConnection(parts.hostname, parts.port, timeout=60)
+        body = json.dumps({"term": f"bacterial growth {i % unique_terms}", "limit": limit})
+        started = time.perf_counter()
+        try:
+            conn.request("POST", "/search", body, {"Content-Type": "application/json"})
+            response = conn.getresponse()
+            data = response.read()
+        except (OSError, http.client.HTTPException):
+            local.conn = None
+            return time.perf_counter() - started, False, 0
+        ok = response.status == 200
+        count = len(json.loads(data)["results"]) if ok else 0
+        return time.perf_counter() - started, ok, count
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(requests)))
+    wall = time.perf_counter() - started
+    latencies = sorted(o[0] for o in outcomes)
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive") if len(latencies) > 1 else latencies * 99
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": cuts[94] * 1000,
+        "p99": cuts[98] * 1000,
+        "throughput": requests / wall,
+        "errors": sum(1 for o in outcomes if not o[1]),
+        "results": statistics.mean(o[2] for o in outcomes),
+    }
+
+
+def report(stats, requests, concurrency):
+    print(f"{requests} requests x {concurrency} clients: p50 {stats['p50']:.1f} ms, p95 {stats['p95']:.1f} ms, "
+          f"p99 {stats['p99']:.1f} ms, {stats['throughput']:.1f} req/s, {stats['errors']} errors, "
+          f"{stats['results']:.1f} results/response")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--unique-terms", type=int, default=10)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--limit", type=int, default=10)
+    parser.add_argument("--cache", action="store_true", help="Give the in-process server a memory result cache")
+    parser.add_argument("--url", help="Load-test a running API server instead of starting one")
+    args = parser.parse_args()
+
+    if args.url:
+        report(load(args.url, args.requests, args.concurrency, args.unique_terms, args.limit), args.requests, args.concurrency)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = write_synthetic_fixtures(tmp, records=args.limit)
+        with ReplayServer(fixtures, args.latency, args.jitter, args.error_rate, seed=1) as replay:
+            manager = UnifiedSearchManager(cache=MemoryCache() if args.cache else None, session=ReplaySession(replay.url))
+            with SearchApiServer(manager, port=0) as api:
+                print(f"replay latency {args.latency * 1000:.0f}ms +/- {args.jitter * 1000:.0f}ms, "
+                      f"error rate {args.error_rate:.0%}, {args.unique_terms} distinct terms, cache {'on' if args.cache else 'off'}")
+                report(load(api.url, args.requests, args.concurrency, args.unique_terms, args.limit), args.requests, args.concurrency)
+                print(f"api server: {api.stats}")
+            manager.close()
+            print(f"replay server: {replay.stats}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+"""
+Compare the streaming iterparse PubMed parser with the previous whole-document parser.
+
+Generates a synthetic efetch payload (default 10,000 articles) and reports wall time
+and peak traced memory for each parser.
+
+Usage:
+    python benchmarks/bench_pubmed_parser.py [--articles 10000]
+"""
+import argparse
+import io
+import os
+import sys
+import time
+import tracemalloc
+import xml.etree.ElementTree as ET
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ncbi_client import iter_parse_articles
+
+
+ARTICLE = (
+    "<PubmedArticle><MedlineCitation Status=\"MEDLINE\"><PMID Version=\"1\">{pmid}</PMID>"
+    "<Article><Journal><JournalIssue><Volume>12</Volume><PubDate><Year>2021</Year><Month>Mar</Month></PubDate>"
+    "</JournalIssue><Title>Journal of Synthetic Biology</Title></Journal>"
+    "<ArticleTitle>Synthetic article {pmid} on CRISPR screening in <i>E. coli</i></ArticleTitle>"
+    "<Abstract><AbstractText Label=\"BACKGROUND\">{text}</AbstractText><AbstractText Label=\"RESULTS\">{text}</AbstractText></Abstract>"
+    "<AuthorList>{authors}</AuthorList></Article>"
+    "<MeshHeadingList><MeshHeading><DescriptorName>Gene Editing</DescriptorName></MeshHeading></MeshHeadingList>"
+    "</MedlineCitation><PubmedData><ArticleIdList><ArticleId IdType=\"pubmed\">{pmid}</ArticleId>"
+    "<ArticleId IdType=\"doi\">10.1000/synth.{pmid}</ArticleId></ArticleIdList></PubmedData></PubmedArticle>"
+)
+
+
+def build_payload(count):
+    text = "Genome-wide screens identify regulators of stress tolerance. " * 8
+    authors = "".join(f"<Author><LastName>Author{i}</LastName><Initials>A</Initials></Author>" for i in range(6))
+    body = "".join(ARTICLE.format(pmid=30000000 + i, text=text, authors=authors) for i in range(count))
+    return f"<?xml version=\"1.0\"?><PubmedArticleSet>{body}</PubmedArticleSet>".encode("utf-8")
+
+
+def legacy_parse(content):
+    """The pre-streaming parser: whole-document fromstring plus descendant searches."""
+    root = ET.fromstring(content)
+    results = []
+    for article in root.findall(".//PubmedArticle"):
+        title = article.findtext(".//ArticleTitle") or "No Title"
+        journal = article.findtext(".//Journal/Title") or "Unknown Journal"
+        pmid = article.findtext(".//MedlineCitation/PMID")
+        year = article.findtext(".//Journal/JournalIssue/PubDate/Year")
+        if not year:
+            year = article.findtext(".//PubDate/MedlineDate")
+        abstract_texts = article.findall(".//AbstractText")
+        full_abstract = " ".join(["".join(t.itertext()) for t in abstract_texts])
+        authors = []
+        for author in article.findall(".//Author"):
+            last = author.findtext("LastName")
+            initials = author.findtext("Initials")
+            if last and initials:
+                authors.append(f"{last} {initials}")
+        results.append({"pmid": pmid, "title": title, "journal": journal, "year": year,
+                        "authors": ", ".join(authors), "abstract": full_abstract})
+    return results
+
+
+def measure(label, func):
+    # Time without tracing (tracemalloc slows allocation-heavy code), then trace memory separately
+    start = time.perf_counter()
+    count = func()
+    elapsed = time.perf_counter() - start
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<28} {count:>7} records  {elapsed:7.2f} s  peak {peak / 1e6:8.1f} MB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--articles", type=int, default=10000)
+    args = parser.parse_args()
+
+    payload = build_payload(args.articles)
+    print(f"Payload: {args.articles} articles, {len(payload) / 1e6:.1f} MB")
+    # The legacy parser keeps every parsed dict in a list; the streaming one is consumed as a generator
+    measure("legacy fromstring + .//", lambda: len(legacy_parse(payload)))
+    measure("streaming iterparse", lambda: sum(1 for _ in iter_parse_articles(io.BytesIO(payload))))
+
+
+if __name__ == "__main__":
+    main()
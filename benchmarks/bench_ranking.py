@@ -0,0 +1,79 @@
+"""
+Compare BM25Ranker with the previous per-paper substring scoring.
+
+Usage:
+    python benchmarks/bench_ranking.py [--docs 20000] [--query "gene expression in yeast"]
+"""
+import argparse
+import os
+import random
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from ranking import BM25Ranker
+
+TOPIC_WORDS = ("gene expression yeast regulation protein cell stress response general genome analysis "
+               "transcription factor pathway mutation cancer tumor immune signaling metabolism model").split()
+# Realistic abstracts draw from a large vocabulary; filler words stand in for the long tail
+VOCAB = TOPIC_WORDS + [f"term{i}" for i in range(3000)]
+
+
+def legacy_score(paper, query):
+    """The scoring loop used before BM25 (one lowercase + substring test per term and paper)."""
+    score = 0
+    if not query: return 0
+    query_terms = query.lower().split()
+    title_lower = (paper.get('title') or '').lower()
+    abstract_lower = (paper.get('abstract') or '').lower()
+    for term in query_terms:
+        if term in title_lower:
+            score += 100
+        elif term in abstract_lower:
+            score += 10
+    source = paper.get('source', '')
+    if source == "PubMed":
+        score += 5000
+    elif source == "Europe PMC":
+        score += 2000
+    return score
+
+
+def build_docs(count, seed=7):
+    rng = random.Random(seed)
+    # Zipf-like weights so topic words are common but not in every document
+    weights = [1.0 / (rank + 20) for rank in range(len(VOCAB))]
+    return [{
+        "title": " ".join(rng.choices(VOCAB, weights, k=10)).capitalize(),
+        "abstract": " ".join(rng.choices(VOCAB, weights, k=180)),
+        "source": rng.choice(["PubMed", "Europe PMC", "OpenAlex", "PLOS", "Semantic Scholar"]),
+    } for _ in range(count)]
+
+
+def timed(func, repeat=3):
+    best = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark relevance scoring")
+    parser.add_argument("--docs", type=int, default=20000)
+    parser.add_argument("--query", default="gene expression in yeast")
+    args = parser.parse_args()
+
+    docs = build_docs(args.docs)
+    ranker = BM25Ranker()
+    legacy = timed(lambda: [legacy_score(d, args.query) for d in docs])
+    bm25 = timed(lambda: ranker.score(docs, args.query))
+    print(f"{args.docs} docs, query {args.query!r}")
+    print(f"legacy substring loop  {legacy * 1000:8.1f} ms")
+    print(f"BM25 (index + score)   {bm25 * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""
+Memory of plain result dicts vs. slotted Paper records.
+
+Builds the same synthetic records both ways (as JSON-decoded dicts, the way they come
+back from the cache and batch files, and as Paper) and reports the traced memory.
+
+Usage:
+    python benchmarks/bench_records.py [--records 100000]
+"""
+import argparse
+import json
+import os
+import random
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from records import Paper
+
+SOURCES = ["PubMed", "Semantic Scholar", "EuropePMC", "OpenAlex", "PLOS"]
+JOURNALS = [f"Journal of Topic {i}" for i in range(200)]
+
+
+def synthetic_payload(count, seed=7):
+    rng = random.Random(seed)
+    rows = []
+    for i in range(count):
+        rows.append({
+            "title": f"Study {i} of protein {rng.randint(1, 5000)} in yeast",
+            "journal": rng.choice(JOURNALS),
+            "year": str(rng.randint(2010, 2025)),
+            "authors": "Smith J, Doe A, Lee K",
+            "abstract": "Short abstract text.",
+            "source": rng.choice(SOURCES),
+            "url": f"https://example.org/{i}",
+            "citations": rng.randint(0, 500),
+            "pdf_url": "N/A",
+            "doi": f"10.1000/{i}",
+            "pmid": str(10000000 + i),
+            "pmcid": None,
+        })
+    # Records arrive as JSON from the APIs, cache and batch files, so strings are not shared
+    return json.dumps(rows)
+
+
+def measure(label, build):
+    tracemalloc.start()
+    started = time.perf_counter()
+    records = build()
+    elapsed = time.perf_counter() - started
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    print(f"{label:<8} {len(records):>8} records  {current / 2**20:8.1f} MiB  {elapsed * 1000:8.1f} ms")
+    return current
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--records", type=int, default=100000)
+    args = parser.parse_args()
+
+    payload = synthetic_payload(args.records)
+    dicts = measure("dict", lambda: json.loads(payload))
+    papers = measure("Paper", lambda: [Paper.from_dict(d) for d in json.loads(payload)])
+    print(f"Paper uses {papers / dicts:.0%} of the dict memory")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+End-to-end search_all latency and throughput against the local replay server.
+
+Serves recorded fixtures (--fixtures, see `python replay.py record`) or synthetic ones
+with the given latency/jitter/error rate, then runs search_all repeatedly for several
+source mixes from --concurrency threads and reports p50/p95 latency and searches/s.
+
+Usage:
+    python benchmarks/bench_search_all.py [--runs 40] [--concurrency 4] [--latency 0.05]
+        [--jitter 0.02] [--error-rate 0.0] [--limit 20] [--fixtures DIR]
+"""
+import argparse
+import concurrent.futures
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+from unified_client import UnifiedSearchManager
+
+MIXES = {
+    "pubmed": ["PubMed"],
+    "json-apis": ["Semantic Scholar", "Europe PMC", "OpenAlex"],
+    "all": ["PubMed", "Semantic Scholar", "Europe PMC", "OpenAlex", "PLOS"],
+}
+
+
+def run_mix(manager, sources, runs, concurrency, limit):
+    def one(i):
+        started = time.perf_counter()
+        results = manager.search_all(f"bacterial growth {i}", active_sources=sources, limit_per_source=limit)
+        failed = sum(1 for info in results.meta["sources"].values() if info["status"] not in ("ok", "cached"))
+        return time.perf_counter() - started, failed
+
+    started = time.perf_counter()
+    with concurrent.futures.ThreadPoolExecutor(max_workers=concurrency) as pool:
+        outcomes = list(pool.map(one, range(runs)))
+    wall = time.perf_counter() - started
+    latencies = sorted(o[0] for o in outcomes)
+    cuts = statistics.quantiles(latencies, n=20, method="inclusive") if len(latencies) > 1 else latencies * 19
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": cuts[18] * 1000,
+        "throughput": runs / wall,
+        "failed_sources": sum(o[1] for o in outcomes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--runs", type=int, default=40)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--jitter", type=float, default=0.02)
+    parser.add_argument("--error-rate", type=float, default=0.0)
+    parser.add_argument("--limit", type=int, default=20)
+    parser.add_argument("--fixtures", help="Recorded fixture directory (default: synthetic)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        fixtures = args.fixtures or write_synthetic_fixtures(tmp, records=args.limit)
+        with ReplayServer(fixtures, args.latency, args.jitter, args.error_rate, seed=1) as server:
+            manager = UnifiedSearchManager(session=ReplaySession(server.url))
+            print(f"latency {args.latency * 1000:.0f}ms +/- {args.jitter * 1000:.0f}ms, error rate {args.error_rate:.0%}, "
+                  f"{args.runs} searches x {args.concurrency} threads")
+            print(f"{'mix':<10} {'p50 ms':>8} {'p95 ms':>8} {'search/s':>9} {'failed':>7}")
+            for name, sources in MIXES.items():
+                stats = run_mix(manager, sources, args.runs, args.concurrency, args.limit)
+                print(f"{name:<10} {stats['p50']:8.1f} {stats['p95']:8.1f} {stats['throughput']:9.1f} {stats['failed_sources']:7d}")
+            manager.close()
+            print(f"server: {server.stats}")
+
+
+if __name__ == "__main__":
+    main()
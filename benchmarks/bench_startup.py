@@ -0,0 +1,60 @@
+"""
+Import-time profile of the GUI (or any module) against a startup budget.
+
+Imports --module in fresh interpreters with `python -X importtime`, reports the median
+import time over --runs, the modules with the largest self time, and whether the heavy
+dependencies that are meant to load lazily (requests, asyncio, concurrent.futures, csv)
+were pulled in. Exits with status 1 when the median exceeds --budget milliseconds.
+
+Usage:
+    python benchmarks/bench_startup.py [--module main] [--runs 5] [--budget 80] [--top 15]
+"""
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+# Modules that should only load on first search, not at startup
+DEFERRED = ("requests", "urllib3", "asyncio", "concurrent.futures", "csv")
+
+
+def profile(module):
+    """One cold import of `module`: {name: (self_us, cumulative_us)} in import order."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"],
+                          cwd=ROOT, capture_output=True, text=True, check=True)
+    timings = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = (part.strip() for part in line[len("import time:"):].split("|"))
+        timings[name.strip()] = (int(self_us), int(cumulative_us))
+    return timings
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--module", default="main")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget", type=float, default=80.0, help="Median import budget in ms")
+    parser.add_argument("--top", type=int, default=15)
+    args = parser.parse_args(argv)
+
+    runs = [profile(args.module) for _ in range(args.runs)]
+    totals = [run[args.module][1] / 1000 for run in runs]
+    median = statistics.median(totals)
+
+    last = runs[-1]
+    print(f"{'module':<40} {'self ms':>8} {'cumul ms':>9}")
+    for name, (self_us, cumulative_us) in sorted(last.items(), key=lambda kv: -kv[1][0])[:args.top]:
+        print(f"{name:<40} {self_us / 1000:8.1f} {cumulative_us / 1000:9.1f}")
+    loaded = [name for name in DEFERRED if name in last]
+    print(f"\nimport {args.module}: median {median:.1f} ms over {args.runs} runs "
+          f"(min {min(totals):.1f}, max {max(totals):.1f}), budget {args.budget:.0f} ms")
+    print(f"deferred modules loaded at import: {', '.join(loaded) or 'none'}")
+    return 1 if median > args.budget else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,79 @@
+"""
+Cooperative cancellation for searches.
+
+A CancelToken is bound to the running search with cancel_scope(), which stores it in
+a context variable, so it follows the search into the manager's worker threads and
+the page prefetch threads without being passed through every client signature. The
+blocking points check it: RateLimitedSession before each request and while waiting
+for a rate-limit slot, the page iterators between pages, and search_iter between
+source completions. A cancelled search raises SearchCancelled; a request already on
+the wire is allowed to finish, but nothing after it is sent.
+"""
+import contextlib
+import contextvars
+import threading
+import time
+
+_current = contextvars.ContextVar("cancel_token", default=None)
+
+
+class SearchCancelled(Exception):
+    pass
+
+
+class CancelToken:
+    def __init__(self):
+        self._event = threading.Event()
+
+    def cancel(self):
+        self._event.set()
+
+    @property
+    def cancelled(self):
+        return self._event.is_set()
+
+    def raise_if_cancelled(self):
+        if self._event.is_set():
+            raise SearchCancelled()
+
+    def sleep(self, seconds):
+        """time.sleep that wakes up (and raises) as soon as the token is cancelled."""
+        if self._event.wait(seconds):
+            raise SearchCancelled()
+
+
+@contextlib.contextmanager
+def cancel_scope(token):
+    """Make `token` the current token for this block (None leaves the block uncancellable)."""
+    if token is None:
+        yield
+        return
+    reset = _current.set(token)
+    try:
+        yield token
+    finally:
+        _current.reset(reset)
+
+
+def current_token():
+    return _current.get()
+
+
+def check_cancelled():
+    token = _current.get()
+    if token is not None:
+        token.raise_if_cancelled()
+
+
+def sleep(seconds):
+    token = _current.get()
+    if token is None:
+        time.sleep(seconds)
+    else:
+        token.sleep(seconds)
+
+
+def run_in_scope(token, func, *args):
+    """func(*args) under cancel_scope(token); for handing a search's token to a worker thread."""
+    with cancel_scope(token):
+        return func(*args)
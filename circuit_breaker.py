@@ -0,0 +1,68 @@
+import threading
+import time
+
+
+class CircuitBreaker:
+    """
+    Skips a source after repeated failures.
+    closed -> open after `failure_threshold` consecutive failures; once `cooldown`
+    seconds pass one trial call is let through (half-open) and its outcome decides
+    whether the circuit closes again or re-opens for another cool-down.
+    """
+
+    def __init__(self, failure_threshold=3, cooldown=60.0):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.last_error = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self):
+        if self.opened_at is None:
+            return "closed"
+        if time.monotonic() - self.opened_at >= self.cooldown:
+            return "half-open"
+        return "open"
+
+    def remaining_cooldown(self):
+        if self.opened_at is None:
+            return 0.0
+        return max(0.0, self.cooldown - (time.monotonic() - self.opened_at))
+
+    def allow(self):
+        """True if a call may go through now."""
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half-open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def skip_reason(self):
+        return (f"circuit open after {self.failures} failures "
+                f"({self.remaining_cooldown():.0f}s cool-down left; last error: {self.last_error})")
+
+    def record_success(self):
+        with self._lock:
+            self.failures = 0
+            self.opened_at = None
+            self.last_error = None
+            self._trial_running = False
+
+    def release_trial(self):
+        """End a half-open trial that neither succeeded nor failed (cut by a deadline or cancelled)."""
+        with self._lock:
+            self._trial_running = False
+
+    def record_failure(self, error=None):
+        with self._lock:
+            self.failures += 1
+            self.last_error = error
+            if self._trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self._trial_running = False
@@ -0,0 +1,137 @@
+"""
+Headless command line for the search engine (no Tk needed).
+
+    python cli.py search "bacterial growth" --sources PubMed OpenAlex --limit 20 [-o out.jsonl] [--json]
+    python cli.py serve --port 8080            # local JSON API, see api_server.py
+    python cli.py batch terms.txt -o results.jsonl ...   # same options as batch_search.py
+
+search and serve use the on-disk result cache and local library like the GUI
+(--no-cache / --no-library turn them off). --replay URL sends every API request to a
+replay server (python replay.py serve) instead of the real sources.
+"""
+import argparse
+import json
+import sys
+from records import json_default
+from unified_client import SOURCE_NAMES, UnifiedSearchManager
+
+# -o extension -> manager export method
+EXPORTERS = {
+    ".csv": "save_to_csv",
+    ".jsonl": "save_to_jsonl",
+    ".parquet": "save_to_parquet",
+    ".txt": "save_to_text",
+}
+
+
+def build_manager(args):
+    """Manager with the cache / library / session options shared by search and serve."""
+    cache = local_index = session = None
+    if not args.no_cache:
+        from search_cache import SQLiteCache
+        cache = SQLiteCache()
+    if not args.no_library:
+        from local_index import LocalIndex
+        local_index = LocalIndex()
+    if args.replay:
+        from replay import ReplaySession
+        session = ReplaySession(args.replay)
+    # Like the GUI: answer queries the library already covers without going to the network
+    mode = "local_first" if local_index is not None else "remote"
+    return UnifiedSearchManager(cache=cache, session=session, local_index=local_index, mode=mode, api_key=args.api_key)
+
+
+def add_manager_options(parser):
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk result cache")
+    parser.add_argument("--no-library", action="store_true", help="Do not read or fill the local library")
+    parser.add_argument("--replay", metavar="URL", help="Send API requests to a replay server")
+    parser.add_argument("--api-key", help="NCBI API key for PubMed (default: $NCBI_API_KEY)")
+
+
+def run_search(args):
+    manager = build_manager(args)
+    try:
+        results = manager.search_all(args.term, args.sources, args.limit, args.start_year, args.free_only,
+                                     deadline=args.deadline, mode=args.mode)
+    finally:
+        manager.close()
+
+    if args.output:
+        method = next((m for ext, m in EXPORTERS.items() if args.output.lower().endswith(ext)), None)
+        if method is None:
+            print(f"Unknown output format: {args.output} (use {', '.join(EXPORTERS)})", file=sys.stderr)
+            return 2
+        if not getattr(manager, method)(results, args.output):
+            return 1
+        print(f"Wrote {len(results)} results -> {args.output}", file=sys.stderr)
+    elif args.json:
+        json.dump({"results": results, "meta": results.meta}, sys.stdout, default=json_default, indent=2)
+        print()
+    else:
+        for i, item in enumerate(results, 1):
+            print(f"{i:3d}. [{item.get('source')}] {item.get('title')} ({item.get('year')})")
+            print(f"     {item.get('journal')} | citations {item.get('citations', 0)} | {item.get('url')}")
+
+    unavailable = [f"{name}: {info['status']}" for name, info in results.meta.get("sources", {}).items()
+                   if info["status"] not in ("ok", "cached", "local")]
+    if unavailable:
+        print(f"Unavailable - {', '.join(unavailable)}", file=sys.stderr)
+    if args.stats and results.stats is not None:
+        print(results.stats.summary(), file=sys.stderr)
+    return 0
+
+
+def run_serve(args):
+    from api_server import SearchApiServer
+    manager = build_manager(args)
+    server = SearchApiServer(manager, args.host, args.port)
+    print(f"Serving the search API on {server.url} (sources: {', '.join(SOURCE_NAMES)})")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        manager.close()
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Search scientific sources from the command line.")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    search = sub.add_parser("search", help="Run one search and print or export the results")
+    search.add_argument("term")
+    search.add_argument("--sources", nargs="+", choices=SOURCE_NAMES, metavar="SOURCE", help="Sources to query (default: all)")
+    search.add_argument("--limit", type=int, default=5, help="Results per source")
+    search.add_argument("--start-year", type=int, help="Earliest publication year (default: 10 years back)")
+    search.add_argument("--free-only", action="store_true", help="Only free full text")
+    search.add_argument("--mode", choices=UnifiedSearchManager.MODES,
+                        help="remote, local_first or offline (default: local_first, remote with --no-library)")
+    search.add_argument("--deadline", type=float, help="Seconds before slow sources are abandoned")
+    search.add_argument("-o", "--output", help="Export to .csv, .jsonl, .parquet or .txt")
+    search.add_argument("--json", action="store_true", help="Print results and meta as JSON")
+    search.add_argument("--stats", action="store_true", help="Print per-stage timings to stderr")
+    add_manager_options(search)
+
+    serve = sub.add_parser("serve", help="Serve a local JSON search API")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8080)
+    add_manager_options(serve)
+
+    batch = sub.add_parser("batch", help="Run many terms (arguments as for batch_search.py)")
+    batch.add_argument("batch_args", nargs=argparse.REMAINDER)
+
+    args = parser.parse_args(argv)
+    if args.command == "search" and args.mode not in (None, "remote") and args.no_library:
+        parser.error(f"--mode {args.mode} needs the local library (drop --no-library)")
+    if args.command == "search":
+        return run_search(args)
+    if args.command == "serve":
+        return run_serve(args)
+    import batch_search
+    return batch_search.main(args.batch_args)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
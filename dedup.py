@@ -0,0 +1,167 @@
+"""
+Identifier-first, near-duplicate-aware merging of results from several sources.
+
+Records are processed in source-priority order. Each one is matched against the
+clusters seen so far by DOI / PMID / PMCID, then by exact normalized title, then by
+MinHash LSH over the title's word set (candidates are verified with the exact
+Jaccard similarity). Title matches are refused when the two records carry different
+values for the same identifier or years more than one apart, so distinct papers
+sharing a generic title ("Correction", "Editorial") stay separate. Matches are merged into the higher-priority record instead of
+being dropped, so the kept record gets the best abstract, the highest citation
+count, any PDF link and any identifiers the duplicates had.
+All lookups are hash-based, so the cost grows linearly with the number of records.
+"""
+import random
+import re
+from identifiers import normalize_doi, normalize_pmid, normalize_pmcid
+
+PLACEHOLDER_ABSTRACTS = {"", "n/a", "no abstract available.", "abstract available at source.", "no abstract"}
+PLACEHOLDER_LINKS = {"", "N/A", "Check Link", None}
+ID_FIELDS = ("doi", "pmid", "pmcid")
+LIST_FIELDS = ("mesh_terms", "keywords", "publication_types")
+NORMALIZERS = {"doi": normalize_doi, "pmid": normalize_pmid, "pmcid": normalize_pmcid}
+
+_MASK64 = (1 << 64) - 1
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def normalize_title(text):
+    return "".join(e for e in str(text or "") if e.isalnum()).lower()
+
+
+def title_tokens(text):
+    return frozenset(_WORD_RE.findall(str(text or "").lower()))
+
+
+def source_key(source):
+    # "Europe PMC" (client name) and "EuropePMC" (record label) rank the same
+    return str(source or "").replace(" ", "").lower()
+
+
+def _abstract_quality(text):
+    text = (text or "").strip()
+    if text.lower() in PLACEHOLDER_ABSTRACTS:
+        return 0
+    return len(text)
+
+
+class DedupEngine:
+    def __init__(self, priority_order, title_threshold=0.85, num_perm=24, bands=8, min_tokens=4):
+        self.rank = {source_key(src): i for i, src in enumerate(priority_order)}
+        self.title_threshold = title_threshold
+        self.bands = bands
+        self.rows = num_perm // bands
+        rng = random.Random(1729)
+        self.masks = [rng.getrandbits(64) for _ in range(self.rows * bands)]
+        # Very short titles ("Editorial", "Erratum") are only merged on exact match
+        self.min_tokens = min_tokens
+
+    def priority(self, item):
+        return self.rank.get(source_key(item.get('source')), 99)
+
+    def _signature(self, tokens):
+        hashes = [hash(t) & _MASK64 for t in tokens]
+        return [min(h ^ m for h in hashes) for m in self.masks]
+
+    def _band_keys(self, tokens):
+        sig = self._signature(tokens)
+        return [(b, tuple(sig[b * self.rows:(b + 1) * self.rows])) for b in range(self.bands)]
+
+    def merge(self, items):
+        """Return one record per distinct paper, highest-priority source first."""
+        ordered = sorted(items, key=self.priority)
+        clusters = []        # kept records
+        cluster_tokens = []  # title word sets per cluster, for Jaccard verification
+        by_id = {}
+        by_title = {}
+        lsh = {}
+
+        for item in ordered:
+            norm_title = normalize_title(item.get('title', ''))
+            if not norm_title: continue
+
+            ids = [(f, NORMALIZERS[f](item.get(f))) for f in ID_FIELDS]
+            ids = [i for i in ids if i[1]]
+            tokens = title_tokens(item.get('title'))
+
+            match = next((by_id[i] for i in ids if i in by_id), None)
+            if match is None:
+                match = next((idx for idx in by_title.get(norm_title, ()) if self._title_match_allowed(item, clusters[idx])), None)
+            bands = None
+            if len(tokens) >= self.min_tokens:
+                bands = self._band_keys(tokens)
+                if match is None:
+                    match = self._near_duplicate(item, tokens, bands, lsh, clusters, cluster_tokens)
+
+            if match is None:
+                match = len(clusters)
+                clusters.append(item)
+                cluster_tokens.append(tokens)
+            else:
+                self.merge_into(clusters[match], item)
+
+            for i in ids:
+                by_id.setdefault(i, match)
+            same_title = by_title.setdefault(norm_title, [])
+            if match not in same_title:
+                same_title.append(match)
+            for key in bands or ():
+                lsh.setdefault(key, []).append(match)
+
+        return clusters
+
+    def _near_duplicate(self, item, tokens, bands, lsh, clusters, cluster_tokens):
+        seen = set()
+        for key in bands:
+            for idx in lsh.get(key, ()):
+                if idx in seen: continue
+                seen.add(idx)
+                other = cluster_tokens[idx]
+                jaccard = len(tokens & other) / len(tokens | other)
+                if jaccard >= self.title_threshold and self._title_match_allowed(item, clusters[idx]):
+                    return idx
+        return None
+
+    def _title_match_allowed(self, item, kept):
+        return not self._ids_conflict(item, kept) and self._years_compatible(item, kept)
+
+    def _ids_conflict(self, a, b):
+        # Same identifier type with different values: two different papers
+        for field in ID_FIELDS:
+            va, vb = NORMALIZERS[field](a.get(field)), NORMALIZERS[field](b.get(field))
+            if va and vb and va != vb:
+                return True
+        return False
+
+    def _years_compatible(self, a, b):
+        ya = re.search(r'\d{4}', str(a.get('year') or ''))
+        yb = re.search(r'\d{4}', str(b.get('year') or ''))
+        if not ya or not yb:
+            return True
+        # Preprint vs. journal version can straddle a year boundary
+        return abs(int(ya.group(0)) - int(yb.group(0))) <= 1
+
+    def merge_into(self, kept, dup):
+        """Fold the duplicate record `dup` into `kept` in place."""
+        if _abstract_quality(dup.get('abstract')) > _abstract_quality(kept.get('abstract')):
+            kept['abstract'] = dup.get('abstract')
+
+        cites = [c for c in (kept.get('citations'), dup.get('citations')) if isinstance(c, int)]
+        if cites:
+            kept['citations'] = max(cites)
+
+        if kept.get('pdf_url') in PLACEHOLDER_LINKS and dup.get('pdf_url') not in PLACEHOLDER_LINKS:
+            kept['pdf_url'] = dup.get('pdf_url')
+
+        for field in ID_FIELDS + ("year", "journal", "authors"):
+            if not kept.get(field) and dup.get(field):
+                kept[field] = dup.get(field)
+
+        for field in LIST_FIELDS:
+            if dup.get(field):
+                kept[field] = list(dict.fromkeys((kept.get(field) or []) + list(dup.get(field))))
+
+        merged = kept.setdefault('merged_sources', [])
+        src = dup.get('source')
+        if src and src != kept.get('source') and src not in merged:
+            merged.append(src)
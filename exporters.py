@@ -0,0 +1,193 @@
+"""
+Streaming exporters and loaders for result records.
+
+JsonlWriter and ParquetWriter take records one at a time (or any iterable, e.g. a
+generator from batch mode), so nothing has to be held in memory. JSON Lines keeps the
+record exactly as returned (ints stay ints, lists stay lists). Parquet uses a typed
+schema (integer year and citations, list columns for authors and MeSH terms) and is
+written in compressed row groups; it needs the optional `pyarrow` package. Records
+loaded back from Parquet get the clients' shape again (", "-joined authors, string
+year), so both formats load the same records.
+
+Loading:
+    for paper in load_records("results.jsonl"): ...     # Paper records, streamed
+    df = load_table("results.parquet").to_pandas()      # columnar, needs pyarrow
+"""
+import json
+import re
+from records import Paper, json_default
+
+# Rows buffered per Parquet row group
+PARQUET_BATCH_SIZE = 5000
+PARQUET_COMPRESSION = "zstd"
+
+STRING_COLUMNS = ("title", "journal", "abstract", "source", "url", "pdf_url", "doi", "pmid", "pmcid", "query")
+LIST_COLUMNS = ("authors", "mesh_terms", "keywords", "publication_types", "merged_sources")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError:
+        raise ImportError("Parquet export needs pyarrow: pip install pyarrow") from None
+    return pyarrow, pyarrow.parquet
+
+
+def parquet_schema():
+    pa, _ = _require_pyarrow()
+    fields = [(name, pa.string()) for name in STRING_COLUMNS]
+    fields += [(name, pa.list_(pa.string())) for name in LIST_COLUMNS]
+    fields += [("year", pa.int32()), ("citations", pa.int64()), ("relevance_score", pa.float64())]
+    return pa.schema(fields)
+
+
+def _to_int(value):
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    match = re.search(r'\d+', str(value or ""))
+    return int(match.group(0)) if match else None
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_list(value):
+    if value is None:
+        # Null, not [], so a missing field stays missing when loaded back
+        return None
+    if isinstance(value, (list, tuple)):
+        return [str(v) for v in value]
+    # Author strings are joined with ", " by every client
+    return [part.strip() for part in str(value).split(",") if part.strip()]
+
+
+def _to_str(value):
+    return None if value is None else str(value)
+
+
+def parquet_row(item):
+    """Typed Parquet row for one record."""
+    row = {name: _to_str(item.get(name)) for name in STRING_COLUMNS}
+    for name in LIST_COLUMNS:
+        row[name] = _to_list(item.get(name))
+    row["year"] = _to_int(item.get("year"))
+    row["citations"] = _to_int(item.get("citations"))
+    row["relevance_score"] = _to_float(item.get("relevance_score"))
+    return row
+
+
+class JsonlWriter:
+    """Append-friendly JSON Lines writer; use as a context manager."""
+
+    def __init__(self, path, append=False):
+        self.path = path
+        self.count = 0
+        self._file = open(path, 'a' if append else 'w', encoding='utf-8')
+
+    def write(self, item):
+        self._file.write(json.dumps(item, ensure_ascii=False, default=json_default) + "\n")
+        self.count += 1
+
+    def write_many(self, items):
+        for item in items:
+            self.write(item)
+        return self.count
+
+    def flush(self):
+        self._file.flush()
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ParquetWriter:
+    """Streams records into a typed, compressed Parquet file one row group at a time."""
+
+    def __init__(self, path, batch_size=PARQUET_BATCH_SIZE, compression=PARQUET_COMPRESSION):
+        self._pa, pq = _require_pyarrow()
+        self.path = path
+        self.batch_size = batch_size
+        self.count = 0
+        self.schema = parquet_schema()
+        self._writer = pq.ParquetWriter(path, self.schema, compression=compression)
+        self._rows = []
+
+    def write(self, item):
+        self._rows.append(parquet_row(item))
+        self.count += 1
+        if len(self._rows) >= self.batch_size:
+            self._flush_rows()
+
+    def write_many(self, items):
+        for item in items:
+            self.write(item)
+        return self.count
+
+    def _flush_rows(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def close(self):
+        self._flush_rows()
+        self._writer.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def export_jsonl(items, path, append=False):
+    with JsonlWriter(path, append) as writer:
+        return writer.write_many(items)
+
+
+def record_from_row(row):
+    """Parquet row back to the record shape the clients produce (and JSON Lines keeps)."""
+    data = {name: value for name, value in row.items() if value is not None}
+    if "authors" in data:
+        data["authors"] = ", ".join(data["authors"])
+    if "year" in data:
+        data["year"] = str(data["year"])
+    return Paper.from_dict(data)
+
+
+def export_parquet(items, path, batch_size=PARQUET_BATCH_SIZE, compression=PARQUET_COMPRESSION):
+    with ParquetWriter(path, batch_size, compression) as writer:
+        return writer.write_many(items)
+
+
+def load_records(path):
+    """Stream Paper records back from a .jsonl or .parquet export."""
+    if path.lower().endswith(".parquet"):
+        _, pq = _require_pyarrow()
+        for batch in pq.ParquetFile(path).iter_batches():
+            for row in batch.to_pylist():
+                yield record_from_row(row)
+        return
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield Paper.from_dict(json.loads(line))
+
+
+def load_table(path):
+    """Load an export as a pyarrow Table (call .to_pandas() for a DataFrame)."""
+    pa, pq = _require_pyarrow()
+    if path.lower().endswith(".parquet"):
+        return pq.read_table(path)
+    import pyarrow.json
+    return pyarrow.json.read_json(path)
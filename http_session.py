@@ -0,0 +1,96 @@
+import email.utils
+import random
+import threading
+import time
+import requests
+from requests.adapters import HTTPAdapter
+from rate_limiter import limiter_for_url
+from cancellation import check_cancelled
+
+# Keep-alive connections kept open per host (eutils, semanticscholar, ebi, openalex, plos)
+MAX_CONNECTIONS_PER_HOST = 8
+MAX_HOSTS = 10
+USER_AGENT = "ScienceFetcher/1.0"
+
+# Throttling responses are retried with the server's Retry-After or exponential backoff
+RETRY_STATUSES = (429, 503)
+MAX_RETRIES = 3
+BACKOFF_BASE = 1.0
+MAX_RETRY_WAIT = 30.0
+
+_session = None
+_session_lock = threading.Lock()
+
+
+def parse_retry_after(value):
+    """Retry-After is either delta-seconds or an HTTP date; return seconds or None."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        when = email.utils.parsedate_to_datetime(value)
+        return max(0.0, when.timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+class RateLimitedSession(requests.Session):
+    """
+    requests.Session that waits on the per-host token bucket before every request
+    and retries 429/503 answers, honoring Retry-After, instead of returning them.
+    """
+
+    def __init__(self, max_retries=MAX_RETRIES, backoff=BACKOFF_BASE):
+        super().__init__()
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+    def request(self, method, url, *args, **kwargs):
+        limiter = limiter_for_url(url, kwargs.get("params"), kwargs.get("data"))
+        attempt = 0
+        while True:
+            # A cancelled search sends nothing more, including retries
+            check_cancelled()
+            limiter.acquire()
+            response = super().request(method, url, *args, **kwargs)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            delay = parse_retry_after(response.headers.get("Retry-After"))
+            if delay is None:
+                delay = self.backoff * (2 ** attempt) * (1 + random.random() * 0.25)
+            delay = min(delay, MAX_RETRY_WAIT)
+            # Hold back every caller of this host, not just this thread
+            limiter.pause(delay)
+            response.close()
+            attempt += 1
+
+
+def create_session(max_per_host=MAX_CONNECTIONS_PER_HOST):
+    """Build a rate-limited session with a pooled, keep-alive adapter for http and https."""
+    session = RateLimitedSession()
+    adapter = HTTPAdapter(pool_connections=MAX_HOSTS, pool_maxsize=max_per_host)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT})
+    return session
+
+
+def get_session():
+    """Return the process-wide pooled session, creating it on first use."""
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                _session = create_session()
+    return _session
+
+
+def close_session():
+    global _session
+    with _session_lock:
+        if _session is not None:
+            _session.close()
+            _session = None
@@ -0,0 +1,25 @@
+import re
+
+
+def normalize_doi(doi):
+    if not doi: return None
+    doi = str(doi).strip().lower()
+    for prefix in ("https://doi.org/", "http://doi.org/", "doi:"):
+        if doi.startswith(prefix):
+            doi = doi[len(prefix):]
+    # '|' and ',' would break the OpenAlex OR-filter syntax
+    if "|" in doi or "," in doi: return None
+    return doi or None
+
+
+def normalize_pmid(pmid):
+    # Accepts bare IDs and pubmed URLs (OpenAlex returns https://pubmed.ncbi.nlm.nih.gov/123)
+    if not pmid: return None
+    match = re.search(r'(\d+)/?$', str(pmid).strip())
+    return match.group(1) if match else None
+
+
+def normalize_pmcid(pmcid):
+    if not pmcid: return None
+    match = re.search(r'(?:PMC)?(\d+)/?$', str(pmcid).strip(), re.IGNORECASE)
+    return f"PMC{match.group(1)}" if match else None
@@ -0,0 +1,204 @@
+"""
+Local full-text index of every record returned by the remote sources.
+
+Records are stored as-is (same dict schema as the clients return) in SQLite, with an
+FTS5 index over title, abstract, authors and MeSH terms. A paper returned by several
+sources is stored once; paper_clients records every source that returned it. A coverage table remembers
+which (query, source, start year, free-only, limit) combinations were fetched, so the
+manager can answer repeated or overlapping topics locally and only go to the network
+for sources that were never fetched for that query.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from identifiers import normalize_doi, normalize_pmid
+from ranking import tokenize
+from records import json_default
+
+DEFAULT_INDEX_PATH = os.path.join(os.path.expanduser("~"), ".science_fetcher", "library.db")
+# After this many seconds a fetched query no longer counts as covered (records are kept)
+DEFAULT_MAX_AGE = 7 * 24 * 3600
+PLACEHOLDER_LINKS = ("N/A", "Check Link", "")
+# Boolean operators in remote-style queries ("crispr AND phage") are not search words here
+QUERY_OPERATORS = {"and", "or", "not"}
+
+
+def record_key(item):
+    """Stable identity for a stored record: DOI, then PMID, then source + title."""
+    doi = normalize_doi(item.get('doi'))
+    if doi:
+        return f"doi:{doi}"
+    pmid = normalize_pmid(item.get('pmid'))
+    if pmid:
+        return f"pmid:{pmid}"
+    title = "".join(e for e in str(item.get('title') or "") if e.isalnum()).lower()
+    return f"title:{item.get('source')}:{title}"
+
+
+def normalize_query(term):
+    return " ".join(str(term or "").lower().split())
+
+
+class LocalIndex:
+    def __init__(self, path=None, max_age=DEFAULT_MAX_AGE):
+        self.path = path or DEFAULT_INDEX_PATH
+        self.max_age = max_age
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        self.fts = True
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                " id INTEGER PRIMARY KEY, key TEXT UNIQUE NOT NULL, client TEXT, source TEXT,"
+                " title TEXT, abstract TEXT, authors TEXT, mesh TEXT, year INTEGER,"
+                " has_pdf INTEGER, data TEXT NOT NULL, fetched_at REAL)"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_papers_client ON papers(client, year)")
+            has_members = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'paper_clients'").fetchone()
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS paper_clients ("
+                " paper_id INTEGER NOT NULL, client TEXT NOT NULL, PRIMARY KEY (client, paper_id))"
+            )
+            if not has_members:
+                # Libraries written before the membership table: each row's last source
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO paper_clients (paper_id, client) SELECT id, client FROM papers WHERE client IS NOT NULL")
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS coverage ("
+                " query TEXT, client TEXT, start_year INTEGER, only_free INTEGER, max_results INTEGER,"
+                " fetched_at REAL, PRIMARY KEY (query, client, only_free))"
+            )
+            try:
+                self._conn.execute(
+                    "CREATE VIRTUAL TABLE IF NOT EXISTS papers_fts USING fts5("
+                    " title, abstract, authors, mesh, content='papers', content_rowid='id')"
+                )
+            except sqlite3.OperationalError:
+                # SQLite built without FTS5: fall back to LIKE scans
+                self.fts = False
+
+    def add(self, records, client, term=None, start_year=None, only_free=False, max_results=None):
+        """Upsert records fetched from `client` and, if a query is given, mark it as covered."""
+        now = time.time()
+        with self._lock, self._conn:
+            for item in records:
+                key = record_key(item)
+                row = self._conn.execute("SELECT id, title, abstract, authors, mesh FROM papers WHERE key = ?", (key,)).fetchone()
+                values = (
+                    client, item.get('source'), str(item.get('title') or ""), str(item.get('abstract') or ""),
+                    str(item.get('authors') or ""), " ".join(item.get('mesh_terms') or []),
+                    _year(item.get('year')), int(item.get('pdf_url') not in PLACEHOLDER_LINKS and item.get('pdf_url') is not None),
+                    json.dumps(item, default=json_default), now,
+                )
+                if row is None:
+                    cur = self._conn.execute(
+                        "INSERT INTO papers (client, source, title, abstract, authors, mesh, year, has_pdf, data, fetched_at, key)"
+                        " VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", values + (key,))
+                    rowid = cur.lastrowid
+                else:
+                    rowid = row[0]
+                    if self.fts:
+                        self._conn.execute(
+                            "INSERT INTO papers_fts (papers_fts, rowid, title, abstract, authors, mesh)"
+                            " VALUES ('delete', ?, ?, ?, ?, ?)", (rowid,) + tuple(row[1:]))
+                    self._conn.execute(
+                        "UPDATE papers SET client = ?, source = ?, title = ?, abstract = ?, authors = ?, mesh = ?,"
+                        " year = ?, has_pdf = ?, data = ?, fetched_at = ? WHERE key = ?", values + (key,))
+                if self.fts:
+                    self._conn.execute(
+                        "INSERT INTO papers_fts (rowid, title, abstract, authors, mesh) VALUES (?, ?, ?, ?, ?)",
+                        (rowid,) + values[2:6])
+                # The row's client column is the latest source; membership keeps all of them
+                self._conn.execute("INSERT OR IGNORE INTO paper_clients (paper_id, client) VALUES (?, ?)", (rowid, client))
+
+            if term is not None:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO coverage (query, client, start_year, only_free, max_results, fetched_at)"
+                    " VALUES (?, ?, ?, ?, ?, ?)",
+                    (normalize_query(term), client, start_year, int(bool(only_free)), max_results, now))
+
+    def covered(self, term, client, start_year=None, only_free=False, max_results=None):
+        """True if this query was already fetched from `client` for at least this year window and size."""
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT start_year, max_results FROM coverage"
+                " WHERE query = ? AND client = ? AND only_free IN (0, ?) AND fetched_at >= ?",
+                (normalize_query(term), client, int(bool(only_free)),
+                 time.time() - self.max_age if self.max_age is not None else 0)).fetchall()
+        for covered_year, covered_max in rows:
+            year_ok = covered_year is None or (start_year is not None and covered_year <= start_year)
+            size_ok = max_results is None or covered_max is None or covered_max >= max_results
+            if year_ok and size_ok:
+                return True
+        return False
+
+    def search(self, term, clients=None, start_year=None, only_free=False, limit=None):
+        """Full-text search over stored records; returns record dicts, best match first."""
+        tokens = [t for t in tokenize(term) if t not in QUERY_OPERATORS]
+        if not tokens:
+            return []
+        where, params = [], []
+        if self.fts:
+            match = " ".join('"' + t.replace('"', '""') + '"' for t in tokens)
+            sql = "SELECT p.data FROM papers_fts JOIN papers p ON p.id = papers_fts.rowid WHERE papers_fts MATCH ?"
+            params.append(match)
+        else:
+            sql = "SELECT p.data FROM papers p WHERE 1 = 1"
+            for t in tokens:
+                where.append("(p.title LIKE ? OR p.abstract LIKE ? OR p.authors LIKE ? OR p.mesh LIKE ?)")
+                params.extend([f"%{t}%"] * 4)
+        if clients:
+            where.append("p.id IN (SELECT paper_id FROM paper_clients WHERE client IN (%s))" % ",".join("?" * len(clients)))
+            params.extend(clients)
+        if start_year:
+            where.append("(p.year IS NULL OR p.year >= ?)")
+            params.append(int(start_year))
+        if only_free:
+            where.append("p.has_pdf = 1")
+        if where:
+            sql += " AND " + " AND ".join(where)
+        if self.fts:
+            sql += " ORDER BY bm25(papers_fts)"
+        if limit:
+            sql += " LIMIT ?"
+            params.append(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [json.loads(r[0]) for r in rows]
+
+    def vocabulary(self):
+        """Past queries, MeSH terms / keywords and titles with occurrence counts, for typeahead."""
+        with self._lock:
+            queries = self._conn.execute("SELECT query, COUNT(*) FROM coverage GROUP BY query").fetchall()
+            titles = self._conn.execute("SELECT title, COUNT(*) FROM papers WHERE title != '' GROUP BY title").fetchall()
+            try:
+                terms = self._conn.execute(
+                    "SELECT value, COUNT(*) FROM ("
+                    " SELECT j.value AS value FROM papers, json_each(papers.data, '$.mesh_terms') AS j"
+                    " UNION ALL SELECT k.value FROM papers, json_each(papers.data, '$.keywords') AS k)"
+                    " WHERE typeof(value) = 'text' GROUP BY value").fetchall()
+            except sqlite3.OperationalError:
+                # SQLite built without the JSON functions
+                terms = []
+        return {"query": queries, "term": terms, "title": titles}
+
+    def count(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def _year(value):
+    try:
+        return int(float(str(value)))
+    except (TypeError, ValueError):
+        digits = "".join(c for c in str(value or "")[:4] if c.isdigit())
+        return int(digits) if len(digits) == 4 else None
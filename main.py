@@ -1,8 +1,13 @@
 import tkinter as tk
 from tkinter import messagebox, scrolledtext, ttk, filedialog
-import threading 
+import threading
 import webbrowser
-from unified_client import UnifiedSearchManager
+from unified_client import UnifiedSearchManager, SOURCE_NAMES
+from search_cache import SQLiteCache
+from local_index import LocalIndex
+from search_worker import SearchWorker
+from suggest import SuggestionIndex
+from cancellation import SearchCancelled
 
 COLORS = {
     "bg_main": "#f4f6f9",       
@@ -14,6 +19,14 @@ COLORS = {
     "frame_bg": "#ffffff"       
 }
 
+# Result rows inserted per main-loop turn when filling the list
+RENDER_CHUNK = 200
+# Typing pause (ms) before suggestions are looked up
+SUGGEST_DELAY_MS = 150
+SUGGEST_ICONS = {"query": "🕘", "term": "🏷", "title": "📄"}
+# Delay (ms) after the window appears before background startup work begins
+STARTUP_DELAY_MS = 200
+
 class PubMedApp:
     def __init__(self, root):
         self.root = root
@@ -21,21 +34,35 @@ class PubMedApp:
         self.root.geometry("1100x850")
         self.root.configure(bg=COLORS["bg_main"])
         
-        self.client = UnifiedSearchManager()
+        library = LocalIndex()
+        self.client = UnifiedSearchManager(cache=SQLiteCache(), local_index=library)
         self.search_var = tk.StringVar()
         self.status_var = tk.StringVar(value="Ready.")
         self.free_only_var = tk.BooleanVar(value=False)
+        self.offline_var = tk.BooleanVar(value=False)
+        self.limit_var = tk.IntVar(value=5)
         
         self.is_searching = False
         self.last_results = []
+        # One background thread runs searches; a new search cancels the running one
+        self.worker = SearchWorker(self.run_logic)
+        self.search_token = None
+        # Typeahead starts empty and fills from the local library in the background
+        self.suggestions = SuggestionIndex()
+        self._suggest_job = None
+        self._suggest_items = []
         
         self.source_vars = {}
-        self.available_sources = list(self.client.clients.keys())
+        # Static list: the clients themselves are only built on first use
+        self.available_sources = list(SOURCE_NAMES)
         for source in self.available_sources:
             self.source_vars[source] = tk.BooleanVar(value=True)
 
         self._setup_styles()
         self._setup_ui()
+        # The window is shown first; the HTTP stack and the suggestion index load behind it
+        self.root.after(STARTUP_DELAY_MS, lambda: threading.Thread(
+            target=self._background_startup, args=(library,), daemon=True).start())
 
     def _setup_styles(self):
         style = ttk.Style()
@@ -62,6 +89,16 @@ class PubMedApp:
         self.entry = ttk.Entry(input_frame, textvariable=self.search_var, font=("Segoe UI", 12))
         self.entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=(0, 10))
         self.entry.bind('<Return>', lambda e: self.start_search())
+        self.entry.bind('<KeyRelease>', self.on_entry_key)
+        self.entry.bind('<Down>', lambda e: self.focus_suggestions())
+        self.entry.bind('<Escape>', lambda e: self.hide_suggestions())
+        self.entry.bind('<FocusOut>', lambda e: self.root.after(100, self._hide_unless_focused))
+
+        self.suggest_box = tk.Listbox(self.root, font=("Segoe UI", 11), activestyle="none", relief="solid", borderwidth=1)
+        self.suggest_box.bind('<ButtonRelease-1>', lambda e: self.accept_suggestion())
+        self.suggest_box.bind('<Return>', lambda e: self.accept_suggestion(search=True))
+        self.suggest_box.bind('<Escape>', lambda e: (self.hide_suggestions(), self.entry.focus_set()))
+        self.suggest_box.bind('<FocusOut>', lambda e: self.root.after(100, self._hide_unless_focused))
         
         self.context_menu = tk.Menu(self.root, tearoff=0)
         self.context_menu.add_command(label="Paste", command=lambda: self.entry.event_generate("<<Paste>>"))
@@ -70,6 +107,9 @@ class PubMedApp:
         self.btn_search = ttk.Button(input_frame, text="SEARCH", style="Action.TButton", command=self.start_search)
         self.btn_search.pack(side=tk.LEFT, padx=5)
 
+        self.btn_stop = ttk.Button(input_frame, text="STOP", command=self.cancel_search, state="disabled")
+        self.btn_stop.pack(side=tk.LEFT, padx=5)
+
         self.btn_export = ttk.Button(input_frame, text="EXPORT DATA", style="Action.TButton", command=self.export_data, state="disabled")
         self.btn_export.pack(side=tk.LEFT, padx=5)
 
@@ -77,6 +117,9 @@ class PubMedApp:
         filters_frame.pack(fill=tk.X, pady=10)
         
         ttk.Checkbutton(filters_frame, text="Free Full Text Only (PDF)", variable=self.free_only_var).pack(side=tk.LEFT, padx=10)
+        ttk.Checkbutton(filters_frame, text="Offline (Local Library)", variable=self.offline_var).pack(side=tk.LEFT, padx=10)
+        tk.Label(filters_frame, text="Per source:", bg="white", fg="gray").pack(side=tk.LEFT)
+        ttk.Spinbox(filters_frame, from_=5, to=1000, increment=5, width=5, textvariable=self.limit_var).pack(side=tk.LEFT, padx=(2, 10))
         tk.Label(filters_frame, text="| Sources:", bg="white", fg="gray").pack(side=tk.LEFT, padx=10)
 
         for src in self.available_sources:
@@ -86,15 +129,41 @@ class PubMedApp:
         
         results_card = ttk.Frame(main_container, style="Card.TFrame", padding=2)
         results_card.pack(fill=tk.BOTH, expand=True)
-        self.results_area = scrolledtext.ScrolledText(results_card, font=("Consolas", 11), state='disabled', padx=10, pady=10)
-        self.results_area.pack(fill=tk.BOTH, expand=True)
+        self.results_card = results_card
+        panes = ttk.PanedWindow(results_card, orient=tk.VERTICAL)
+        panes.pack(fill=tk.BOTH, expand=True)
 
-        self.results_area.tag_configure("title", foreground="#2980b9", font=("Segoe UI", 14, "bold"))
-        self.results_area.tag_configure("meta", foreground="#7f8c8d", font=("Segoe UI", 10))
-        self.results_area.tag_configure("impact", foreground="#e74c3c", font=("Segoe UI", 10, "bold"))
-        self.results_area.tag_configure("source", background="#27ae60", foreground="white", font=("Consolas", 9, "bold"))
-        self.results_area.tag_configure("link", foreground="blue", underline=True)
-        self.results_area.tag_bind("link", "<Button-1>", lambda e: self.open_link(e))
+        # Result list: one Treeview row per paper; Tk only draws the visible rows
+        list_frame = ttk.Frame(panes)
+        columns = ("rank", "source", "title", "year", "citations", "relevance", "journal")
+        self.results_tree = ttk.Treeview(list_frame, columns=columns, show="headings", selectmode="browse")
+        for col, label, width, stretch in (("rank", "#", 45, False), ("source", "Source", 110, False),
+                                           ("title", "Title", 460, True), ("year", "Year", 55, False),
+                                           ("citations", "Impact", 65, False), ("relevance", "Rel", 70, False),
+                                           ("journal", "Journal", 180, True)):
+            self.results_tree.heading(col, text=label)
+            self.results_tree.column(col, width=width, stretch=stretch, anchor=tk.W)
+        tree_scroll = ttk.Scrollbar(list_frame, orient=tk.VERTICAL, command=self.results_tree.yview)
+        self.results_tree.configure(yscrollcommand=tree_scroll.set)
+        tree_scroll.pack(side=tk.RIGHT, fill=tk.Y)
+        self.results_tree.pack(fill=tk.BOTH, expand=True)
+        self.results_tree.bind("<<TreeviewSelect>>", lambda e: self.show_detail())
+        self.results_tree.bind("<Double-1>", lambda e: self.open_selected())
+        panes.add(list_frame, weight=3)
+
+        # Detail pane: filled only for the selected row
+        self.detail_area = scrolledtext.ScrolledText(panes, font=("Consolas", 11), state='disabled', padx=10, pady=10, height=10)
+        panes.add(self.detail_area, weight=2)
+        self.detail_area.tag_configure("title", foreground="#2980b9", font=("Segoe UI", 14, "bold"))
+        self.detail_area.tag_configure("meta", foreground="#7f8c8d", font=("Segoe UI", 10))
+        self.detail_area.tag_configure("impact", foreground="#e74c3c", font=("Segoe UI", 10, "bold"))
+        self.detail_area.tag_configure("source", background="#27ae60", foreground="white", font=("Consolas", 9, "bold"))
+        for tag in ("link_article", "link_pdf"):
+            self.detail_area.tag_configure(tag, foreground="blue", underline=True)
+            self.detail_area.tag_bind(tag, "<Button-1>", lambda e, t=tag: self.open_link(t))
+        self.detail_links = {}
+        self.displayed_results = []
+        self._render_job = None
 
         self.status_lbl = tk.Label(self.root, textvariable=self.status_var, bg="#dfe6e9", anchor="w")
         self.status_lbl.pack(fill=tk.X, side=tk.BOTTOM)
@@ -102,89 +171,222 @@ class PubMedApp:
     def show_context_menu(self, event):
         self.context_menu.tk_popup(event.x_root, event.y_root)
 
+    def _background_startup(self, library):
+        self._load_suggestions(library)
+        try:
+            self.client.warm_up()
+        except Exception as e:
+            print(f"Startup Error: {e}")
+
+    # --- Typeahead ---
+    def _load_suggestions(self, library):
+        try:
+            loaded = SuggestionIndex.from_local_index(library)
+        except Exception as e:
+            print(f"Suggestion Error: {e}")
+            return
+        # Anything learned while loading is already in the library, so a plain swap is enough
+        self.suggestions = loaded
+
+    def on_entry_key(self, event):
+        if event.keysym in ("Return", "Escape", "Down", "Up", "Tab"): return
+        if self._suggest_job is not None:
+            self.root.after_cancel(self._suggest_job)
+        self._suggest_job = self.root.after(SUGGEST_DELAY_MS, self.update_suggestions)
+
+    def update_suggestions(self):
+        self._suggest_job = None
+        matches = self.suggestions.suggest(self.search_var.get())
+        if not matches:
+            self.hide_suggestions()
+            return
+        self._suggest_items = [text for text, _ in matches]
+        self.suggest_box.delete(0, tk.END)
+        for text, kind in matches:
+            self.suggest_box.insert(tk.END, f"{SUGGEST_ICONS[kind]} {text}")
+        self.suggest_box.config(height=len(matches))
+        self.suggest_box.place(in_=self.entry, relx=0, rely=1, relwidth=1)
+        self.suggest_box.lift()
+
+    def hide_suggestions(self):
+        if self._suggest_job is not None:
+            self.root.after_cancel(self._suggest_job)
+            self._suggest_job = None
+        self.suggest_box.place_forget()
+
+    def _hide_unless_focused(self):
+        if self.root.focus_get() not in (self.entry, self.suggest_box):
+            self.hide_suggestions()
+
+    def focus_suggestions(self):
+        if not self.suggest_box.winfo_ismapped(): return
+        self.suggest_box.focus_set()
+        self.suggest_box.selection_clear(0, tk.END)
+        self.suggest_box.selection_set(0)
+        self.suggest_box.activate(0)
+
+    def accept_suggestion(self, search=False):
+        selection = self.suggest_box.curselection()
+        if not selection: return
+        self.search_var.set(self._suggest_items[selection[0]])
+        self.hide_suggestions()
+        self.entry.focus_set()
+        self.entry.icursor(tk.END)
+        if search:
+            self.start_search()
+
     def start_search(self):
         term = self.search_var.get().strip()
+        self.hide_suggestions()
         if not term: return
         
+        if not self.is_searching:
+            self.progress.pack(fill=tk.X, pady=(0, 10), in_=self.results_card.master)
+            self.progress.start(10)
         self.is_searching = True
-        self.btn_search.config(state="disabled")
+        self.btn_stop.config(state="normal")
         self.btn_export.config(state="disabled")
-        self.progress.pack(fill=tk.X, pady=(0, 10), in_=self.results_area.master.master)
-        self.progress.start(10)
         
-        self.results_area.config(state='normal')
-        self.results_area.delete(1.0, tk.END)
-        self.results_area.config(state='disabled')
+        self._render_results([])
         self.status_var.set("Searching... (Ranking by Relevance & Impact)")
         
-        threading.Thread(target=self.run_logic, args=(term,), daemon=True).start()
+        # Supersedes (and cancels) any search still running or queued
+        self.search_token = self.worker.submit(term)
+
+    def cancel_search(self):
+        if not self.is_searching: return
+        self.worker.cancel()
+        # Keep whatever the partial snapshots already showed
+        self.finish(self.displayed_results, "Search cancelled.")
 
-    def run_logic(self, term):
+    def run_logic(self, term, token):
         selected = [k for k,v in self.source_vars.items() if v.get()]
         only_free = self.free_only_var.get()
+        mode = "offline" if self.offline_var.get() else "local_first"
         try:
-            results = self.client.search_all(term, active_sources=selected, limit_per_source=5, only_free=only_free)
-            self.last_results = results
-            self.root.after(0, self.finish, results, f"Found {len(results)} items.")
+            limit = max(1, int(self.limit_var.get()))
+        except (tk.TclError, ValueError):
+            limit = 5
+        try:
+            # Render each partial snapshot as soon as a source answers; the last one is final
+            results = []
+            for snapshot in self.client.search_iter(term, active_sources=selected, limit_per_source=limit, only_free=only_free, mode=mode, cancel=token):
+                results = snapshot
+                self.root.after(0, self.show_partial, snapshot, token)
+            msg = f"Found {len(results)} items."
+            missing = [f"{name}: {info['status']}" for name, info in getattr(results, "meta", {}).get("sources", {}).items()
+                       if info["status"] not in ("ok", "cached", "local")]
+            if missing:
+                msg += f" (Unavailable - {', '.join(missing)})"
+            stats = getattr(results, "stats", None)
+            if stats is not None:
+                msg += f"  [{stats.summary()}]"
+            self.suggestions.add_results(term, results)
+            self.root.after(0, self.finish, results, msg, token)
+        except SearchCancelled:
+            raise
         except Exception as e:
-            self.root.after(0, self.finish, [], f"Error: {e}")
+            self.root.after(0, self.finish, [], f"Error: {e}", token)
+
+    def show_partial(self, results, token):
+        # Snapshots of a superseded or cancelled search may still be queued; drop them
+        if not self.is_searching or token is not self.search_token: return
+        self.status_var.set(f"Searching... {len(results)} items so far")
+        self._render_results(results)
 
-    def finish(self, results, msg):
+    def finish(self, results, msg, token=None):
+        if token is not None and token is not self.search_token: return
+        self.search_token = None
+        self.last_results = results
         self.progress.stop()
         self.progress.pack_forget()
         self.is_searching = False
-        self.btn_search.config(state="normal")
+        self.btn_stop.config(state="disabled")
         if results: self.btn_export.config(state="normal")
         self.status_var.set(msg)
-        
-        self.results_area.config(state='normal')
+        self._render_results(results)
+
+    def _render_results(self, results):
+        """Refill the result list in chunks so the Tk main loop stays responsive."""
+        if self._render_job is not None:
+            self.root.after_cancel(self._render_job)
+            self._render_job = None
+        selected = self.results_tree.selection()
+        self.results_tree.delete(*self.results_tree.get_children())
+        self.displayed_results = list(results)
         if not results:
-            self.results_area.insert(tk.END, "No results found.\nTry broadening your search.")
+            self._set_detail([("No results found.\nTry broadening your search.", "meta")] if not self.is_searching else [])
+            return
+        self._insert_rows(0, selected[0] if selected else None)
+
+    def _insert_rows(self, start, reselect=None):
+        end = min(start + RENDER_CHUNK, len(self.displayed_results))
+        for i in range(start, end):
+            item = self.displayed_results[i]
+            self.results_tree.insert("", tk.END, iid=str(i), values=(
+                i + 1, item.get('source'), item.get('title'), item.get('year'),
+                item.get('citations', 0), item.get('relevance_score', 0), item.get('journal')))
+        if reselect is not None and self.results_tree.exists(reselect):
+            self.results_tree.selection_set(reselect)
+            reselect = None
+        if end < len(self.displayed_results):
+            self._render_job = self.root.after(1, self._insert_rows, end, reselect)
         else:
-            for i, item in enumerate(results, 1):
-                url = item.get('url', 'N/A')
-                pdf = item.get('pdf_url', 'N/A')
-                citations = item.get('citations', 0)
-                relevance = item.get('relevance_score', 0)
-                
-                abstract = item.get('abstract') or ""
-                short_abstract = (abstract[:50] + '...') if len(abstract) > 50 else abstract
-
-                self.results_area.insert(tk.END, f" {item.get('source')} ", "source")
-                self.results_area.insert(tk.END, f" #{i}  ", "meta")
-                self.results_area.insert(tk.END, f"Impact: {citations} | Rel: {relevance}\n", "impact")
-                self.results_area.insert(tk.END, f"{item.get('title')}\n", "title")
-                
-                # Link separation
-                self.results_area.insert(tk.END, "\n")
-                if url != "N/A":
-                    self.results_area.insert(tk.END, "🔗 Open Article Link\n", ("link", url))
-                if pdf != "N/A" and pdf != "Check Link":
-                    self.results_area.insert(tk.END, "📄 Open PDF Link\n", ("link", pdf))
-                
-                self.results_area.insert(tk.END, f"Journal: {item.get('journal')} | Year: {item.get('year')}\n", "meta")
-                self.results_area.insert(tk.END, f"Authors: {item.get('authors')}\n", "meta")
-                self.results_area.insert(tk.END, f"Abstract: {short_abstract}\n", "text")
-                self.results_area.insert(tk.END, "_"*60 + "\n\n")
-
-        self.results_area.config(state='disabled')
-
-    def open_link(self, event):
-        try:
-            index = self.results_area.index(f"@{event.x},{event.y}")
-            tags = self.results_area.tag_names(index)
-            for tag in tags:
-                if tag.startswith("http"):
-                    webbrowser.open(tag)
-                    return
-        except: pass
+            self._render_job = None
+            if not self.results_tree.selection():
+                self.results_tree.selection_set("0")
+
+    def _selected_item(self):
+        selection = self.results_tree.selection()
+        if not selection: return None
+        index = int(selection[0])
+        return self.displayed_results[index] if index < len(self.displayed_results) else None
+
+    def show_detail(self):
+        item = self._selected_item()
+        if item is None: return
+        url = item.get('url', 'N/A')
+        pdf = item.get('pdf_url', 'N/A')
+        self.detail_links = {"link_article": url, "link_pdf": pdf}
+        parts = [
+            (f" {item.get('source')} ", "source"),
+            (f"  Impact: {item.get('citations', 0)} | Rel: {item.get('relevance_score', 0)}\n", "impact"),
+            (f"{item.get('title')}\n\n", "title"),
+        ]
+        if url != "N/A":
+            parts.append(("🔗 Open Article Link\n", "link_article"))
+        if pdf != "N/A" and pdf != "Check Link":
+            parts.append(("📄 Open PDF Link\n", "link_pdf"))
+        parts += [
+            (f"Journal: {item.get('journal')} | Year: {item.get('year')}\n", "meta"),
+            (f"Authors: {item.get('authors')}\n\n", "meta"),
+            (f"{item.get('abstract') or ''}\n", None),
+        ]
+        self._set_detail(parts)
+
+    def _set_detail(self, parts):
+        self.detail_area.config(state='normal')
+        self.detail_area.delete(1.0, tk.END)
+        for text, tag in parts:
+            self.detail_area.insert(tk.END, text, tag or ())
+        self.detail_area.config(state='disabled')
+
+    def open_link(self, tag):
+        url = self.detail_links.get(tag)
+        if url and url.startswith("http"):
+            webbrowser.open(url)
+
+    def open_selected(self):
+        item = self._selected_item()
+        if item is not None and str(item.get('url', '')).startswith("http"):
+            webbrowser.open(item.get('url'))
 
     def export_data(self):
         if not self.last_results: return
         
         export_win = tk.Toplevel(self.root)
         export_win.title("Export Options")
-        export_win.geometry("300x150")
+        export_win.geometry("560x150")
         export_win.configure(bg=COLORS["bg_main"])
         
         tk.Label(export_win, text="Choose format:", bg=COLORS["bg_main"], font=("Segoe UI", 12)).pack(pady=10)
@@ -212,13 +414,32 @@ class PubMedApp:
                     messagebox.showinfo("Export", "Text file saved successfully!")
                     export_win.destroy()
 
+        def save_jsonl():
+            f = get_filename(".jsonl", "JSON Lines")
+            if f:
+                if self.client.save_to_jsonl(self.last_results, f):
+                    messagebox.showinfo("Export", "JSON Lines file saved successfully!")
+                    export_win.destroy()
+
+        def save_parquet():
+            f = get_filename(".parquet", "Parquet Files")
+            if f:
+                if self.client.save_to_parquet(self.last_results, f):
+                    messagebox.showinfo("Export", "Parquet file saved successfully!")
+                    export_win.destroy()
+                else:
+                    messagebox.showerror("Export", "Parquet export failed (is pyarrow installed?)")
+
         btn_frame = tk.Frame(export_win, bg=COLORS["bg_main"])
         btn_frame.pack(pady=10)
         
         ttk.Button(btn_frame, text="Excel / CSV", command=save_csv).pack(side=tk.LEFT, padx=10)
         ttk.Button(btn_frame, text="Readable Text", command=save_txt).pack(side=tk.LEFT, padx=10)
+        ttk.Button(btn_frame, text="JSON Lines", command=save_jsonl).pack(side=tk.LEFT, padx=10)
+        ttk.Button(btn_frame, text="Parquet", command=save_parquet).pack(side=tk.LEFT, padx=10)
 
 if __name__ == "__main__":
     root = tk.Tk()
     app = PubMedApp(root)
+    root.protocol("WM_DELETE_WINDOW", lambda: (app.worker.close(timeout=1), root.destroy()))
     root.mainloop()
\ No newline at end of file
@@ -0,0 +1,166 @@
+"""
+Per-search timing and traffic statistics.
+
+A SearchStats object is attached to every SearchResults (results.stats). It records
+pipeline stages (fanout, merge, enrich, score, sort, total), and for each source the
+number of HTTP requests, the time spent in them, the bytes received and the remaining
+client time (JSON/XML parsing), plus result-cache hits and misses.
+
+HTTP figures come from a response hook installed on the clients' sessions. The hook
+only records while a source call is running inside source_scope(), which binds the
+current SearchStats and source name through a context variable, so concurrent
+searches sharing one session never mix up their numbers.
+"""
+import contextlib
+import contextvars
+import json
+import threading
+import time
+
+STAGES = ("fanout", "merge", "enrich", "score", "sort", "total")
+
+_current = contextvars.ContextVar("search_stats_scope", default=None)
+
+
+class SearchStats:
+    def __init__(self):
+        self.stages = {}
+        self.sources = {}
+        self.cache = {"hits": 0, "misses": 0}
+        self._lock = threading.Lock()
+
+    def _source(self, name):
+        entry = self.sources.get(name)
+        if entry is None:
+            entry = self.sources[name] = {"requests": 0, "request_seconds": 0.0, "parse_seconds": 0.0,
+                                          "bytes": 0, "status": None, "count": 0}
+        return entry
+
+    @contextlib.contextmanager
+    def stage(self, name):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_stage(name, time.perf_counter() - started)
+
+    def add_stage(self, name, seconds):
+        with self._lock:
+            self.stages[name] = self.stages.get(name, 0.0) + seconds
+
+    def add_request(self, name, seconds, nbytes):
+        with self._lock:
+            entry = self._source(name)
+            entry["requests"] += 1
+            entry["request_seconds"] += seconds
+            entry["bytes"] += nbytes
+
+    def add_call(self, name, seconds, request_seconds):
+        # Client time not spent waiting on HTTP is parsing and record building
+        with self._lock:
+            self._source(name)["parse_seconds"] += max(0.0, seconds - request_seconds)
+
+    def set_source(self, name, **fields):
+        with self._lock:
+            self._source(name).update(fields)
+
+    def cache_hit(self, hit):
+        with self._lock:
+            self.cache["hits" if hit else "misses"] += 1
+
+    @property
+    def total_bytes(self):
+        return sum(s["bytes"] for s in self.sources.values())
+
+    def to_dict(self):
+        with self._lock:
+            return {
+                "stages": {k: round(v, 4) for k, v in self.stages.items()},
+                "sources": {name: {k: round(v, 4) if isinstance(v, float) else v for k, v in entry.items()}
+                            for name, entry in self.sources.items()},
+                "cache": dict(self.cache),
+            }
+
+    def to_json(self, indent=None):
+        return json.dumps(self.to_dict(), indent=indent)
+
+    def to_prometheus(self, prefix="science_fetcher"):
+        """Prometheus text exposition format (gauges for the last search)."""
+        data = self.to_dict()
+        lines = [f"# TYPE {prefix}_stage_seconds gauge"]
+        lines += [f'{prefix}_stage_seconds{{stage="{k}"}} {v}' for k, v in data["stages"].items()]
+        for metric, field, kind in (("source_requests", "requests", "gauge"),
+                                    ("source_request_seconds", "request_seconds", "gauge"),
+                                    ("source_parse_seconds", "parse_seconds", "gauge"),
+                                    ("source_bytes", "bytes", "gauge"),
+                                    ("source_results", "count", "gauge")):
+            lines.append(f"# TYPE {prefix}_{metric} {kind}")
+            lines += [f'{prefix}_{metric}{{source="{_label(name)}"}} {entry[field]}'
+                      for name, entry in data["sources"].items()]
+        lines.append(f"# TYPE {prefix}_cache_lookups gauge")
+        lines += [f'{prefix}_cache_lookups{{result="{k}"}} {v}' for k, v in data["cache"].items()]
+        return "\n".join(lines) + "\n"
+
+    def write(self, path):
+        """Dump to a file: Prometheus text for *.prom / *.txt, JSON otherwise."""
+        text = self.to_prometheus() if path.endswith((".prom", ".txt")) else self.to_json(indent=2)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def summary(self):
+        """One-line summary for a status bar."""
+        stages = self.stages
+        parts = [f"{stages.get('total', 0.0):.2f}s total", f"network {stages.get('fanout', 0.0):.2f}s"]
+        for name in ("merge", "enrich", "score"):
+            if name in stages:
+                parts.append(f"{name} {stages[name] * 1000:.0f}ms")
+        parts.append(f"{self.total_bytes / 1024:.0f} KB")
+        lookups = self.cache["hits"] + self.cache["misses"]
+        if lookups:
+            parts.append(f"cache {self.cache['hits']}/{lookups}")
+        return " | ".join(parts)
+
+
+def _label(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"')
+
+
+@contextlib.contextmanager
+def source_scope(stats, name):
+    """Attribute HTTP traffic in this block to `name` and time the whole client call."""
+    if stats is None:
+        yield
+        return
+    scope = {"stats": stats, "name": name, "request_seconds": 0.0}
+    token = _current.set(scope)
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        _current.reset(token)
+        stats.add_call(name, time.perf_counter() - started, scope["request_seconds"])
+
+
+def _response_hook(response, *args, **kwargs):
+    scope = _current.get()
+    if scope is None:
+        return response
+    started = time.perf_counter()
+    if kwargs.get("stream"):
+        # Streamed bodies are parsed while downloading; only the declared size is known
+        nbytes = int(response.headers.get("Content-Length") or 0)
+    else:
+        nbytes = len(response.content)
+    seconds = response.elapsed.total_seconds() + (time.perf_counter() - started)
+    with scope["stats"]._lock:
+        scope["request_seconds"] += seconds
+    scope["stats"].add_request(scope["name"], seconds, nbytes)
+    return response
+
+
+def instrument_session(session):
+    """Install the stats response hook on a requests session (once)."""
+    hooks = session.hooks.setdefault("response", [])
+    if _response_hook not in hooks:
+        hooks.append(_response_hook)
+    return session
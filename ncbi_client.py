@@ -1,15 +1,27 @@
-import requests
 import xml.etree.ElementTree as ET
+from cancellation import check_cancelled
+from records import Paper
 
 class NCBIClient:
     """
     Handles interactions with the NCBI Entrez API (E-utilities).
     """
     BASE_URL = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    # Above this many IDs efetch is sent as POST (long GET query strings get rejected)
+    GET_ID_LIMIT = 200
+    # Records per efetch page for ID lists and history-server retrieval
+    FETCH_BATCH_SIZE = 500
 
-    def __init__(self, api_key=None, tool_name="science_fetcher"):
+    def __init__(self, api_key=None, tool_name="science_fetcher", session=None, timeout=10):
         self.api_key = api_key
         self.tool_name = tool_name
+        self.timeout = timeout
+        # Shared keep-alive session so repeated esearch/efetch calls reuse connections
+        if session is None:
+            # Imported here so that loading this module does not import requests
+            from http_session import get_session
+            session = get_session()
+        self.session = session
 
     def _get_base_params(self):
         # NCBI requires a tool parameter and email is recommended
@@ -31,72 +43,186 @@ class NCBIClient:
         })
 
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.get(url, params=params, timeout=self.timeout)
             response.raise_for_status()
             data = response.json()
             return data.get("esearchresult", {}).get("idlist", [])
         except Exception as e:
             print(f"NCBI Search Error: {e}")
-            return []
-
-    def fetch_details(self, id_list):
-        if not id_list:
-            return []
+            raise
 
-        url = f"{self.BASE_URL}/efetch.fcgi"
+    def search_history(self, term, sort="relevance"):
+        """
+        Run esearch with usehistory=y and keep the hits on the NCBI history server.
+        Returns {"webenv", "query_key", "count"} for paged retrieval with fetch_history.
+        """
+        url = f"{self.BASE_URL}/esearch.fcgi"
         params = self._get_base_params()
         params.update({
             "db": "pubmed",
-            "id": ",".join(id_list),
-            "retmode": "xml"
+            "term": term,
+            "usehistory": "y",
+            "retmax": 0,
+            "sort": sort,
+            "retmode": "json"
         })
-
         try:
-            response = requests.get(url, params=params, timeout=10)
+            response = self.session.post(url, data=params, timeout=self.timeout)
             response.raise_for_status()
-            
-            # Parse complex XML from PubMed
-            root = ET.fromstring(response.content)
-            results = []
-
-            for article in root.findall(".//PubmedArticle"):
-                # Title
-                title = article.findtext(".//ArticleTitle") or "No Title"
-                journal = article.findtext(".//Journal/Title") or "Unknown Journal"
-                
-                # PMID
-                pmid = article.findtext(".//MedlineCitation/PMID")
-                
-                # Year logic
-                year = article.findtext(".//Journal/JournalIssue/PubDate/Year")
-                if not year:
-                    year = article.findtext(".//PubDate/MedlineDate")
-                
-                # Abstract
-                abstract_texts = article.findall(".//AbstractText")
-                full_abstract = " ".join(["".join(t.itertext()) for t in abstract_texts])
-                if not full_abstract:
-                    full_abstract = "No Abstract Available."
-
-                # Authors
-                authors = []
-                for author in article.findall(".//Author"):
-                    last = author.findtext("LastName")
-                    initials = author.findtext("Initials")
-                    if last and initials:
-                        authors.append(f"{last} {initials}")
-                
-                results.append({
-                    "pmid": pmid,
-                    "title": title,
-                    "journal": journal,
-                    "year": year,
-                    "authors": ", ".join(authors),
-                    "abstract": full_abstract
-                })
-            
-            return results
+            result = response.json().get("esearchresult", {})
+            return {
+                "webenv": result.get("webenv"),
+                "query_key": result.get("querykey"),
+                "count": int(result.get("count", 0))
+            }
+        except Exception as e:
+            print(f"NCBI History Search Error: {e}")
+            raise
+
+    def fetch_details(self, id_list):
+        if not id_list:
+            return []
 
+        results = []
+        # Large ID lists are sent as POST bodies in FETCH_BATCH_SIZE chunks
+        for i in range(0, len(id_list), self.FETCH_BATCH_SIZE):
+            params = self._get_base_params()
+            params.update({
+                "db": "pubmed",
+                "id": ",".join(id_list[i:i + self.FETCH_BATCH_SIZE]),
+                "retmode": "xml"
+            })
+            results.extend(self._efetch(params, use_post=len(id_list) > self.GET_ID_LIMIT))
+        return results
+
+    def fetch_history(self, webenv, query_key, count, batch_size=None, max_records=None):
+        """Yield parsed records from a history-server result set, one efetch page at a time."""
+        batch_size = batch_size or self.FETCH_BATCH_SIZE
+        total = min(count, max_records) if max_records is not None else count
+        for retstart in range(0, total, batch_size):
+            check_cancelled()
+            params = self._get_base_params()
+            params.update({
+                "db": "pubmed",
+                "WebEnv": webenv,
+                "query_key": query_key,
+                "retstart": retstart,
+                "retmax": min(batch_size, total - retstart),
+                "retmode": "xml"
+            })
+            yield from self._efetch(params, use_post=True)
+
+    def iter_search(self, term, max_records=None, batch_size=None):
+        """Search and page through every matching record (or the first max_records) via the history server."""
+        history = self.search_history(term)
+        if not history["count"] or not history["webenv"]:
+            return
+        yield from self.fetch_history(history["webenv"], history["query_key"], history["count"],
+                                      batch_size, max_records)
+
+    def _efetch(self, params, use_post=False):
+        """Send one efetch request and stream-parse the XML response, yielding records."""
+        url = f"{self.BASE_URL}/efetch.fcgi"
+        try:
+            if use_post:
+                response = self.session.post(url, data=params, timeout=self.timeout, stream=True)
+            else:
+                response = self.session.get(url, params=params, timeout=self.timeout, stream=True)
+            response.raise_for_status()
+        except Exception as e:
+            print(f"NCBI Fetch Error: {e}")
+            raise
+        try:
+            response.raw.decode_content = True
+            yield from iter_parse_articles(response.raw)
         except Exception as e:
             print(f"NCBI Fetch Error: {e}")
-            return []
\ No newline at end of file
+            raise
+        finally:
+            response.close()
+
+
+def iter_parse_articles(source):
+    """
+    Incrementally parse a PubMed efetch XML stream (file-like object or path).
+    Each PubmedArticle is converted as soon as its end tag arrives and then cleared
+    from the tree, so memory stays bounded by one article regardless of payload size.
+    """
+    context = ET.iterparse(source, events=("start", "end"))
+    root = None
+    for event, elem in context:
+        if root is None:
+            root = elem
+        if event == "end" and elem.tag == "PubmedArticle":
+            yield parse_article(elem)
+            # Drop the processed article (and any siblings before it) from the root
+            root.clear()
+
+
+def parse_article(article):
+    """Convert one PubmedArticle element to a result dict using direct child paths."""
+    citation = article.find("MedlineCitation")
+    if citation is None:
+        citation = ET.Element("MedlineCitation")
+    info = citation.find("Article")
+    if info is None:
+        info = ET.Element("Article")
+
+    # Title
+    title_el = info.find("ArticleTitle")
+    title = "".join(title_el.itertext()) if title_el is not None else ""
+    journal = info.findtext("Journal/Title") or "Unknown Journal"
+
+    # PMID
+    pmid = citation.findtext("PMID")
+
+    # Year logic
+    pub_date = info.find("Journal/JournalIssue/PubDate")
+    year = None
+    if pub_date is not None:
+        year = pub_date.findtext("Year") or pub_date.findtext("MedlineDate")
+
+    # Abstract
+    abstract_texts = info.findall("Abstract/AbstractText")
+    full_abstract = " ".join(["".join(t.itertext()) for t in abstract_texts])
+    if not full_abstract:
+        full_abstract = "No Abstract Available."
+
+    # Authors
+    authors = []
+    for author in info.findall("AuthorList/Author"):
+        last = author.findtext("LastName")
+        initials = author.findtext("Initials")
+        if last and initials:
+            authors.append(f"{last} {initials}")
+
+    # Identifiers: PubmedData/ArticleIdList first, ELocationID as DOI fallback
+    ids = {}
+    for article_id in article.findall("PubmedData/ArticleIdList/ArticleId"):
+        id_type = article_id.get("IdType")
+        if id_type and article_id.text and id_type not in ids:
+            ids[id_type] = article_id.text.strip()
+    doi = ids.get("doi")
+    if not doi:
+        for location in info.findall("ELocationID"):
+            if location.get("EIdType") == "doi" and location.text:
+                doi = location.text.strip()
+                break
+
+    mesh_terms = [d.text for d in citation.findall("MeshHeadingList/MeshHeading/DescriptorName") if d.text]
+    keywords = ["".join(k.itertext()).strip() for k in citation.findall("KeywordList/Keyword")]
+    publication_types = [t.text for t in info.findall("PublicationTypeList/PublicationType") if t.text]
+
+    return Paper.from_dict({
+        "pmid": pmid,
+        "title": title or "No Title",
+        "journal": journal,
+        "year": year,
+        "authors": ", ".join(authors),
+        "abstract": full_abstract,
+        "doi": doi,
+        "pmcid": ids.get("pmc"),
+        "mesh_terms": mesh_terms,
+        "keywords": [k for k in keywords if k],
+        "publication_types": publication_types
+    })
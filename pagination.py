@@ -0,0 +1,100 @@
+"""
+Page iterators shared by the source clients.
+
+Offset-paged APIs (Semantic Scholar, PLOS) fetch a small window of pages ahead in
+parallel and yield records in order; cursor-paged APIs (Europe PMC, OpenAlex) have to
+follow the cursor one page at a time. Both stop at max_results or at the first short
+page, and both are lazy: nothing beyond the prefetch window is requested until the
+caller consumes it. Both check the current cancel token before each page.
+Prefetched pages run on one process-wide thread pool, so a paginated search does not
+start and tear down threads of its own.
+"""
+import collections
+import contextvars
+import threading
+from cancellation import check_cancelled
+
+# Pages requested ahead of the consumer on offset-paged sources
+PAGE_WORKERS = 4
+# Threads in the shared page pool (several sources can paginate at once)
+PAGE_POOL_SIZE = 16
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    """Return the process-wide page prefetch pool, creating it on first use."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                import concurrent.futures
+                _executor = concurrent.futures.ThreadPoolExecutor(max_workers=PAGE_POOL_SIZE, thread_name_prefix="page")
+    return _executor
+
+
+def close_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is not None:
+            _executor.shutdown(wait=False, cancel_futures=True)
+            _executor = None
+
+
+def iter_offset_pages(fetch_page, max_results, page_size, workers=PAGE_WORKERS):
+    """fetch_page(offset, size) -> list of records. Yields up to max_results records in order."""
+    if max_results <= 0:
+        return
+    offsets = iter(range(0, max_results, page_size))
+
+    if workers <= 1 or max_results <= page_size:
+        for offset in offsets:
+            size = min(page_size, max_results - offset)
+            check_cancelled()
+            page = fetch_page(offset, size)
+            yield from page[:size]
+            if len(page) < size:
+                return
+        return
+
+    executor = get_executor()
+    window = collections.deque()
+
+    def submit_next():
+        offset = next(offsets, None)
+        if offset is not None:
+            size = min(page_size, max_results - offset)
+            # Each page runs in a copy of the caller's context (keeps per-search stats scoping)
+            window.append((executor.submit(contextvars.copy_context().run, fetch_page, offset, size), size))
+
+    try:
+        for _ in range(workers):
+            submit_next()
+        while window:
+            future, size = window.popleft()
+            page = future.result()
+            yield from page[:size]
+            if len(page) < size:
+                return
+            check_cancelled()
+            submit_next()
+    finally:
+        # Early exit (short page, error or the caller stopped iterating): drop prefetched pages
+        for future, _ in window:
+            future.cancel()
+
+
+def iter_cursor_pages(fetch_page, max_results, page_size, first_cursor="*"):
+    """fetch_page(cursor, size) -> (records, next_cursor). Yields up to max_results records."""
+    cursor = first_cursor
+    fetched = 0
+    while cursor and fetched < max_results:
+        size = min(page_size, max_results - fetched)
+        check_cancelled()
+        page, next_cursor = fetch_page(cursor, size)
+        yield from page[:size]
+        fetched += len(page)
+        if len(page) < size or next_cursor == cursor:
+            return
+        cursor = next_cursor
@@ -0,0 +1,82 @@
+"""
+BM25 relevance ranking for merged result sets.
+
+Titles and abstracts are tokenized into whole words, so "gene" no longer matches
+"general". A TermIndex is built once over the result set (postings of weighted term
+frequencies plus document lengths) with the same tokenizer the local library uses,
+and every document is scored in a single pass over the postings of the query terms.
+"""
+import math
+import re
+from collections import Counter
+from dedup import source_key
+
+_TOKEN_RE = re.compile(r"[^\W_]+")
+
+# Bonus for high quality sources to keep them at top (keys compared without spaces/case)
+SOURCE_BONUS = {
+    "PubMed": 5000,
+    "Europe PMC": 2000,
+}
+
+
+def tokenize(text):
+    return _TOKEN_RE.findall(str(text or "").lower())
+
+
+class TermIndex:
+    """
+    Inverted index over title/abstract tokens; a title occurrence counts title_weight times.
+    Passing `terms` keeps only the postings of those terms (the query vocabulary), while
+    document lengths still count every token.
+    """
+
+    def __init__(self, docs, title_weight=3.0, terms=None):
+        self.postings = {}
+        self.lengths = []
+        for doc_id, doc in enumerate(docs):
+            title_tokens = tokenize(doc.get('title'))
+            abstract_tokens = tokenize(doc.get('abstract'))
+            self.lengths.append(len(abstract_tokens) + title_weight * len(title_tokens))
+            tf = Counter(abstract_tokens)
+            for token in title_tokens:
+                tf[token] += title_weight
+            for token in (tf if terms is None else terms):
+                freq = tf.get(token)
+                if freq:
+                    self.postings.setdefault(token, []).append((doc_id, freq))
+        self.doc_count = len(self.lengths)
+        self.avg_length = (sum(self.lengths) / self.doc_count) if self.doc_count else 0.0
+
+
+class BM25Ranker:
+    def __init__(self, k1=1.2, b=0.75, title_weight=3.0, scale=100.0, source_bonus=None):
+        self.k1 = k1
+        self.b = b
+        self.title_weight = title_weight
+        # BM25 values are small; scaling keeps them readable next to the source bonus
+        self.scale = scale
+        bonus = SOURCE_BONUS if source_bonus is None else source_bonus
+        self.source_bonus = {source_key(k): v for k, v in bonus.items()}
+
+    def score(self, docs, query, index=None):
+        """Return one relevance score per document, in input order."""
+        docs = list(docs)
+        query_terms = list(dict.fromkeys(tokenize(query)))
+        if not query_terms or not docs:
+            return [0] * len(docs)
+
+        index = index or TermIndex(docs, self.title_weight, query_terms)
+        scores = [0.0] * index.doc_count
+        avg_length = index.avg_length or 1.0
+        norms = [self.k1 * (1 - self.b + self.b * length / avg_length) for length in index.lengths]
+        for term in query_terms:
+            postings = index.postings.get(term)
+            if not postings: continue
+            idf = math.log(1 + (index.doc_count - len(postings) + 0.5) / (len(postings) + 0.5))
+            for doc_id, freq in postings:
+                scores[doc_id] += idf * freq * (self.k1 + 1) / (freq + norms[doc_id])
+
+        sources = [doc.get('source') for doc in docs]
+        bonus = {s: self.source_bonus.get(source_key(s), 0) for s in set(sources)}
+        return [round(s * self.scale, 1) + bonus[source] for s, source in zip(scores, sources)]
@@ -0,0 +1,97 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import cancellation
+
+# Sustained requests per second each API tolerates: (without key, with api_key)
+HOST_RATES = {
+    # NCBI E-utilities: 3 req/s anonymous, 10 req/s with an API key
+    "eutils.ncbi.nlm.nih.gov": (3.0, 10.0),
+    # Semantic Scholar throttles the shared public pool aggressively
+    "api.semanticscholar.org": (1.0, 1.0),
+    "www.ebi.ac.uk": (10.0, 10.0),
+    # OpenAlex polite pool allows 10 req/s
+    "api.openalex.org": (10.0, 10.0),
+    # PLOS search API: 10 requests per minute
+    "api.plos.org": (10.0 / 60, 10.0 / 60),
+}
+DEFAULT_RATE = 5.0
+# Burst sizes for hosts whose quota is per minute rather than per second
+HOST_BURST = {
+    "api.plos.org": 5,
+}
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket. Callers reserve a token under the lock and then wait
+    outside it, so threads and coroutines queue fairly without busy-waiting.
+    """
+
+    def __init__(self, rate, capacity=None):
+        self.rate = float(rate)
+        self.capacity = float(capacity if capacity is not None else max(1.0, rate))
+        self.tokens = self.capacity
+        self.updated = time.monotonic()
+        self.paused_until = 0.0
+        self._lock = threading.Lock()
+
+    def _reserve(self):
+        """Take one token (possibly going into debt) and return how long to wait for it."""
+        with self._lock:
+            now = time.monotonic()
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+            self.tokens -= 1
+            wait = 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+            return max(wait, self.paused_until - now)
+
+    def acquire(self):
+        wait = self._reserve()
+        if wait > 0:
+            # Interrupted by the current search's cancel token, if any
+            cancellation.sleep(wait)
+        return wait
+
+    async def acquire_async(self):
+        import asyncio
+        wait = self._reserve()
+        if wait > 0:
+            await asyncio.sleep(wait)
+        return wait
+
+    def pause(self, seconds):
+        """Hold every caller back for `seconds` (used for Retry-After)."""
+        with self._lock:
+            self.paused_until = max(self.paused_until, time.monotonic() + seconds)
+
+
+_limiters = {}
+_limiters_lock = threading.Lock()
+
+
+def get_limiter(host, has_api_key=False):
+    """Return the shared bucket for a host, one per (host, keyed) pair."""
+    key = (host, bool(has_api_key))
+    limiter = _limiters.get(key)
+    if limiter is None:
+        with _limiters_lock:
+            limiter = _limiters.get(key)
+            if limiter is None:
+                rates = HOST_RATES.get(host, (DEFAULT_RATE, DEFAULT_RATE))
+                limiter = TokenBucket(rates[1] if has_api_key else rates[0], HOST_BURST.get(host))
+                _limiters[key] = limiter
+    return limiter
+
+
+def _has_api_key(fields):
+    if isinstance(fields, dict):
+        return bool(fields.get("api_key"))
+    if isinstance(fields, (list, tuple)):
+        return any(pair[0] == "api_key" and pair[1] for pair in fields if len(pair) == 2)
+    return False
+
+
+def limiter_for_url(url, params=None, data=None):
+    """Bucket for a request; the api_key may be in the query params or a POSTed form body."""
+    return get_limiter(urlsplit(url).hostname or "", _has_api_key(params) or _has_api_key(data))
@@ -0,0 +1,205 @@
+"""
+Compact result record.
+
+Every source used to return a plain dict per paper, which repeats a 12-17 entry hash
+table for every record. Paper stores the known fields in __slots__ (one pointer each,
+no per-record dict) and interns the short, highly repeated strings (source, journal,
+year). Anything else a caller attaches ('query', 'first_seen', ...) goes into a small
+`extras` dict created on first use.
+
+Paper is a MutableMapping, so it behaves like a dict for existing code: item['title'],
+item.get('doi'), item['score'] = 1, 'pmid' in item, keys()/items(), pop()/clear(),
+dict(item) and csv.DictWriter all work. Unset fields are absent, exactly as a missing
+dict key would be. Use to_dict() or json_default() when serializing.
+
+A field can also be deferred with defer(field, func, *args): func runs on the first
+read of that field (display, scoring, export), so records that are never looked at
+never pay for it.
+"""
+import sys
+from collections.abc import MutableMapping
+
+FIELDS = (
+    "title", "journal", "year", "authors", "abstract", "source", "url", "citations", "pdf_url",
+    "doi", "pmid", "pmcid", "mesh_terms", "keywords", "publication_types",
+    "relevance_score", "merged_sources",
+)
+_FIELD_SET = frozenset(FIELDS)
+# Values repeated across many records; interning keeps one copy of each
+_INTERNED = frozenset(("source", "journal", "year"))
+
+
+class Paper(MutableMapping):
+    __slots__ = FIELDS + ("extras", "_lazy")
+
+    def __init__(self, **fields):
+        self.extras = None
+        self._lazy = None
+        for key, value in fields.items():
+            self[key] = value
+
+    @classmethod
+    def from_dict(cls, data):
+        if isinstance(data, cls):
+            return data
+        paper = cls()
+        for key, value in data.items():
+            paper[key] = value
+        return paper
+
+    def defer(self, field, func, *args):
+        """Compute `field` as func(*args) on first access instead of now."""
+        if field not in _FIELD_SET:
+            raise KeyError(field)
+        if hasattr(self, field):
+            delattr(self, field)
+        if self._lazy is None:
+            self._lazy = {}
+        self._lazy[field] = (func, args)
+
+    def _resolve(self, field):
+        func, args = self._lazy.pop(field)
+        if not self._lazy:
+            self._lazy = None
+        self[field] = func(*args)
+
+    def to_dict(self):
+        if self._lazy:
+            for field in list(self._lazy):
+                self._resolve(field)
+        data = {}
+        for field in FIELDS:
+            try:
+                data[field] = getattr(self, field)
+            except AttributeError:
+                pass
+        if self.extras:
+            data.update(self.extras)
+        return data
+
+    def __getitem__(self, key):
+        if key in _FIELD_SET:
+            if self._lazy and key in self._lazy:
+                self._resolve(key)
+            try:
+                return getattr(self, key)
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extras and key in self.extras:
+            return self.extras[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in _FIELD_SET:
+            if self._lazy and key in self._lazy:
+                self._lazy.pop(key)
+            if key in _INTERNED and type(value) is str:
+                value = sys.intern(value)
+            setattr(self, key, value)
+        else:
+            if self.extras is None:
+                self.extras = {}
+            self.extras[key] = value
+
+    def __delitem__(self, key):
+        if key in _FIELD_SET:
+            if self._lazy and key in self._lazy:
+                self._lazy.pop(key)
+                return
+            try:
+                delattr(self, key)
+                return
+            except AttributeError:
+                raise KeyError(key) from None
+        if self.extras and key in self.extras:
+            del self.extras[key]
+            return
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        if key in _FIELD_SET:
+            return hasattr(self, key) or bool(self._lazy) and key in self._lazy
+        return bool(self.extras) and key in self.extras
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def setdefault(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            self[key] = default
+            return default
+
+    def update(self, other=(), **kwargs):
+        items = other.items() if hasattr(other, "items") else other
+        for key, value in items:
+            self[key] = value
+        for key, value in kwargs.items():
+            self[key] = value
+
+    def keys(self):
+        return self.to_dict().keys()
+
+    def items(self):
+        return self.to_dict().items()
+
+    def values(self):
+        return self.to_dict().values()
+
+    def __iter__(self):
+        return iter(self.to_dict())
+
+    def __len__(self):
+        return (sum(1 for f in FIELDS if hasattr(self, f)) + (len(self._lazy) if self._lazy else 0)
+                + (len(self.extras) if self.extras else 0))
+
+    def copy(self):
+        """Shallow copy, like dict.copy()."""
+        clone = Paper.__new__(Paper)
+        for field in FIELDS:
+            try:
+                setattr(clone, field, getattr(self, field))
+            except AttributeError:
+                pass
+        clone.extras = dict(self.extras) if self.extras else None
+        clone._lazy = dict(self._lazy) if self._lazy else None
+        return clone
+
+    def __eq__(self, other):
+        if isinstance(other, Paper):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Paper({self.to_dict()!r})"
+
+    # Pickle support (slots without __dict__)
+    def __getstate__(self):
+        return self.to_dict()
+
+    def __setstate__(self, state):
+        self.extras = None
+        self._lazy = None
+        for key, value in state.items():
+            self[key] = value
+
+
+
+def as_paper(item):
+    """Paper for a record that may still be a plain dict (e.g. from the cache or a test double)."""
+    return item if isinstance(item, Paper) else Paper.from_dict(item)
+
+
+def json_default(obj):
+    """json.dumps(..., default=json_default) hook that serializes Paper records as dicts."""
+    if isinstance(obj, Paper):
+        return obj.to_dict()
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
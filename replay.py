@@ -0,0 +1,315 @@
+"""
+Record real API responses and replay them from a local stand-in server.
+
+ResponseRecorder hooks into a requests session and saves every successful response
+as a JSON fixture under <directory>/<host>/. ReplayServer serves those fixtures over
+HTTP with configurable latency, jitter and error rate, and ReplaySession sends the
+clients' requests (https://api.openalex.org/works?...) to it instead of the real hosts
+(http://127.0.0.1:<port>/api.openalex.org/works?...). A request is answered with the
+fixture recorded for the same method, path and parameters, else with any fixture
+recorded for that endpoint, so benchmarks can use arbitrary search terms.
+
+Usage:
+    python replay.py record "crispr screening" --dir fixtures --limit 20
+    python replay.py serve --dir fixtures --latency 0.2 --jitter 0.05 --error-rate 0.02
+"""
+import argparse
+import hashlib
+import http.server
+import io
+import json
+import os
+import random
+import sys
+import threading
+import time
+from urllib.parse import urlsplit, parse_qsl
+import requests
+from requests.adapters import HTTPAdapter
+
+# Credentials and contact parameters never take part in fixture matching
+IGNORED_PARAMS = {"api_key", "tool", "email"}
+
+
+def request_key(method, host, path, params):
+    items = sorted((k, v) for k, v in params if k not in IGNORED_PARAMS)
+    raw = json.dumps([method.upper(), host, path, items], ensure_ascii=False)
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()[:20]
+
+
+def endpoint_key(method, host, path):
+    return f"{method.upper()} {host}{path}"
+
+
+def _request_params(prepared):
+    parts = urlsplit(prepared.url)
+    params = parse_qsl(parts.query, keep_blank_values=True)
+    body = prepared.body
+    if body and "x-www-form-urlencoded" in (prepared.headers.get("Content-Type") or ""):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        params += parse_qsl(body, keep_blank_values=True)
+    return parts.hostname or "", parts.path, params
+
+
+def save_fixture(directory, method, host, path, params, status, content_type, body):
+    """Write one fixture; params=None makes it the default answer for the endpoint."""
+    folder = os.path.join(directory, host)
+    os.makedirs(folder, exist_ok=True)
+    if params is None:
+        name = "default-" + hashlib.sha1(endpoint_key(method, host, path).encode()).hexdigest()[:12]
+    else:
+        name = request_key(method, host, path, params)
+    fixture = {"method": method.upper(), "host": host, "path": path,
+               "params": None if params is None else sorted(params),
+               "status": status, "content_type": content_type, "body": body}
+    with open(os.path.join(folder, name + ".json"), "w", encoding="utf-8") as f:
+        json.dump(fixture, f, ensure_ascii=False)
+    return name
+
+
+class ResponseRecorder:
+    """Saves every successful response seen by a session as a fixture."""
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def attach(self, session):
+        session.hooks["response"].append(self._hook)
+        return session
+
+    def _hook(self, response, *args, **kwargs):
+        if not response.ok:
+            return response
+        content = response.content
+        # Streamed consumers (PubMed efetch) read response.raw; give them the buffered body
+        response.raw = io.BytesIO(content)
+        host, path, params = _request_params(response.request)
+        with self._lock:
+            save_fixture(self.directory, response.request.method, host, path, params, response.status_code,
+                         response.headers.get("Content-Type", "application/json"), content.decode("utf-8", "replace"))
+            self.count += 1
+        return response
+
+
+class ReplayServer:
+    """Threaded local HTTP server answering from recorded fixtures."""
+
+    def __init__(self, directory, latency=0.0, jitter=0.0, error_rate=0.0, error_status=500,
+                 seed=None, host="127.0.0.1", port=0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.stats = {"requests": 0, "errors": 0, "misses": 0}
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.exact, self.defaults = self._load(directory)
+        self._httpd = http.server.ThreadingHTTPServer((host, port), self._handler())
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def _load(self, directory):
+        exact, defaults = {}, {}
+        for root, _, files in os.walk(directory):
+            for name in sorted(files):
+                if not name.endswith(".json"): continue
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    fixture = json.load(f)
+                endpoint = endpoint_key(fixture["method"], fixture["host"], fixture["path"])
+                if fixture["params"] is None:
+                    defaults[endpoint] = fixture
+                else:
+                    params = [tuple(p) for p in fixture["params"]]
+                    exact[request_key(fixture["method"], fixture["host"], fixture["path"], params)] = fixture
+                    defaults.setdefault(endpoint, fixture)
+        return exact, defaults
+
+    def lookup(self, method, host, path, params):
+        fixture = self.exact.get(request_key(method, host, path, params))
+        return fixture or self.defaults.get(endpoint_key(method, host, path))
+
+    def _delay(self):
+        with self._lock:
+            jitter = self._rng.uniform(-self.jitter, self.jitter) if self.jitter else 0.0
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+        return max(0.0, self.latency + jitter), fail
+
+    def _handler(self):
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def _reply(self, status, content_type, body):
+                data = body.encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _serve(self, method):
+                parts = urlsplit(self.path)
+                host, _, path = parts.path.lstrip("/").partition("/")
+                params = parse_qsl(parts.query, keep_blank_values=True)
+                length = int(self.headers.get("Content-Length") or 0)
+                if length:
+                    params += parse_qsl(self.rfile.read(length).decode("utf-8"), keep_blank_values=True)
+
+                delay, fail = server._delay()
+                with server._lock:
+                    server.stats["requests"] += 1
+                time.sleep(delay)
+                if fail:
+                    with server._lock:
+                        server.stats["errors"] += 1
+                    return self._reply(server.error_status, "application/json", '{"error": "injected failure"}')
+                fixture = server.lookup(method, host, "/" + path, params)
+                if fixture is None:
+                    with server._lock:
+                        server.stats["misses"] += 1
+                    return self._reply(404, "application/json", '{"error": "no fixture"}')
+                self._reply(fixture["status"], fixture["content_type"], fixture["body"])
+
+            def do_GET(self):
+                self._serve("GET")
+
+            def do_POST(self):
+                self._serve("POST")
+
+        return Handler
+
+    def start(self):
+        self._thread = threading.Thread(target=self._httpd.serve_forever, name="replay-server", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class ReplaySession(requests.Session):
+    """Session that sends every request to a ReplayServer instead of the real API host."""
+
+    def __init__(self, base_url, pool_size=32):
+        super().__init__()
+        self.base_url = base_url.rstrip("/")
+        adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size)
+        self.mount("http://", adapter)
+
+    def request(self, method, url, *args, **kwargs):
+        parts = urlsplit(url)
+        local = f"{self.base_url}/{parts.hostname}{parts.path}" + (f"?{parts.query}" if parts.query else "")
+        return super().request(method, local, *args, **kwargs)
+
+
+# --- Synthetic fixtures (no recording needed) ---
+
+PUBMED_ARTICLE = (
+    "<PubmedArticle><MedlineCitation><PMID>{pmid}</PMID><Article><Journal><JournalIssue><PubDate>"
+    "<Year>{year}</Year></PubDate></JournalIssue><Title>Journal of Microbiology</Title></Journal>"
+    "<ArticleTitle>{title}</ArticleTitle><Abstract><AbstractText>{abstract}</AbstractText></Abstract>"
+    "<AuthorList><Author><LastName>Smith</LastName><Initials>J</Initials></Author></AuthorList></Article>"
+    "</MedlineCitation><PubmedData><ArticleIdList><ArticleId IdType=\"doi\">{doi}</ArticleId>"
+    "</ArticleIdList></PubmedData></PubmedArticle>"
+)
+
+
+def write_synthetic_fixtures(directory, records=20, seed=0):
+    """Default fixtures for every endpoint the five clients (and enrichment) call."""
+    rng = random.Random(seed)
+    papers = []
+    for i in range(records):
+        papers.append({"title": f"Bacterial growth study {i} of strain {rng.randint(1, 999)} under stress",
+                       "doi": f"10.1000/synthetic.{i}", "pmid": str(30000000 + i),
+                       "year": rng.randint(2015, 2024), "citations": rng.randint(0, 300),
+                       "abstract": "Growth curves of bacteria were measured under stress conditions. " * 3})
+
+    def save(host, path, body, content_type="application/json", method="GET"):
+        if not isinstance(body, str):
+            body = json.dumps(body)
+        save_fixture(directory, method, host, path, None, 200, content_type, body)
+
+    eutils = "eutils.ncbi.nlm.nih.gov"
+    save(eutils, "/entrez/eutils/esearch.fcgi", {"esearchresult": {"idlist": [p["pmid"] for p in papers]}})
+    articles = "".join(PUBMED_ARTICLE.format(**p) for p in papers)
+    save(eutils, "/entrez/eutils/efetch.fcgi", f"<?xml version=\"1.0\"?><PubmedArticleSet>{articles}</PubmedArticleSet>",
+         "text/xml")
+    save("api.semanticscholar.org", "/graph/v1/paper/search", {"data": [
+        {"title": p["title"], "year": p["year"], "abstract": p["abstract"], "citationCount": p["citations"],
+         "authors": [{"name": "J Smith"}], "externalIds": {"DOI": p["doi"]}, "journal": {"name": "J Microbiol"}}
+        for p in papers[::2]]})
+    save("www.ebi.ac.uk", "/europepmc/webservices/rest/search", {"resultList": {"result": [
+        {"id": p["pmid"], "pmid": p["pmid"], "doi": p["doi"], "title": p["title"], "abstractText": p["abstract"],
+         "authorString": "Smith J", "citedByCount": p["citations"], "journalInfo": {"yearOfPublication": str(p["year"])}}
+        for p in papers[1::2]]}})
+    save("api.openalex.org", "/works", {"results": [
+        {"display_name": p["title"], "doi": "https://doi.org/" + p["doi"], "publication_year": p["year"],
+         "cited_by_count": p["citations"], "abstract_inverted_index": {w: [i] for i, w in enumerate(p["abstract"].split()[:8])},
+         "open_access": {"oa_url": None}, "authorships": [], "primary_location": {"source": {"display_name": "OA"}}}
+        for p in papers]})
+    save("api.plos.org", "/search", {"response": {"docs": [
+        {"id": p["doi"], "title": p["title"], "abstract": [p["abstract"]], "publication_date": f"{p['year']}-01-01T00:00:00Z",
+         "author_display": ["J Smith"], "journal": "PLOS ONE"}
+        for p in papers[::3]]}})
+    return directory
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Record API responses or replay them locally.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    record = sub.add_parser("record", help="Run a live search and save every response")
+    record.add_argument("term")
+    record.add_argument("--dir", default="fixtures", help="Fixture directory")
+    record.add_argument("--sources", nargs="+", help="Sources to query (default: all)")
+    record.add_argument("--limit", type=int, default=20, help="Results per source")
+    serve = sub.add_parser("serve", help="Serve recorded fixtures")
+    serve.add_argument("--dir", default="fixtures", help="Fixture directory")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--latency", type=float, default=0.0, help="Seconds added to every response")
+    serve.add_argument("--jitter", type=float, default=0.0, help="Uniform +/- seconds around the latency")
+    serve.add_argument("--error-rate", type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    serve.add_argument("--synthetic", action="store_true", help="Write synthetic fixtures into --dir first")
+    args = parser.parse_args(argv)
+
+    if args.command == "record":
+        from http_session import create_session
+        from unified_client import UnifiedSearchManager
+        recorder = ResponseRecorder(args.dir)
+        manager = UnifiedSearchManager(session=recorder.attach(create_session()))
+        results = manager.search_all(args.term, args.sources, args.limit)
+        print(f"Recorded {recorder.count} responses ({len(results)} results) -> {args.dir}")
+        return 0
+
+    if args.synthetic:
+        write_synthetic_fixtures(args.dir)
+    server = ReplayServer(args.dir, args.latency, args.jitter, args.error_rate, port=args.port).start()
+    print(f"Replaying {len(server.exact)} recorded + {len(server.defaults)} endpoint fixtures on {server.url}")
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
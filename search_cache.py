@@ -0,0 +1,193 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, Counter
+from records import json_default
+
+# Default time-to-live (seconds) for cached source results
+DEFAULT_TTL = 6 * 3600
+
+# Per-source TTLs: curated indexes change slowly, citation-driven ones faster
+SOURCE_TTLS = {
+    "PubMed": 24 * 3600,
+    "Semantic Scholar": 12 * 3600,
+    "Europe PMC": 24 * 3600,
+    "OpenAlex": 12 * 3600,
+    "PLOS": 24 * 3600,
+    # DOI -> OpenAlex metadata used for enrichment
+    "OpenAlex DOI": 30 * 24 * 3600,
+}
+
+DEFAULT_CACHE_PATH = os.path.join(os.path.expanduser("~"), ".science_fetcher", "cache.db")
+
+
+def make_key(*parts):
+    """Build a stable string key from JSON-serializable parts."""
+    return json.dumps(parts, sort_keys=True, default=str)
+
+
+def query_key(term, start_year=None, limit=5, only_free=False):
+    """Normalize search parameters so equivalent queries share a cache entry."""
+    norm_term = " ".join(str(term or "").lower().split())
+    year = int(start_year) if start_year else None
+    return make_key(norm_term, year, int(limit), bool(only_free))
+
+
+class BaseCache:
+    """Common TTL lookup and hit/miss bookkeeping for cache backends."""
+
+    def __init__(self, max_entries=5000, ttls=None, default_ttl=DEFAULT_TTL):
+        self.max_entries = max_entries
+        self.ttls = dict(SOURCE_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.default_ttl = default_ttl
+        self.hits = Counter()
+        self.misses = Counter()
+        self._lock = threading.Lock()
+
+    def ttl_for(self, namespace):
+        return self.ttls.get(namespace, self.default_ttl)
+
+    def _record(self, namespace, hit):
+        if hit:
+            self.hits[namespace] += 1
+        else:
+            self.misses[namespace] += 1
+
+    def stats(self):
+        """Return hit/miss counters overall and per namespace."""
+        namespaces = set(self.hits) | set(self.misses)
+        return {
+            "hits": sum(self.hits.values()),
+            "misses": sum(self.misses.values()),
+            "entries": len(self),
+            "per_namespace": {
+                ns: {"hits": self.hits[ns], "misses": self.misses[ns]} for ns in sorted(namespaces)
+            },
+        }
+
+    def get(self, namespace, key):
+        raise NotImplementedError
+
+    def set(self, namespace, key, value, ttl=None):
+        raise NotImplementedError
+
+    def clear(self):
+        raise NotImplementedError
+
+    def __len__(self):
+        return 0
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache. Values are stored as JSON so callers get fresh copies."""
+
+    def __init__(self, max_entries=1000, ttls=None, default_ttl=DEFAULT_TTL):
+        super().__init__(max_entries, ttls, default_ttl)
+        self._data = OrderedDict()
+
+    def get(self, namespace, key):
+        with self._lock:
+            entry = self._data.get((namespace, key))
+            if entry is not None and entry[0] < time.time():
+                del self._data[(namespace, key)]
+                entry = None
+            if entry is None:
+                self._record(namespace, False)
+                return None
+            self._data.move_to_end((namespace, key))
+            self._record(namespace, True)
+            payload = entry[1]
+        return json.loads(payload)
+
+    def set(self, namespace, key, value, ttl=None):
+        expires = time.time() + (ttl if ttl is not None else self.ttl_for(namespace))
+        payload = json.dumps(value, default=json_default)
+        with self._lock:
+            self._data[(namespace, key)] = (expires, payload)
+            self._data.move_to_end((namespace, key))
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self):
+        return len(self._data)
+
+
+class SQLiteCache(BaseCache):
+    """Persistent cache in a single SQLite file, evicting least-recently-used rows."""
+
+    def __init__(self, path=None, max_entries=5000, ttls=None, default_ttl=DEFAULT_TTL):
+        super().__init__(max_entries, ttls, default_ttl)
+        self.path = path or DEFAULT_CACHE_PATH
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                " namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL,"
+                " expires_at REAL NOT NULL, last_access REAL NOT NULL,"
+                " PRIMARY KEY (namespace, key))"
+            )
+            self._conn.execute("CREATE INDEX IF NOT EXISTS idx_cache_access ON cache(last_access)")
+
+    def get(self, namespace, key):
+        now = time.time()
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT value, expires_at FROM cache WHERE namespace = ? AND key = ?",
+                (namespace, key),
+            ).fetchone()
+            if row is not None and row[1] < now:
+                self._conn.execute("DELETE FROM cache WHERE namespace = ? AND key = ?", (namespace, key))
+                row = None
+            if row is None:
+                self._record(namespace, False)
+                return None
+            self._conn.execute(
+                "UPDATE cache SET last_access = ? WHERE namespace = ? AND key = ?",
+                (now, namespace, key),
+            )
+            self._record(namespace, True)
+        return json.loads(row[0])
+
+    def set(self, namespace, key, value, ttl=None):
+        now = time.time()
+        expires = now + (ttl if ttl is not None else self.ttl_for(namespace))
+        payload = json.dumps(value, default=json_default)
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO cache (namespace, key, value, expires_at, last_access)"
+                " VALUES (?, ?, ?, ?, ?)",
+                (namespace, key, payload, expires, now),
+            )
+            count = self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
+            if count > self.max_entries:
+                self._conn.execute(
+                    "DELETE FROM cache WHERE rowid IN ("
+                    " SELECT rowid FROM cache ORDER BY last_access ASC LIMIT ?)",
+                    (count - self.max_entries,),
+                )
+
+    def purge_expired(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache WHERE expires_at < ?", (time.time(),))
+
+    def clear(self):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM cache")
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM cache").fetchone()[0]
@@ -0,0 +1,78 @@
+"""
+Long-lived background search worker.
+
+The GUI used to start a new thread per search, with no way to stop one. SearchWorker
+owns a single thread that runs one job at a time. Submitting a job cancels the one
+that is running and replaces any job still waiting, so a burst of searches (a user
+correcting a typo and pressing Enter again) coalesces into the latest one and only
+that one keeps using the network.
+"""
+import threading
+from cancellation import CancelToken, SearchCancelled, cancel_scope
+
+
+class SearchWorker:
+    def __init__(self, run, name="search-worker"):
+        # run(job, token) is called on the worker thread inside cancel_scope(token)
+        self._run = run
+        self._cond = threading.Condition()
+        self._pending = None
+        self._current = None
+        self._closed = False
+        self._thread = threading.Thread(target=self._loop, name=name, daemon=True)
+        self._thread.start()
+
+    def submit(self, job):
+        """Queue `job`, superseding whatever is running or waiting. Returns its CancelToken."""
+        token = CancelToken()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("SearchWorker is closed")
+            self._cancel_locked()
+            self._pending = (job, token)
+            self._cond.notify()
+        return token
+
+    def cancel(self):
+        with self._cond:
+            self._cancel_locked()
+            self._pending = None
+
+    def _cancel_locked(self):
+        for entry in (self._pending, self._current):
+            if entry is not None:
+                entry[1].cancel()
+
+    @property
+    def busy(self):
+        with self._cond:
+            return self._pending is not None or self._current is not None
+
+    def close(self, timeout=None):
+        with self._cond:
+            self._closed = True
+            self._cancel_locked()
+            self._pending = None
+            self._cond.notify()
+        self._thread.join(timeout)
+
+    def _loop(self):
+        while True:
+            with self._cond:
+                while self._pending is None and not self._closed:
+                    self._cond.wait()
+                if self._pending is None:
+                    return
+                job, token = self._current = self._pending
+                self._pending = None
+            try:
+                if not token.cancelled:
+                    with cancel_scope(token):
+                        self._run(job, token)
+            except SearchCancelled:
+                pass
+            except Exception as e:
+                print(f"Search Worker Error: {e}")
+            finally:
+                with self._cond:
+                    self._current = None
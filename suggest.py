@@ -0,0 +1,88 @@
+"""
+Search-as-you-type suggestions.
+
+SuggestionIndex holds past queries, MeSH terms / keywords and paper titles from the
+local library, each kind in a sorted list of normalized strings. A prefix lookup is a
+binary search per kind plus a scan of the matching slice (capped at MAX_SCAN entries),
+well under a millisecond for libraries of tens of thousands of records, so the GUI
+can ask on every (debounced) keystroke without going to the network.
+"""
+import bisect
+import heapq
+import threading
+from local_index import normalize_query
+
+# Suggestion kinds in the order they are offered: past queries first
+KINDS = ("query", "term", "title")
+# Shorter prefixes match too much to be useful
+MIN_PREFIX = 2
+# Upper bound on entries of one kind examined per lookup
+MAX_SCAN = 5000
+
+
+class SuggestionIndex:
+    def __init__(self):
+        # normalized text -> [display text, weight]
+        self._entries = {kind: {} for kind in KINDS}
+        self._keys = {kind: [] for kind in KINDS}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_local_index(cls, index):
+        """Build from a LocalIndex (one bulk load, sorted once per kind)."""
+        suggestions = cls()
+        for kind, rows in index.vocabulary().items():
+            entries = suggestions._entries[kind]
+            for text, weight in rows:
+                key = normalize_query(text)
+                if not key: continue
+                entry = entries.get(key)
+                if entry is None:
+                    entries[key] = [str(text).strip(), weight]
+                else:
+                    entry[1] += weight
+            suggestions._keys[kind] = sorted(entries)
+        return suggestions
+
+    def add(self, text, kind, weight=1):
+        key = normalize_query(text)
+        if not key: return
+        with self._lock:
+            entry = self._entries[kind].get(key)
+            if entry is None:
+                self._entries[kind][key] = [str(text).strip(), weight]
+                bisect.insort(self._keys[kind], key)
+            else:
+                entry[1] += weight
+
+    def add_results(self, term, results):
+        """Learn from a finished search: the query itself plus its titles and terms."""
+        self.add(term, "query")
+        for item in results:
+            self.add(item.get('title'), "title")
+            for value in list(item.get('mesh_terms') or []) + list(item.get('keywords') or []):
+                self.add(value, "term")
+
+    def suggest(self, prefix, limit=8):
+        """Up to `limit` (text, kind) pairs starting with prefix, most frequent first within each kind."""
+        key = normalize_query(prefix)
+        if len(key) < MIN_PREFIX:
+            return []
+        found = []
+        seen = set()
+        with self._lock:
+            for kind in KINDS:
+                keys = self._keys[kind]
+                entries = self._entries[kind]
+                lo = bisect.bisect_left(keys, key)
+                hi = bisect.bisect_left(keys, key + "\uffff", lo, min(len(keys), lo + MAX_SCAN))
+                for match in heapq.nlargest(limit - len(found), keys[lo:hi], key=lambda k: entries[k][1]):
+                    if match in seen: continue
+                    seen.add(match)
+                    found.append((entries[match][0], kind))
+                if len(found) >= limit:
+                    break
+        return found
+
+    def __len__(self):
+        return sum(len(keys) for keys in self._keys.values())
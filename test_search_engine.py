@@ -2,6 +2,8 @@ import pytest
 import csv
 import os
 import requests
+import datetime
+import json
 from unified_client import UnifiedSearchManager
 from ncbi_client import NCBIClient
 
@@ -156,4 +158,822 @@ def test_date_range_logic(manager, monkeypatch):
 
     monkeypatch.setattr(manager.clients["PubMed"], "search", mock_search)
     manager.search_all("test", active_sources=["PubMed"], start_year=2020)
-    assert received_year['year'] == 2020
\ No newline at end of file
+    assert received_year['year'] == 2020
+
+def test_result_cache_hit(monkeypatch):
+    """Test 11: Repeated searches are answered from the cache"""
+    from search_cache import MemoryCache
+    manager = UnifiedSearchManager(cache=MemoryCache())
+    calls = []
+    def mock_search(term, start_year=None, max_results=5, only_free=False):
+        calls.append(term)
+        return [{"title": "Cached Paper", "source": "PubMed", "citations": 3}]
+    monkeypatch.setattr(manager.clients["PubMed"], "search", mock_search)
+
+    first = manager.search_all("Gene  Editing", active_sources=["PubMed"])
+    second = manager.search_all("gene editing", active_sources=["PubMed"])
+    assert len(calls) == 1
+    assert second[0]["title"] == first[0]["title"]
+    assert manager.cache.stats()["hits"] == 1
+
+def test_sqlite_cache_ttl_and_lru(tmp_path):
+    """Test 12: SQLite cache expires entries and evicts least recently used"""
+    from search_cache import SQLiteCache
+    cache = SQLiteCache(str(tmp_path / "cache.db"), max_entries=2)
+    cache.set("PubMed", "a", [1])
+    cache.set("PubMed", "b", [2])
+    assert cache.get("PubMed", "a") == [1]
+    cache.set("PubMed", "c", [3])
+    assert cache.get("PubMed", "b") is None
+    assert cache.get("PubMed", "a") == [1]
+    cache.set("PLOS", "old", [4], ttl=-1)
+    assert cache.get("PLOS", "old") is None
+
+def test_batched_doi_enrichment(requests_mock):
+    """Test 13: Enrichment batches DOIs into one OpenAlex call and caches them"""
+    from search_cache import MemoryCache
+    manager = UnifiedSearchManager(cache=MemoryCache())
+    payload = {"results": [
+        {"doi": "https://doi.org/10.1/A", "cited_by_count": 7, "open_access": {"oa_url": "http://pdf"},
+         "abstract_inverted_index": {"long": [0], "enriched": [1], "abstract": [2], "text": list(range(3, 40))}},
+        {"doi": "https://doi.org/10.1/b", "cited_by_count": 2, "open_access": {}},
+    ]}
+    mock = requests_mock.get("https://api.openalex.org/works", json=payload)
+    items = [
+        {"title": "A", "doi": "10.1/a", "abstract": "", "citations": 0, "pdf_url": "N/A"},
+        {"title": "B", "doi": "https://doi.org/10.1/B", "abstract": "x" * 60, "citations": 0, "pdf_url": "N/A"},
+    ]
+    manager._enrich_missing_data(items)
+    assert mock.call_count == 1
+    assert "doi:10.1/a|10.1/b" in requests_mock.last_request.qs["filter"][0]
+    assert items[0]["citations"] == 7
+    assert items[0]["abstract"].endswith("[Enriched]")
+    assert items[0]["pdf_url"] == "http://pdf"
+    assert items[1]["citations"] == 2
+
+    again = [{"title": "A", "doi": "10.1/a", "abstract": "", "citations": 0, "pdf_url": "N/A"}]
+    manager._enrich_missing_data(again)
+    assert mock.call_count == 1
+    assert again[0]["citations"] == 7
+
+def test_search_all_async(manager, monkeypatch):
+    """Test 14: Async search path merges sources like search_all"""
+    import asyncio
+    monkeypatch.setattr(manager.clients["PubMed"], "search", lambda *a, **k: [{"title": "Paper A", "source": "PubMed"}])
+    monkeypatch.setattr(manager.clients["PLOS"], "search", lambda *a, **k: [{"title": "paper a", "source": "PLOS"}, {"title": "Paper B", "source": "PLOS"}])
+
+    results = asyncio.run(manager.search_all_async("paper", active_sources=["PubMed", "PLOS"]))
+    assert [r["title"] for r in results] == ["Paper A", "Paper B"]
+    assert results[0]["source"] == "PubMed"
+    manager.close()
+
+def test_clients_share_pooled_session():
+    """Test 15: All source clients reuse one keep-alive session"""
+    from http_session import get_session
+    manager = UnifiedSearchManager()
+    session = get_session()
+    assert manager.clients["PubMed"].client.session is session
+    assert all(manager.clients[n].session is session for n in ["Semantic Scholar", "Europe PMC", "OpenAlex", "PLOS"])
+
+def test_search_iter_progressive_snapshots(manager, monkeypatch):
+    """Test 16: Partial snapshots arrive before the final result"""
+    import time
+    monkeypatch.setattr(manager.clients["PubMed"], "search", lambda *a, **k: [{"title": "Fast", "source": "PubMed"}])
+    def slow(*args, **kwargs):
+        time.sleep(0.2)
+        return [{"title": "Slow", "source": "PLOS"}]
+    monkeypatch.setattr(manager.clients["PLOS"], "search", slow)
+
+    snapshots = list(manager.search_iter("fast", active_sources=["PubMed", "PLOS"]))
+    assert [r["title"] for r in snapshots[0]] == ["Fast"]
+    assert {r["title"] for r in snapshots[-1]} == {"Fast", "Slow"}
+
+    updates = []
+    final = manager.search_all("fast", active_sources=["PubMed", "PLOS"], on_update=updates.append)
+    assert len(updates) == 2
+    assert updates[-1] is final
+
+def test_source_budget_timeout_reported(manager, monkeypatch):
+    """Test 17: A hung source is abandoned after its budget and reported in meta"""
+    import time
+    monkeypatch.setattr(manager.clients["PubMed"], "search", lambda *a, **k: [{"title": "Quick", "source": "PubMed"}])
+    def hung(*args, **kwargs):
+        time.sleep(1)
+        return [{"title": "Late", "source": "PLOS"}]
+    monkeypatch.setattr(manager.clients["PLOS"], "search", hung)
+    manager.source_budgets["PLOS"] = 0.1
+
+    start = time.monotonic()
+    results = manager.search_all("quick", active_sources=["PubMed", "PLOS"])
+    assert time.monotonic() - start < 0.8
+    assert [r["title"] for r in results] == ["Quick"]
+    assert results.meta["sources"]["PLOS"]["status"] == "timeout"
+    assert results.meta["sources"]["PubMed"]["status"] == "ok"
+
+def test_circuit_breaker_skips_failing_source(manager, monkeypatch):
+    """Test 18: Repeated failures open the circuit and the source is skipped"""
+    calls = []
+    def failing(*args, **kwargs):
+        calls.append(1)
+        raise requests.exceptions.ConnectionError("down")
+    monkeypatch.setattr(manager.clients["OpenAlex"], "search", failing)
+
+    for _ in range(manager.breakers["OpenAlex"].failure_threshold):
+        results = manager.search_all("x", active_sources=["OpenAlex"])
+        assert results.meta["sources"]["OpenAlex"]["status"] == "error"
+
+    results = manager.search_all("x", active_sources=["OpenAlex"])
+    assert results.meta["sources"]["OpenAlex"]["status"] == "skipped"
+    assert "circuit open" in results.meta["sources"]["OpenAlex"]["reason"]
+    assert len(calls) == manager.breakers["OpenAlex"].failure_threshold
+
+def test_hedged_request_wins(monkeypatch):
+    """Test 19: With hedging on, a duplicate request rescues a slow first attempt"""
+    import time
+    manager = UnifiedSearchManager(hedge=True)
+    manager.source_budgets["PLOS"] = 1.0
+    attempts = []
+    def flaky(*args, **kwargs):
+        attempts.append(1)
+        if len(attempts) == 1:
+            time.sleep(0.9)
+            return []
+        return [{"title": "Hedged", "source": "PLOS"}]
+    monkeypatch.setattr(manager.clients["PLOS"], "search", flaky)
+
+    results = manager.search_all("hedged", active_sources=["PLOS"])
+    assert results[0]["title"] == "Hedged"
+    assert results.meta["sources"]["PLOS"]["hedged"] is True
+
+def test_token_bucket_throttles():
+    """Test 20: Token bucket spaces requests beyond its burst"""
+    from rate_limiter import TokenBucket, get_limiter
+    bucket = TokenBucket(rate=20, capacity=1)
+    waits = [bucket.acquire() for _ in range(3)]
+    assert waits[0] == 0
+    assert waits[1] > 0.03 and waits[2] > 0.03
+    assert get_limiter("eutils.ncbi.nlm.nih.gov", has_api_key=True).rate == 10
+    assert get_limiter("eutils.ncbi.nlm.nih.gov").rate == 3
+
+def test_retry_after_is_honored(requests_mock):
+    """Test 21: 429 responses are retried after Retry-After instead of dropping data"""
+    from http_session import create_session
+    url = "https://api.example.org/search"
+    requests_mock.get(url, [
+        {"status_code": 429, "headers": {"Retry-After": "0"}},
+        {"status_code": 200, "json": {"ok": True}},
+    ])
+    response = create_session().get(url)
+    assert response.status_code == 200
+    assert requests_mock.call_count == 2
+
+def test_batch_runner_resumes_from_checkpoint(manager, monkeypatch, tmp_path):
+    """Test 22: Batch mode streams JSONL records and skips checkpointed tasks on resume"""
+    import json
+    from batch_search import BatchRunner, read_terms
+    terms_file = tmp_path / "terms.csv"
+    terms_file.write_text("term,notes\ncrispr,a\nmalaria,b\ncrispr,dup\n", encoding="utf-8")
+    terms = read_terms(str(terms_file))
+    assert terms == ["crispr", "malaria"]
+
+    calls = []
+    def mock_search(term, start_year=None, max_results=5, only_free=False):
+        calls.append(term)
+        if term == "malaria" and len(calls) <= 2:
+            raise requests.exceptions.ConnectionError("flaky")
+        return [{"title": f"{term} paper", "source": "PubMed", "year": "2020.0"}]
+    monkeypatch.setattr(manager.clients["PubMed"], "search", mock_search)
+
+    out = tmp_path / "out.jsonl"
+    stats = BatchRunner(manager, str(out), sources=["PubMed"], max_workers=1).run(terms)
+    assert stats["done"] == 1 and stats["failed"] == 1
+
+    stats = BatchRunner(manager, str(out), sources=["PubMed"], max_workers=1).run(terms)
+    assert stats["skipped_done"] == 1 and stats["done"] == 1
+    records = [json.loads(line) for line in out.read_text(encoding="utf-8").splitlines()]
+    assert sorted(r["query"] for r in records) == ["crispr", "malaria"]
+    assert records[0]["year"] == "2020"
+
+def test_ncbi_history_paged_fetch(ncbi_client, requests_mock):
+    """Test 23: History-server search pages efetch with retstart/retmax over POST"""
+    base = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils"
+    requests_mock.post(f"{base}/esearch.fcgi", json={"esearchresult": {"count": "5", "webenv": "WE1", "querykey": "1"}})
+    from urllib.parse import parse_qs
+    def page(request, context):
+        form = parse_qs(request.text)
+        start = int(form["retstart"][0])
+        size = int(form["retmax"][0])
+        articles = "".join(
+            f"<PubmedArticle><MedlineCitation><PMID>{i}</PMID><Article><ArticleTitle>T{i}</ArticleTitle></Article></MedlineCitation></PubmedArticle>"
+            for i in range(start, start + size))
+        return f"<PubmedArticleSet>{articles}</PubmedArticleSet>"
+    efetch = requests_mock.post(f"{base}/efetch.fcgi", text=page)
+
+    records = list(ncbi_client.iter_search("crispr", batch_size=2))
+    assert [r["pmid"] for r in records] == ["0", "1", "2", "3", "4"]
+    assert efetch.call_count == 3
+    assert parse_qs(efetch.last_request.text)["WebEnv"] == ["WE1"]
+
+def test_ncbi_large_id_list_uses_post(ncbi_client, requests_mock):
+    """Test 24: Long ID lists are fetched with POST instead of a huge GET"""
+    efetch = requests_mock.post("https://eutils.ncbi.nlm.nih.gov/entrez/eutils/efetch.fcgi", text="<PubmedArticleSet/>")
+    ncbi_client.fetch_details([str(i) for i in range(ncbi_client.GET_ID_LIMIT + 1)])
+    assert efetch.call_count == 1
+    assert "id=0%2C1%2C2" in efetch.last_request.text
+
+def test_streaming_pubmed_parser():
+    """Test 25: iterparse parser yields records lazily and handles nested markup"""
+    import io
+    from ncbi_client import iter_parse_articles
+    xml = b"""<PubmedArticleSet>
+    <PubmedArticle><MedlineCitation><PMID>7</PMID><Article><Journal><Title>J</Title>
+    <JournalIssue><PubDate><MedlineDate>2019 Jan-Feb</MedlineDate></PubDate></JournalIssue></Journal>
+    <ArticleTitle>Role of <i>TP53</i> in repair</ArticleTitle></Article></MedlineCitation></PubmedArticle>
+    <PubmedArticle><MedlineCitation><PMID>8</PMID><Article><ArticleTitle>Second</ArticleTitle></Article></MedlineCitation></PubmedArticle>
+    </PubmedArticleSet>"""
+    records = iter_parse_articles(io.BytesIO(xml))
+    first = next(records)
+    assert first["title"] == "Role of TP53 in repair"
+    assert first["year"] == "2019 Jan-Feb"
+    assert first["journal"] == "J"
+    assert next(records)["pmid"] == "8"
+
+def test_pubmed_identifiers_and_mesh():
+    """Test 26: PubMed records carry DOI, PMCID, MeSH, keywords and publication types"""
+    import io
+    from ncbi_client import iter_parse_articles
+    xml = b"""<PubmedArticleSet><PubmedArticle><MedlineCitation><PMID>9</PMID>
+    <Article><ArticleTitle>T</ArticleTitle><ELocationID EIdType="doi">10.9/eloc</ELocationID>
+    <PublicationTypeList><PublicationType>Journal Article</PublicationType><PublicationType>Review</PublicationType></PublicationTypeList></Article>
+    <MeshHeadingList><MeshHeading><DescriptorName UI="D1">DNA Repair</DescriptorName></MeshHeading></MeshHeadingList>
+    <KeywordList><Keyword>p53</Keyword></KeywordList></MedlineCitation>
+    <PubmedData><ArticleIdList><ArticleId IdType="pubmed">9</ArticleId><ArticleId IdType="doi">10.9/Real</ArticleId>
+    <ArticleId IdType="pmc">PMC99</ArticleId></ArticleIdList></PubmedData></PubmedArticle></PubmedArticleSet>"""
+    record = next(iter_parse_articles(io.BytesIO(xml)))
+    assert record["doi"] == "10.9/Real"
+    assert record["pmcid"] == "PMC99"
+    assert record["mesh_terms"] == ["DNA Repair"]
+    assert record["keywords"] == ["p53"]
+    assert record["publication_types"] == ["Journal Article", "Review"]
+
+def test_dedup_links_records_by_identifier(manager):
+    """Test 27: Records with different titles but the same DOI/PMID are merged"""
+    pubmed = {"title": "DNA repair in yeast", "source": "PubMed", "doi": "10.9/Real", "pmid": "9"}
+    openalex = {"title": "DNA repair in yeast cells.", "source": "OpenAlex", "doi": "https://doi.org/10.9/real"}
+    europe = {"title": "Yeast DNA repair", "source": "EuropePMC", "pmid": "9"}
+    res = manager._merge_and_deduplicate([openalex, europe, pubmed])
+    assert len(res) == 1
+    assert res[0]["source"] == "PubMed"
+
+def test_dedup_merges_near_duplicate_fields(manager):
+    """Test 28: Near-duplicate titles are merged and keep the best fields"""
+    openalex = {"title": "CRISPR-Cas9 screens reveal regulators of T cell exhaustion", "source": "OpenAlex",
+                "doi": "10.1/x", "citations": 120, "abstract": "A" * 300, "pdf_url": "http://oa.pdf", "year": "2021"}
+    plos = {"title": "CRISPR/Cas9 screens reveal regulators of T-cell exhaustion.", "source": "PLOS",
+            "citations": 0, "abstract": "N/A", "pdf_url": "N/A", "year": "2021"}
+    pubmed = {"title": "Crispr cas9 screens reveal new regulators of T cell exhaustion", "source": "PubMed",
+              "citations": 0, "abstract": "No Abstract Available.", "pdf_url": "Check Link", "year": "2022"}
+    other = {"title": "CRISPR screens reveal regulators of B cell activation", "source": "PLOS", "year": "2021"}
+
+    res = manager._merge_and_deduplicate([plos, openalex, other, pubmed])
+    assert len(res) == 2
+    kept = res[0]
+    assert kept["source"] == "PubMed"
+    assert kept["citations"] == 120
+    assert kept["abstract"] == "A" * 300
+    assert kept["pdf_url"] == "http://oa.pdf"
+    assert kept["doi"] == "10.1/x"
+    assert kept["merged_sources"] == ["OpenAlex", "PLOS"]
+    assert res[1]["title"] == other["title"]
+
+def test_bm25_whole_word_ranking(manager):
+    """Test 29: BM25 matches whole words and favors title hits"""
+    papers = [
+        {"title": "General theory of relativity", "abstract": "Physics.", "source": "OpenAlex"},
+        {"title": "Gene regulation in yeast", "abstract": "We study gene networks.", "source": "OpenAlex"},
+        {"title": "Yeast metabolism", "abstract": "A gene is mentioned once.", "source": "OpenAlex"},
+    ]
+    manager.rank_results(papers, "gene")
+    scores = [p["relevance_score"] for p in papers]
+    assert scores[0] == 0
+    assert scores[1] > scores[2] > 0
+    assert manager.calculate_score({"title": "x", "source": "Europe PMC"}, "gene") == 2000
+    assert manager.calculate_score({"title": "x", "source": "EuropePMC"}, "gene") == 2000
+
+def test_local_index_offline_and_local_first(monkeypatch, tmp_path):
+    """Test 30: Fetched records are indexed locally and answer offline / local_first searches"""
+    from local_index import LocalIndex
+    index = LocalIndex(str(tmp_path / "library.db"))
+    manager = UnifiedSearchManager(local_index=index)
+    calls = []
+
+    def mock_search(term, start_year=None, max_results=5, only_free=False):
+        calls.append(term)
+        return [{"title": "Phage therapy against resistant bacteria", "source": "OpenAlex", "year": "2021",
+                 "abstract": "Bacteriophages lyse multidrug resistant strains." * 3, "citations": 4,
+                 "doi": "10.1/phage", "url": "u", "pdf_url": "N/A"}]
+    monkeypatch.setattr(manager.clients["OpenAlex"], "search", mock_search)
+
+    manager.search_all("phage therapy", active_sources=["OpenAlex"], start_year=2015)
+    assert index.count() == 1
+
+    offline = manager.search_all("resistant AND bacteriophages", active_sources=["OpenAlex"], mode="offline")
+    assert [p["doi"] for p in offline] == ["10.1/phage"]
+    assert offline.meta["sources"]["OpenAlex"]["status"] == "local"
+
+    local = manager.search_all("Phage  Therapy", active_sources=["OpenAlex"], start_year=2018, mode="local_first")
+    assert len(local) == 1 and calls == ["phage therapy"]
+    # An older year window than the one fetched is not covered, so it goes remote
+    manager.search_all("phage therapy", active_sources=["OpenAlex"], start_year=2010, mode="local_first")
+    assert len(calls) == 2
+    index.close()
+
+def test_watch_refresh_fetches_only_new(monkeypatch, tmp_path):
+    """Test 31: Watch refreshes pass a per-source since date and report only new papers"""
+    from watch import WatchStore
+    manager = UnifiedSearchManager()
+    store = WatchStore(str(tmp_path / "watch.db"), overlap_days=7)
+    store.add("phage", "phage therapy", ["Europe PMC"], start_year=2015, max_results=10)
+    old = {"title": "Phage therapy in mice", "source": "EuropePMC", "doi": "10.1/old", "citations": 1}
+    new = {"title": "Phage cocktails for Klebsiella", "source": "EuropePMC", "doi": "10.1/new", "citations": 0}
+    calls = []
+
+    def mock_search(term, start_year=None, max_results=5, only_free=False, since=None):
+        calls.append(since)
+        if since is None:
+            return [dict(old)]
+        return [dict(old, citations=9), dict(new)]
+    monkeypatch.setattr(manager.clients["Europe PMC"], "search", mock_search)
+
+    first = store.refresh(manager, "phage")
+    assert calls == [None] and len(first["new"]) == 1
+    mark = store.high_water("phage")["Europe PMC"]
+
+    second = store.refresh(manager, "phage")
+    expected = (datetime.date.fromisoformat(mark) - datetime.timedelta(days=7)).isoformat()
+    assert calls[1] == expected
+    assert [p["doi"] for p in second["new"]] == ["10.1/new"]
+    papers = store.papers("phage")
+    assert len(papers) == 2
+    assert next(p for p in papers if p["doi"] == "10.1/old")["citations"] == 9
+    store.close()
+
+def test_europe_pmc_since_filter(requests_mock):
+    """Test 32: Europe PMC refreshes filter on the first index date"""
+    from unified_client import EuropePmcClient
+    requests_mock.get("https://www.ebi.ac.uk/europepmc/webservices/rest/search", json={"resultList": {"result": []}})
+    EuropePmcClient().search("phage", start_year=2020, since="2024-01-01")
+    assert "first_idate:[2024-01-01 to" in requests_mock.last_request.qs["query"][0]
+
+def test_client_pagination(requests_mock):
+    """Test 33: Clients page with offsets (in parallel) and cursors up to the requested count"""
+    from unified_client import SemanticScholarClient, OpenAlexClient
+
+    def s2_page(request, context):
+        offset, limit = int(request.qs["offset"][0]), int(request.qs["limit"][0])
+        return {"data": [{"title": f"Paper {i}", "authors": []} for i in range(offset, min(offset + limit, 250))]}
+    requests_mock.get("https://api.semanticscholar.org/graph/v1/paper/search", json=s2_page)
+    # A plain session skips the 1 req/s Semantic Scholar limiter
+    papers = list(SemanticScholarClient(requests.Session()).iter_search("x", max_results=1000))
+    assert [p["title"] for p in papers] == [f"Paper {i}" for i in range(250)]
+
+    def oa_page(request, context):
+        cursor = request.qs["cursor"][0]
+        start = 0 if cursor == "*" else int(cursor)
+        results = [{"display_name": f"Work {i}"} for i in range(start, start + int(request.qs["per-page"][0]))]
+        return {"results": results, "meta": {"next_cursor": str(start + len(results))}}
+    mock = requests_mock.get("https://api.openalex.org/works", json=oa_page)
+    works = OpenAlexClient().search("x", max_results=450)
+    assert len(works) == 450 and works[-1]["title"] == "Work 449"
+    assert [r.qs["per-page"][0] for r in mock.request_history] == ["200", "200", "50"]
+
+def test_paper_record_dict_compat(manager, monkeypatch):
+    """Test 34: Paper records behave like dicts through the pipeline and serialize to JSON"""
+    import json
+    from records import Paper, json_default
+    paper = Paper.from_dict({"title": "T", "source": "PLOS", "citations": 3})
+    paper["query"] = "q"
+    assert paper["title"] == "T" and paper.get("doi") is None and "doi" not in paper
+    assert dict(paper) == {"title": "T", "source": "PLOS", "citations": 3, "query": "q"}
+    assert paper.setdefault("merged_sources", []) == [] and paper == paper.copy()
+    with pytest.raises(KeyError):
+        paper["pmid"]
+
+    monkeypatch.setattr(manager.clients["PLOS"], "search", lambda *a, **k: [{"title": "Yeast genes", "source": "PLOS", "citations": None}])
+    results = manager.search_all("yeast", active_sources=["PLOS"])
+    assert isinstance(results[0], Paper) and results[0]["citations"] == 0
+    assert json.loads(json.dumps(results, default=json_default))[0]["title"] == "Yeast genes"
+
+def test_jsonl_export_streams_and_keeps_types(manager, tmp_path):
+    """Test 35: JSON Lines export takes a generator and loads back with typed fields"""
+    from exporters import load_records
+    path = str(tmp_path / "out.jsonl")
+    records = ({"title": f"P{i}", "citations": i, "mesh_terms": ["Yeast"], "source": "PubMed"} for i in range(3))
+    assert manager.save_to_jsonl(records, path)
+    loaded = list(load_records(path))
+    assert [p["citations"] for p in loaded] == [0, 1, 2]
+    assert loaded[0]["mesh_terms"] == ["Yeast"]
+
+def test_parquet_export_typed_columns(tmp_path):
+    """Test 36: Parquet export writes typed columns in row groups"""
+    pq = pytest.importorskip("pyarrow.parquet")
+    from exporters import export_parquet
+    path = str(tmp_path / "out.parquet")
+    rows = [{"title": f"P{i}", "year": "2021", "citations": i, "authors": "Smith J, Doe A"} for i in range(5)]
+    assert export_parquet(iter(rows), path, batch_size=2) == 5
+    table = pq.read_table(path)
+    assert table.column("year").to_pylist() == [2021] * 5
+    assert table.column("authors").to_pylist()[0] == ["Smith J", "Doe A"]
+    assert pq.ParquetFile(path).num_row_groups == 3
+    from exporters import export_jsonl, load_records
+    jsonl_path = str(tmp_path / "out.jsonl")
+    export_jsonl(rows, jsonl_path)
+    loaded = list(load_records(path))
+    assert loaded[0]["authors"] == "Smith J, Doe A" and loaded[0]["year"] == "2021"
+    assert [p.to_dict() for p in loaded] == [p.to_dict() for p in load_records(jsonl_path)]
+
+def test_replay_server_end_to_end(tmp_path):
+    """Test 37: search_all runs end to end against replayed fixtures, including injected errors"""
+    from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+    fixtures = write_synthetic_fixtures(str(tmp_path), records=6)
+    with ReplayServer(fixtures) as server:
+        manager = UnifiedSearchManager(session=ReplaySession(server.url))
+        results = manager.search_all("bacterial growth", limit_per_source=6)
+        assert {info["status"] for info in results.meta["sources"].values()} == {"ok"}
+        assert len(results) == 6
+        assert server.stats["misses"] == 0
+        manager.close()
+    with ReplayServer(fixtures, error_rate=1.0) as server:
+        manager = UnifiedSearchManager(session=ReplaySession(server.url))
+        results = manager.search_all("bacterial growth", active_sources=["OpenAlex"])
+        assert results.meta["sources"]["OpenAlex"]["status"] == "error"
+        manager.close()
+
+def test_search_stats_per_stage_and_source(tmp_path):
+    """Test 38: search_all attaches per-stage and per-source timings, bytes and cache counts"""
+    from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+    from search_cache import MemoryCache
+    fixtures = write_synthetic_fixtures(str(tmp_path), records=4)
+    with ReplayServer(fixtures) as server:
+        manager = UnifiedSearchManager(cache=MemoryCache(), session=ReplaySession(server.url))
+        stats = manager.search_all("growth", active_sources=["PubMed", "OpenAlex"]).stats
+        assert set(stats.stages) >= {"fanout", "merge", "enrich", "score", "sort", "total"}
+        assert stats.sources["PubMed"]["requests"] == 2 and stats.sources["PubMed"]["bytes"] > 0
+        assert stats.sources["OpenAlex"]["status"] == "ok" and stats.sources["OpenAlex"]["count"] == 4
+        assert stats.cache["misses"] >= 2
+        again = manager.search_all("growth", active_sources=["PubMed", "OpenAlex"]).stats
+        assert again.cache["hits"] >= 2 and again.total_bytes == 0
+        assert 'science_fetcher_source_bytes{source="PubMed"}' in stats.to_prometheus()
+        assert "total" in json.loads(stats.to_json())["stages"]
+        manager.close()
+
+def test_openalex_abstract_reconstruction_and_lazy(requests_mock):
+    """Test 39: Abstracts are rebuilt in position order, eagerly or on first access"""
+    from unified_client import OpenAlexClient, reconstruct_abstract
+    index = {"growth": [2], "Bacterial": [0], "rapid": [1, 4], "is": [3]}
+    assert reconstruct_abstract(index) == "Bacterial rapid growth is rapid"
+    assert reconstruct_abstract({}) is None
+
+    work = {"display_name": "W", "abstract_inverted_index": index}
+    requests_mock.get("https://api.openalex.org/works", json={"results": [work], "meta": {}})
+    lazy = OpenAlexClient(lazy_abstracts=True).search("x")[0]
+    assert lazy._lazy and "abstract" in lazy
+    assert lazy["abstract"] == "Bacterial rapid growth is rapid" and not lazy._lazy
+    assert OpenAlexClient().search("x")[0]["abstract"] == "Bacterial rapid growth is rapid"
+
+def test_search_all_cancel_token(tmp_path):
+    """Test 40: Cancelling a search stops it without waiting for slow sources"""
+    import threading
+    import time
+    from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+    from cancellation import CancelToken, SearchCancelled, cancel_scope, check_cancelled
+    fixtures = write_synthetic_fixtures(str(tmp_path), records=4)
+    with ReplayServer(fixtures, latency=1.0) as server:
+        manager = UnifiedSearchManager(session=ReplaySession(server.url))
+        token = CancelToken()
+        threading.Timer(0.1, token.cancel).start()
+        started = time.monotonic()
+        with pytest.raises(SearchCancelled):
+            manager.search_all("growth", active_sources=["OpenAlex", "PLOS"], cancel=token)
+        assert time.monotonic() - started < 0.8
+        manager.close()
+    with cancel_scope(token), pytest.raises(SearchCancelled):
+        check_cancelled()
+    check_cancelled()
+
+def test_search_worker_coalesces_jobs():
+    """Test 41: The search worker cancels the running job and only runs the latest queued one"""
+    import threading
+    import time
+    from search_worker import SearchWorker
+    from cancellation import check_cancelled
+    started, finished = [], []
+    release = threading.Event()
+
+    def run(job, token):
+        started.append(job)
+        while not release.wait(0.01):
+            check_cancelled()
+        check_cancelled()
+        finished.append(job)
+
+    worker = SearchWorker(run)
+    first = worker.submit("a")
+    while not started: time.sleep(0.01)
+    worker.submit("b")
+    worker.submit("c")
+    release.set()
+    deadline = time.monotonic() + 2
+    while not finished and time.monotonic() < deadline: time.sleep(0.01)
+    worker.close(timeout=2)
+    assert first.cancelled
+    assert started == ["a", "c"] and finished == ["c"]
+
+def test_typeahead_suggestions_from_library(tmp_path):
+    """Test 42: Typeahead suggests past queries, MeSH terms and titles from the local library"""
+    from local_index import LocalIndex
+    from suggest import SuggestionIndex
+    index = LocalIndex(str(tmp_path / "library.db"))
+    records = [{"title": "Bacterial growth curves", "source": "PubMed", "pmid": "1", "mesh_terms": ["Bacteria", "Bacterial Physiological Phenomena"]},
+               {"title": "Phage therapy", "source": "PubMed", "pmid": "2", "mesh_terms": ["Bacteria"], "keywords": ["bacteriophage"]}]
+    index.add(records, "PubMed", term="Bacterial growth")
+    suggestions = SuggestionIndex.from_local_index(index)
+    assert suggestions.suggest("b") == []
+    found = suggestions.suggest("BACT")
+    assert found[0] == ("bacterial growth", "query")
+    assert found[1] == ("Bacteria", "term")
+    assert ("Bacterial growth curves", "title") in found and ("bacteriophage", "term") in found
+    assert suggestions.suggest("bact", limit=2) == found[:2]
+
+    suggestions.add_results("phage lysis", [{"title": "Phage lysis kinetics", "mesh_terms": None}])
+    assert [kind for _, kind in suggestions.suggest("phage")] == ["query", "title", "title"]
+    index.close()
+
+def test_import_defers_http_stack():
+    """Test 43: Importing the engine and creating a manager does not import requests or build clients"""
+    import subprocess
+    import sys
+    code = (
+        "import sys\n"
+        "from unified_client import UnifiedSearchManager, SOURCE_NAMES\n"
+        "manager = UnifiedSearchManager()\n"
+        "assert list(manager.clients) == list(SOURCE_NAMES) and manager.clients.built() == []\n"
+        "assert not {'requests', 'asyncio', 'concurrent.futures'} & set(sys.modules), sys.modules.keys()\n"
+        "manager.clients['OpenAlex']\n"
+        "assert manager.clients.built() == ['OpenAlex'] and 'requests' in sys.modules\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], cwd=os.path.dirname(os.path.abspath(__file__)),
+                          capture_output=True, text=True)
+    assert proc.returncode == 0, proc.stderr
+
+def test_api_server_and_cli_against_replay(tmp_path, capsys):
+    """Test 44: The JSON API and the headless CLI run searches through one shared manager"""
+    import urllib.error
+    import urllib.request
+    import cli
+    from api_server import SearchApiServer
+    from replay import ReplayServer, ReplaySession, write_synthetic_fixtures
+    fixtures = write_synthetic_fixtures(str(tmp_path), records=4)
+    with ReplayServer(fixtures) as replay:
+        manager = UnifiedSearchManager(session=ReplaySession(replay.url))
+        with SearchApiServer(manager, port=0) as api:
+            health = json.loads(urllib.request.urlopen(api.url + "/health").read())
+            assert health["status"] == "ok" and "PubMed" in health["sources"]
+            request = urllib.request.Request(api.url + "/search", json.dumps({"term": "growth", "sources": ["OpenAlex"]}).encode())
+            body = json.loads(urllib.request.urlopen(request).read())
+            assert len(body["results"]) == 4 and body["meta"]["sources"]["OpenAlex"]["status"] == "ok"
+            assert "fanout" in body["stats"]["stages"]
+            with pytest.raises(urllib.error.HTTPError) as bad:
+                urllib.request.urlopen(api.url + "/search?term=growth&sources=Nope")
+            assert bad.value.code == 400 and "Nope" in json.loads(bad.value.read())["error"]
+            assert api.stats["searches"] == 1 and api.stats["errors"] == 1
+        manager.close()
+
+        assert cli.main(["search", "growth", "--sources", "PLOS", "--limit", "2", "--json",
+                         "--no-cache", "--no-library", "--replay", replay.url]) == 0
+        printed = json.loads(capsys.readouterr().out)
+        assert len(printed["results"]) == 2 and printed["meta"]["sources"]["PLOS"]["status"] == "ok"
+
+def test_circuit_breaker_recovers_after_cut_trial(manager, monkeypatch):
+    """Test 45: A half-open trial cut by the deadline or cancelled does not leave the source skipped"""
+    import threading
+    import time
+    from cancellation import CancelToken, SearchCancelled
+    breaker = manager.breakers["OpenAlex"]
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure("down")
+    breaker.cooldown = 0.0
+    assert breaker.state == "half-open"
+
+    def slow(*args, **kwargs):
+        time.sleep(0.3)
+        return []
+    monkeypatch.setattr(manager.clients["OpenAlex"], "search", slow)
+    results = manager.search_all("x", active_sources=["OpenAlex"], deadline=0.1)
+    assert results.meta["sources"]["OpenAlex"]["status"] == "deadline"
+
+    token = CancelToken()
+    threading.Timer(0.05, token.cancel).start()
+    with pytest.raises(SearchCancelled):
+        manager.search_all("x", active_sources=["OpenAlex"], cancel=token)
+
+    monkeypatch.setattr(manager.clients["OpenAlex"], "search", lambda *a, **k: [{"title": "Back", "source": "OpenAlex"}])
+    results = manager.search_all("x", active_sources=["OpenAlex"])
+    assert results.meta["sources"]["OpenAlex"]["status"] == "ok"
+    assert breaker.state == "closed"
+
+def test_local_index_keeps_every_source_of_a_paper(tmp_path):
+    """Test 46: A paper returned by two sources stays searchable under both"""
+    from local_index import LocalIndex
+    index = LocalIndex(str(tmp_path / "library.db"))
+    paper = {"title": "Phage therapy trial", "doi": "10.1/phage", "year": "2021"}
+    index.add([dict(paper, source="PubMed")], "PubMed", term="phage therapy")
+    index.add([dict(paper, source="OpenAlex")], "OpenAlex", term="phage therapy")
+    assert index.count() == 1
+    assert index.covered("phage therapy", "PubMed")
+    assert len(index.search("phage therapy", ["PubMed"])) == 1
+    assert len(index.search("phage therapy", ["OpenAlex"])) == 1
+    assert index.search("phage therapy", ["PLOS"]) == []
+    index.close()
+
+def test_offline_mode_ignores_since_for_network(monkeypatch, tmp_path):
+    """Test 47: Offline searches with a since date are answered locally and send no requests"""
+    from local_index import LocalIndex
+    index = LocalIndex(str(tmp_path / "library.db"))
+    index.add([{"title": "Phage lysis kinetics", "source": "PLOS", "doi": "10.1/lysis"}], "PLOS", term="phage lysis")
+    manager = UnifiedSearchManager(local_index=index)
+    calls = []
+    monkeypatch.setattr(manager.clients["PLOS"], "search", lambda *a, **k: calls.append(k) or [])
+    results = manager.search_all("phage lysis", active_sources=["PLOS"], mode="offline", since="2024-01-01")
+    assert calls == []
+    assert results.meta["sources"]["PLOS"]["status"] == "local" and len(results) == 1
+    index.close()
+
+def test_post_with_api_key_uses_keyed_bucket(requests_mock, monkeypatch):
+    """Test 48: POSTed E-utilities calls carrying api_key are throttled by the keyed bucket"""
+    from http_session import create_session
+    from rate_limiter import get_limiter
+    used = []
+    for keyed in (False, True):
+        limiter = get_limiter("eutils.ncbi.nlm.nih.gov", has_api_key=keyed)
+        monkeypatch.setattr(limiter, "acquire", lambda keyed=keyed: used.append(keyed))
+    url = "https://eutils.ncbi.nlm.nih.gov/entrez/eutils/esearch.fcgi"
+    requests_mock.post(url, text="ok")
+    requests_mock.get(url, text="ok")
+    session = create_session()
+    session.post(url, data={"db": "pubmed", "api_key": "secret"})
+    session.post(url, data=[("db", "pubmed"), ("api_key", "secret")])
+    session.get(url, params={"api_key": "secret"})
+    session.post(url, data={"db": "pubmed"})
+    assert used == [True, True, True, False]
+
+def test_manager_passes_ncbi_api_key(monkeypatch):
+    """Test 49: The NCBI API key reaches PubMed from the manager or the NCBI_API_KEY variable"""
+    monkeypatch.delenv("NCBI_API_KEY", raising=False)
+    assert UnifiedSearchManager(api_key="secret").clients["PubMed"].client._get_base_params()["api_key"] == "secret"
+    assert "api_key" not in UnifiedSearchManager().clients["PubMed"].client._get_base_params()
+    monkeypatch.setenv("NCBI_API_KEY", "from-env")
+    assert UnifiedSearchManager().clients["PubMed"].client.api_key == "from-env"
+
+def test_dedup_keeps_same_title_papers_with_different_ids():
+    """Test 50: Records sharing a generic title but not their DOI or year stay separate"""
+    from dedup import DedupEngine
+    engine = DedupEngine(["PubMed", "OpenAlex"])
+    merged = engine.merge([
+        {"title": "Correction", "doi": "10.1/a", "year": "2020", "source": "PubMed"},
+        {"title": "Correction", "doi": "10.1/b", "year": "2020", "source": "OpenAlex"},
+        {"title": "Correction", "year": "2023", "source": "OpenAlex"},
+        {"title": "Correction", "doi": "10.1/a", "year": "2020", "source": "OpenAlex"},
+    ])
+    assert [(p.get("doi"), p.get("year")) for p in merged] == [("10.1/a", "2020"), ("10.1/b", "2020"), (None, "2023")]
+    title = "Long read sequencing of bacterial genomes in clinical isolates"
+    merged = engine.merge([
+        {"title": title, "pmid": "111", "source": "PubMed"},
+        {"title": title + ".", "pmid": "222", "source": "OpenAlex"},
+        {"title": title, "source": "OpenAlex"},
+    ])
+    assert len(merged) == 2
+
+def test_query_term_index_matches_full_index():
+    """Test 51: Query-restricted term counts equal full tokenization, across repeats, punctuation and accents"""
+    from ranking import TermIndex
+    docs = [
+        {"title": "Gene gene gene", "abstract": "(gene), genes; general gene_x x-gene"},
+        {"title": None, "abstract": "Über die Gene in Hefe: über gene"},
+        {"title": "gene", "abstract": "gene"},
+        {},
+        {"title": "Yeast", "abstract": "yeast yeast. Yeast-cell gene gene gene gene"},
+    ]
+    docs.append({"title": "Café culture", "abstract": "A naïve résumé of Straße names"})
+    terms = ["gene", "yeast", "über", "x", "café", "naïve", "caf", "ve", "stra", "r", "sum"]
+    full = TermIndex(docs)
+    restricted = TermIndex(docs, terms=terms)
+    for term in terms:
+        assert restricted.postings.get(term, []) == full.postings.get(term, []), term
+    # Accented letters are part of the word, not a word break
+    for fragment in ("caf", "ve", "stra", "r", "sum"):
+        assert fragment not in restricted.postings, fragment
+    assert restricted.postings["café"] == [(5, 3.0)]
+    assert restricted.postings["naïve"] == [(5, 1)]
+
+def test_paper_mutable_mapping_methods():
+    """Test 52: Paper supports the full MutableMapping API and stays slot-only"""
+    from collections.abc import MutableMapping
+    from records import Paper
+    paper = Paper(title="Phage", doi="10.1/p", query="phage")
+    paper.defer("abstract", str.upper, "lysis")
+    assert isinstance(paper, MutableMapping) and not hasattr(paper, "__dict__")
+    assert paper.pop("doi") == "10.1/p" and "doi" not in paper
+    assert paper.pop("missing", None) is None
+    assert paper.pop("abstract") == "LYSIS"
+    assert paper.setdefault("year", "2020") == "2020"
+    key, value = paper.popitem()
+    assert key not in paper and len(paper) == 2
+    paper.clear()
+    assert paper == {} and len(paper) == 0
+
+def test_offset_pages_share_one_pool():
+    """Test 53: Offset pagination reuses one page pool across searches, including early stops"""
+    import pagination
+    fetch = lambda offset, size: [offset + i for i in range(size)]
+    assert list(pagination.iter_offset_pages(fetch, 50, 10)) == list(range(50))
+    pool = pagination.get_executor()
+    pages = pagination.iter_offset_pages(fetch, 50, 10)
+    assert next(pages) == 0
+    pages.close()
+    assert list(pagination.iter_offset_pages(fetch, 30, 10)) == list(range(30))
+    assert pagination.get_executor() is pool
+    assert len(pool._threads) <= pagination.PAGE_POOL_SIZE
+
+def test_doi_lookup_batches_run_in_calling_thread(manager, monkeypatch):
+    """Test 54: DOI enrichment fetches its batches in the pooled task itself, without a pool of its own"""
+    import threading
+    from unified_client import ENRICH_BATCH_SIZE
+    threads = []
+
+    def fetch(batch):
+        threads.append(threading.current_thread())
+        return {doi: {"cited_by_count": 1} for doi in batch}
+
+    monkeypatch.setattr(manager, "_fetch_doi_batch", fetch)
+    dois = [f"10.1/{i}" for i in range(2 * ENRICH_BATCH_SIZE + 1)]
+    metadata = manager._lookup_dois(dois)
+    assert len(metadata) == len(dois)
+    assert threads == [threading.current_thread()] * 3
+
+def test_search_all_async_cancels_worker_threads(monkeypatch):
+    """Test 55: Cancelling an async search stops its worker threads; since and cancel work like search_all"""
+    import asyncio
+    import threading
+    import cancellation
+    from cancellation import CancelToken, SearchCancelled
+    manager = UnifiedSearchManager()
+    started, stopped, seen = threading.Event(), threading.Event(), []
+
+    def slow_search(*args, **kwargs):
+        started.set()
+        try:
+            while True:
+                cancellation.sleep(0.01)
+        finally:
+            stopped.set()
+
+    monkeypatch.setattr(manager.clients["PLOS"], "search", slow_search)
+    monkeypatch.setattr(manager.clients["PubMed"], "search", lambda *a, **k: seen.append(k.get("since")) or [])
+
+    async def cancel_after_start():
+        task = asyncio.ensure_future(manager.search_all_async("phage", active_sources=["PLOS"], deadline=30))
+        await asyncio.get_running_loop().run_in_executor(None, started.wait, 5)
+        task.cancel()
+        try:
+            await task
+        except asyncio.CancelledError:
+            pass
+
+    asyncio.run(cancel_after_start())
+    assert stopped.wait(2)
+
+    asyncio.run(manager.search_all_async("phage", active_sources=["PubMed"], since={"PubMed": "2024-01-01"}))
+    assert seen == ["2024-01-01"]
+    token = CancelToken()
+    token.cancel()
+    with pytest.raises(SearchCancelled):
+        asyncio.run(manager.search_all_async("phage", active_sources=["PubMed"], cancel=token))
+    manager.close()
+
+def test_api_rejects_bad_since(tmp_path):
+    """Test 56: The API validates since as a YYYY-MM-DD date or a {source: date} object"""
+    import urllib.error
+    import urllib.request
+    from api_server import BadRequest, SearchApiServer, parse_search
+    assert parse_search({"term": "x", "since": "2024-01-31"})["since"] == "2024-01-31"
+    assert parse_search({"term": "x", "since": {"PubMed": "2024-01-31"}})["since"] == {"PubMed": "2024-01-31"}
+    for since in (20240131, "2024-13-01", "last week", ["2024-01-31"], {"Scopus": "2024-01-31"}, {"PubMed": 5}):
+        with pytest.raises(BadRequest):
+            parse_search({"term": "x", "since": since})
+    with SearchApiServer(UnifiedSearchManager(), port=0, warm=False) as api:
+        request = urllib.request.Request(api.url + "/search", json.dumps({"term": "x", "since": 2024}).encode())
+        with pytest.raises(urllib.error.HTTPError) as error:
+            urllib.request.urlopen(request)
+        assert error.value.code == 400
+        assert "since" in json.loads(error.value.read())["error"]
@@ -1,72 +1,155 @@
-import requests
-import concurrent.futures
+import contextlib
+import copy
 import datetime
-import csv
+import functools
+import os
 import re
+import threading
+import time
+import weakref
+from collections.abc import Mapping
 from ncbi_client import NCBIClient
+from circuit_breaker import CircuitBreaker
+from search_cache import query_key
+from identifiers import normalize_doi, normalize_pmid, normalize_pmcid
+from dedup import DedupEngine
+from ranking import BM25Ranker
+from records import Paper, as_paper
+from exporters import export_jsonl, export_parquet
+from metrics import SearchStats, source_scope, instrument_session
+from pagination import iter_offset_pages, iter_cursor_pages, PAGE_WORKERS
+from cancellation import CancelToken, SearchCancelled, cancel_scope, current_token, run_in_scope
+
+# OpenAlex accepts up to 50 values in one OR-filter
+ENRICH_BATCH_SIZE = 50
+ENRICH_NAMESPACE = "OpenAlex DOI"
 
 def get_current_year():
     return datetime.datetime.now().year
 
+def reconstruct_abstract(inverted_index):
+    """
+    Rebuild an OpenAlex abstract from its inverted index ({word: [positions]}).
+    Words are written straight into a list sized by the highest position, so the
+    cost is linear in the number of words (no sort).
+    """
+    if not inverted_index: return None
+    last = -1
+    for positions in inverted_index.values():
+        for pos in positions:
+            if pos > last: last = pos
+    if last < 0: return None
+    words = [None] * (last + 1)
+    for word, positions in inverted_index.items():
+        for pos in positions:
+            words[pos] = word
+    return " ".join([w for w in words if w is not None])
+
+def default_session():
+    # http_session pulls in requests; it is imported only once a client is built
+    from http_session import get_session
+    return get_session()
+
 # --- 1. PubMed Wrapper ---
 class PubMedWrapper:
-    def __init__(self):
-        self.client = NCBIClient()
+    # Records per efetch page on large pulls
+    PAGE_SIZE = NCBIClient.FETCH_BATCH_SIZE
+
+    def __init__(self, session=None, timeout=10, api_key=None):
+        # An NCBI API key raises the E-utilities limit from 3 to 10 requests/s
+        self.client = NCBIClient(api_key=api_key or os.environ.get("NCBI_API_KEY"), session=session, timeout=timeout)
+
+    @property
+    def timeout(self):
+        return self.client.timeout
+
+    @property
+    def session(self):
+        return self.client.session
+
+    @timeout.setter
+    def timeout(self, value):
+        self.client.timeout = value
     
-    def search(self, term, start_year=None, max_results=5, only_free=False):
-        try:
-            final_term = term
-            if start_year:
-                current_year = get_current_year()
-                final_term += f" AND {start_year}:{current_year}[dp]"
-            
-            if only_free:
-                final_term += " AND (free full text[Filter])"
+    def search(self, term, start_year=None, max_results=5, only_free=False, since=None):
+        if max_results > self.client.GET_ID_LIMIT:
+            # Large pulls go through the history server and paged efetch
+            return list(self.iter_search(term, start_year, max_results, only_free, since))
+        ids = self.client.search_pubmed(self._term(term, start_year, only_free, since), max_results)
+        return [self._decorate(item) for item in self.client.fetch_details(ids)]
 
-            ids = self.client.search_pubmed(final_term, max_results)
-            data = self.client.fetch_details(ids)
-            
-            for item in data:
-                item['source'] = "PubMed"
-                item['citations'] = 0 
-                item['pdf_url'] = "Check Link"
-                pmid = item.get('pmid')
-                item['url'] = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else "https://pubmed.ncbi.nlm.nih.gov/"
-            return data
-        except Exception as e:
-            print(f"PubMed Error: {e}")
-            return []
+    def iter_search(self, term, start_year=None, max_results=1000, only_free=False, since=None):
+        """Lazily page through up to max_results records (history server + retstart)."""
+        records = self.client.iter_search(self._term(term, start_year, only_free, since), max_records=max_results)
+        return (self._decorate(item) for item in records)
+
+    def _term(self, term, start_year, only_free, since):
+        final_term = term
+        if start_year:
+            current_year = get_current_year()
+            final_term += f" AND {start_year}:{current_year}[dp]"
+        if since:
+            # Entrez date: when the record was added to PubMed, so late-indexed papers are not missed
+            final_term += f' AND ("{since.replace("-", "/")}"[edat] : "3000"[edat])'
+        
+        if only_free:
+            final_term += " AND (free full text[Filter])"
+        return final_term
+
+    def _decorate(self, item):
+        item['source'] = "PubMed"
+        item['citations'] = 0 
+        item['pdf_url'] = "Check Link"
+        pmid = item.get('pmid')
+        item['url'] = f"https://pubmed.ncbi.nlm.nih.gov/{pmid}/" if pmid else "https://pubmed.ncbi.nlm.nih.gov/"
+        return item
 
 # --- 2. Semantic Scholar Client ---
 class SemanticScholarClient:
     BASE_URL = "https://api.semanticscholar.org/graph/v1/paper/search"
-    
-    def search(self, term, start_year=None, max_results=5, only_free=False):
+    PAGE_SIZE = 100
+    # Relevance search only serves the first 1000 hits (offset + limit < 1000)
+    MAX_RESULTS = 999
+
+    def __init__(self, session=None, timeout=10):
+        self.session = session or default_session()
+        self.timeout = timeout
+
+    def search(self, term, start_year=None, max_results=5, only_free=False, since=None):
+        return list(self.iter_search(term, start_year, max_results, only_free, since))
+
+    def iter_search(self, term, start_year=None, max_results=1000, only_free=False, since=None, workers=PAGE_WORKERS):
+        """Lazily page through up to max_results records (offset paging, pages fetched in parallel)."""
         params = {
             "query": term, 
-            "limit": max_results, 
             "fieldsOfStudy": "Biology,Medicine",
             "fields": "title,authors,year,abstract,journal,url,isOpenAccess,openAccessPdf,citationCount,externalIds"
         }
         if start_year:
             params["year"] = f"{start_year}-{get_current_year()}"
-        
-        try:
-            r = requests.get(self.BASE_URL, params=params, headers={"User-Agent": "Bot"}, timeout=10).json()
-            results = self._parse(r)
-            if only_free:
-                return [r for r in results if r['pdf_url'] != "N/A"]
-            return results
-        except: return []
+        if since:
+            params["publicationDateOrYear"] = f"{since}:"
+
+        def fetch_page(offset, size):
+            page_params = dict(params, offset=offset, limit=size)
+            response = self.session.get(self.BASE_URL, params=page_params, headers={"User-Agent": "Bot"}, timeout=self.timeout)
+            response.raise_for_status()
+            return self._parse(response.json())
+
+        results = iter_offset_pages(fetch_page, min(max_results, self.MAX_RESULTS), self.PAGE_SIZE, workers)
+        if only_free:
+            return (r for r in results if r['pdf_url'] != "N/A")
+        return results
 
     def _parse(self, data):
         res = []
         for p in data.get("data", []):
             auth = ", ".join([a["name"] for a in p.get("authors", [])[:3]])
             pdf_link = p.get("openAccessPdf", {}).get("url", "N/A") if p.get("openAccessPdf") else "N/A"
-            doi = p.get("externalIds", {}).get("DOI")
+            external_ids = p.get("externalIds") or {}
+            doi = external_ids.get("DOI")
 
-            res.append({
+            res.append(Paper.from_dict({
                 "title": p.get("title") or "Unknown Title", 
                 "journal": p.get("journal",{}).get("name","Semantic Scholar"), 
                 "year": str(p.get("year","")), 
@@ -76,25 +159,43 @@ class SemanticScholarClient:
                 "url": p.get("url", "N/A"),
                 "citations": p.get("citationCount", 0),
                 "pdf_url": pdf_link,
-                "doi": doi
-            })
+                "doi": doi,
+                "pmid": normalize_pmid(external_ids.get("PubMed")),
+                "pmcid": normalize_pmcid(external_ids.get("PubMedCentral"))
+            }))
         return res
 
 # --- 3. Europe PMC Client ---
 class EuropePmcClient:
     BASE_URL = "https://www.ebi.ac.uk/europepmc/webservices/rest/search"
-    
-    def search(self, term, start_year=None, max_results=5, only_free=False):
+    PAGE_SIZE = 1000
+
+    def __init__(self, session=None, timeout=10):
+        self.session = session or default_session()
+        self.timeout = timeout
+
+    def search(self, term, start_year=None, max_results=5, only_free=False, since=None):
+        return list(self.iter_search(term, start_year, max_results, only_free, since))
+
+    def iter_search(self, term, start_year=None, max_results=1000, only_free=False, since=None):
+        """Lazily page through up to max_results records by following cursorMark."""
         query = term
         if start_year:
             query += f" AND PUB_YEAR:[{start_year} TO {get_current_year()}]"
+        if since:
+            # First index date, so records added late with an older publication date still show up
+            query += f" AND FIRST_IDATE:[{since} TO {datetime.date.today().isoformat()}]"
         if only_free:
             query += " AND (OPEN_ACCESS:y)"
 
-        params = {"query": query, "format": "json", "pageSize": max_results}
-        try:
-            return self._parse(requests.get(self.BASE_URL, params=params, timeout=10).json())
-        except: return []
+        def fetch_page(cursor, size):
+            params = {"query": query, "format": "json", "pageSize": size, "cursorMark": cursor}
+            response = self.session.get(self.BASE_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            return self._parse(data), data.get("nextCursorMark")
+
+        return iter_cursor_pages(fetch_page, max_results, self.PAGE_SIZE)
 
     def _parse(self, data):
         res = []
@@ -111,7 +212,7 @@ class EuropePmcClient:
                         pdf = link.get("url")
                         break
 
-            res.append({
+            res.append(Paper.from_dict({
                 "title": i.get("title") or "Unknown Title", 
                 "journal": i.get("journalInfo",{}).get("journal",{}).get("title","EuropePMC"), 
                 "year": i.get("journalInfo",{}).get("yearOfPublication","N/A"), 
@@ -121,30 +222,50 @@ class EuropePmcClient:
                 "url": url,
                 "citations": cites,
                 "pdf_url": pdf,
-                "doi": doi
-            })
+                "doi": doi,
+                "pmid": normalize_pmid(i.get("pmid")),
+                "pmcid": normalize_pmcid(i.get("pmcid"))
+            }))
         return res
 
 # --- 4. OpenAlex Client ---
 class OpenAlexClient:
     BASE_URL = "https://api.openalex.org/works"
-    
-    def search(self, term, start_year=None, max_results=5, only_free=False):
-        try:
-            filters = "has_abstract:true,language:en,type:article"
-            if start_year:
-                filters += f",from_publication_date:{start_year}-01-01"
-            if only_free:
-                filters += ",is_oa:true"
+    PAGE_SIZE = 200
+
+    def __init__(self, session=None, timeout=10, lazy_abstracts=False):
+        self.session = session or default_session()
+        self.timeout = timeout
+        # Rebuild abstracts only when a record's abstract is first read
+        self.lazy_abstracts = lazy_abstracts
+
+    def search(self, term, start_year=None, max_results=5, only_free=False, since=None):
+        return list(self.iter_search(term, start_year, max_results, only_free, since))
 
+    def iter_search(self, term, start_year=None, max_results=1000, only_free=False, since=None):
+        """Lazily page through up to max_results records by following the cursor (cursor=*)."""
+        filters = "has_abstract:true,language:en,type:article"
+        # from_created_date needs a premium key, so refreshes filter on the publication date
+        from_date = max(since or "", f"{start_year}-01-01" if start_year else "")
+        if from_date:
+            filters += f",from_publication_date:{from_date}"
+        if only_free:
+            filters += ",is_oa:true"
+
+        def fetch_page(cursor, size):
             params = {
                 "search": term, 
-                "per-page": max_results, 
+                "per-page": size, 
                 "filter": filters,
-                "sort": "cited_by_count:desc"
+                "sort": "cited_by_count:desc",
+                "cursor": cursor
             }
-            return self._parse(requests.get(self.BASE_URL, params=params, timeout=10).json())
-        except: return []
+            response = self.session.get(self.BASE_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            data = response.json()
+            return self._parse(data), (data.get("meta") or {}).get("next_cursor")
+
+        return iter_cursor_pages(fetch_page, max_results, self.PAGE_SIZE)
 
     def _parse(self, data):
         res = []
@@ -153,9 +274,8 @@ class OpenAlexClient:
             
             abs_idx = i.get("abstract_inverted_index")
             abstract = "Abstract Available at Source."
-            if abs_idx:
-                word_list = sorted([(pos, w) for w, positions in abs_idx.items() for pos in positions])
-                abstract = " ".join([w[1] for w in word_list])
+            if abs_idx and not self.lazy_abstracts:
+                abstract = self._abstract(abs_idx)
             
             url = i.get("ids", {}).get("openalex", i.get("id"))
             doi = i.get("doi")
@@ -164,7 +284,7 @@ class OpenAlexClient:
             citations = i.get("cited_by_count", 0)
             pdf_url = i.get("open_access", {}).get("oa_url", "N/A")
 
-            res.append({
+            paper = Paper.from_dict({
                 "title": i.get("display_name") or "Unknown Title", 
                 "journal": i.get("primary_location",{}).get("source",{}).get("display_name","OpenAlex"),
                 "year": str(i.get("publication_year","")), 
@@ -174,22 +294,45 @@ class OpenAlexClient:
                 "url": url,
                 "citations": citations,
                 "pdf_url": pdf_url,
-                "doi": doi
+                "doi": doi,
+                "pmid": normalize_pmid(i.get("ids", {}).get("pmid")),
+                "pmcid": normalize_pmcid(i.get("ids", {}).get("pmcid"))
             })
+            if abs_idx and self.lazy_abstracts:
+                paper.defer("abstract", self._abstract, abs_idx)
+            res.append(paper)
         return res
 
+    @staticmethod
+    def _abstract(abs_idx):
+        return reconstruct_abstract(abs_idx) or "Abstract Available at Source."
+
 # --- 5. PLOS Client ---
 class PlosClient:
     BASE_URL = "http://api.plos.org/search"
-    def search(self, term, start_year=None, max_results=5, only_free=False):
-        try:
-            q = f'title:"{term}" OR abstract:"{term}"'
-            if start_year:
-                 q += f' AND publication_date:[{start_year}-01-01T00:00:00Z TO *]'
-            
-            r = requests.get(self.BASE_URL, params={"q": q, "wt":"json", "rows":max_results, "fl":"id,title,journal,author_display,abstract,publication_date,score"}, timeout=10).json()
-            return self._parse(r)
-        except: return []
+    PAGE_SIZE = 100
+
+    def __init__(self, session=None, timeout=10):
+        self.session = session or default_session()
+        self.timeout = timeout
+
+    def search(self, term, start_year=None, max_results=5, only_free=False, since=None):
+        return list(self.iter_search(term, start_year, max_results, only_free, since))
+
+    def iter_search(self, term, start_year=None, max_results=1000, only_free=False, since=None, workers=PAGE_WORKERS):
+        """Lazily page through up to max_results records (start offset, pages fetched in parallel)."""
+        q = f'title:"{term}" OR abstract:"{term}"'
+        from_date = max(since or "", f"{start_year}-01-01" if start_year else "")
+        if from_date:
+             q += f' AND publication_date:[{from_date}T00:00:00Z TO *]'
+
+        def fetch_page(offset, size):
+            params = {"q": q, "wt": "json", "start": offset, "rows": size, "fl": "id,title,journal,author_display,abstract,publication_date,score"}
+            response = self.session.get(self.BASE_URL, params=params, timeout=self.timeout)
+            response.raise_for_status()
+            return self._parse(response.json())
+
+        return iter_offset_pages(fetch_page, max_results, self.PAGE_SIZE, workers)
     
     def _parse(self, data):
         res = []
@@ -199,7 +342,7 @@ class PlosClient:
             authors_list = d.get("author_display", []) or d.get("auth_display", [])
             authors_str = ", ".join(authors_list) if isinstance(authors_list, list) else str(authors_list)
 
-            res.append({
+            res.append(Paper.from_dict({
                 "title": d.get("title") or "Unknown Title", 
                 "journal": d.get("journal","PLOS"), 
                 "year": d.get("publication_date","")[:4], 
@@ -210,19 +353,120 @@ class PlosClient:
                 "citations": 0, 
                 "pdf_url": url,
                 "doi": doi
-            })
+            }))
         return res
 
+class SourceUnavailable(Exception):
+    """Raised by search_source when a source's circuit breaker is open."""
+
+class SearchResults(list):
+    """
+    List of result dicts returned by search_all, plus a `meta` dict describing how
+    each source fared: meta["sources"][name] = {"status", "count", "elapsed", "reason", "hedged"}.
+    Status is one of ok, cached, local, error, timeout, deadline, skipped.
+    `stats` is a metrics.SearchStats with per-stage and per-source timings (final results only).
+    """
+    def __init__(self, items=(), meta=None, stats=None):
+        super().__init__(items)
+        self.meta = meta if meta is not None else {"sources": {}}
+        self.stats = stats
+
+# Source name -> client class, in display order (no client is built at import time)
+SOURCE_CLIENTS = {
+    "PubMed": PubMedWrapper,
+    "Semantic Scholar": SemanticScholarClient,
+    "Europe PMC": EuropePmcClient,
+    "OpenAlex": OpenAlexClient,
+    "PLOS": PlosClient,
+}
+SOURCE_NAMES = tuple(SOURCE_CLIENTS)
+
+
+class LazyClients(Mapping):
+    """
+    Read-only name -> client mapping that builds each client on first access. Keys are
+    known up front, so listing the sources costs nothing; the first search (or warm_up)
+    pays for the HTTP stack.
+    """
+    def __init__(self, factories, on_create=None):
+        self._factories = factories
+        self._on_create = on_create
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    def __getitem__(self, name):
+        client = self._clients.get(name)
+        if client is None:
+            factory = self._factories[name]
+            with self._lock:
+                client = self._clients.get(name)
+                if client is None:
+                    client = factory()
+                    if self._on_create is not None:
+                        self._on_create(client)
+                    self._clients[name] = client
+        return client
+
+    def __iter__(self):
+        return iter(self._factories)
+
+    def __len__(self):
+        return len(self._factories)
+
+    def built(self):
+        """Names of the clients constructed so far."""
+        return list(self._clients)
+
 # --- MAIN MANAGER ---
 class UnifiedSearchManager:
-    def __init__(self):
-        self.clients = {
-            "PubMed": PubMedWrapper(),
-            "Semantic Scholar": SemanticScholarClient(),
-            "Europe PMC": EuropePmcClient(),
-            "OpenAlex": OpenAlexClient(),
-            "PLOS": PlosClient()
-        }
+    # Worker threads shared by every search issued through this manager
+    MAX_WORKERS = 16
+    # Concurrent in-flight requests per source host on the async path
+    MAX_PER_HOST = 4
+    # Seconds the whole fan-out may take before outstanding sources are abandoned
+    SEARCH_DEADLINE = 15.0
+    # Per-source latency budgets in seconds (also the clients' HTTP timeout)
+    SOURCE_BUDGETS = {
+        "PubMed": 10.0,
+        "Semantic Scholar": 8.0,
+        "Europe PMC": 8.0,
+        "OpenAlex": 8.0,
+        "PLOS": 8.0
+    }
+    # With hedging on, a duplicate request is sent once this fraction of the budget has passed
+    HEDGE_AFTER = 0.5
+    # How often a waiting search_iter looks at its cancel token
+    CANCEL_POLL = 0.1
+    # remote: always query the sources; local_first: answer sources already covered for this
+    # query from the local index; offline: answer everything from the local index
+    MODES = ("remote", "local_first", "offline")
+
+    def __init__(self, cache=None, session=None, hedge=False, local_index=None, mode="remote", api_key=None):
+        # Optional result cache (search_cache.SQLiteCache / MemoryCache), keyed per source
+        self.cache = cache
+        # Optional local_index.LocalIndex; every fetched record is stored in it
+        self.local_index = local_index
+        if mode not in self.MODES:
+            raise ValueError(f"unknown mode: {mode}")
+        self.mode = mode
+        self.hedge = hedge
+        self.search_deadline = self.SEARCH_DEADLINE
+        self.source_budgets = dict(self.SOURCE_BUDGETS)
+        budgets = self.source_budgets
+        # Clients are built on first use; per-search HTTP timings and byte counts are
+        # hooked into each client's session as it is created (no-op outside a search)
+        factories = {name: functools.partial(cls, session, timeout=budgets[name]) for name, cls in SOURCE_CLIENTS.items()}
+        # NCBI API key for PubMed (default: the NCBI_API_KEY environment variable)
+        factories["PubMed"] = functools.partial(factories["PubMed"], api_key=api_key)
+        self.clients = LazyClients(factories, on_create=lambda client: instrument_session(client.session))
+        self.breakers = {name: CircuitBreaker() for name in self.clients}
+        # Set to a *.prom or *.json path to dump each search's stats (see metrics.SearchStats)
+        self.metrics_path = None
+        # BM25 relevance; pass source_bonus= to change the per-source bonus
+        self.ranker = BM25Ranker()
+        self._executor = None
+        self._executor_lock = threading.Lock()
+        self._host_limits = weakref.WeakKeyDictionary()
         
         self.priority_order = [
             "PubMed", 
@@ -242,116 +486,598 @@ class UnifiedSearchManager:
             return match.group(0) if match else "N/A"
 
     def calculate_score(self, paper, query):
-        score = 0
+        """Score a single paper; search results are ranked together with rank_results."""
         if not query: return 0
-        
-        query_terms = query.lower().split()
-        title_lower = (paper.get('title') or '').lower()
-        abstract_lower = (paper.get('abstract') or '').lower()
-
-        for term in query_terms:
-            if term in title_lower:
-                score += 100
-            elif term in abstract_lower:
-                score += 10
-        
-        # Bonus for high quality sources to keep them at top
-        source = paper.get('source', '')
-        if source == "PubMed":
-            score += 5000
-        elif source == "Europe PMC":
-            score += 2000
-            
-        return score
+        return self.ranker.score([paper], query)[0]
+
+    def rank_results(self, papers, query):
+        """Set relevance_score on every paper using BM25 over the whole result set."""
+        scores = self.ranker.score(papers, query)
+        for paper, score in zip(papers, scores):
+            paper['relevance_score'] = score
+        return papers
+
+    def warm_up(self):
+        """Build every client now (imports the HTTP stack), e.g. from a background thread at startup."""
+        for name in self.clients:
+            self.clients[name]
+
+    def _get_executor(self):
+        import concurrent.futures
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = concurrent.futures.ThreadPoolExecutor(
+                        max_workers=self.MAX_WORKERS, thread_name_prefix="search")
+        return self._executor
+
+    def close(self):
+        """Shut down the shared worker pool."""
+        with self._executor_lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
 
-    def search_all(self, term, active_sources=None, limit_per_source=5, start_year=None, only_free=False):
+    def _resolve_mode(self, mode):
+        mode = mode or self.mode
+        if mode not in self.MODES:
+            raise ValueError(f"unknown mode: {mode}")
+        if mode != "remote" and self.local_index is None:
+            raise ValueError(f"mode '{mode}' needs a local_index")
+        return mode
+
+    def _split_cached(self, term, active_sources, limit_per_source, start_year, only_free, meta, mode="remote", since=None, stats=None):
+        cached_results = []
+        pending = []
+        for name in active_sources:
+            if name not in self.clients: continue
+            # Offline never reaches the network, not even for incremental (since) refreshes
+            local_only = mode == "offline"
+            if not local_only and self._since_for(since, name) is not None:
+                # Incremental refreshes always go to the source; their partial answers are not cached
+                if self.breakers[name].allow():
+                    pending.append(name)
+                else:
+                    meta["sources"][name] = {"status": "skipped", "count": 0, "elapsed": 0.0,
+                                             "reason": self.breakers[name].skip_reason()}
+                continue
+            if local_only or (mode == "local_first" and self._is_covered(name, term, start_year, limit_per_source, only_free)):
+                local = self._search_local(name, term, start_year, limit_per_source, only_free)
+                cached_results.extend(local)
+                meta["sources"][name] = {"status": "local", "count": len(local), "elapsed": 0.0}
+                continue
+            cached = self._get_cached(name, term, start_year, limit_per_source, only_free, stats)
+            if cached is not None:
+                cached_results.extend(cached)
+                meta["sources"][name] = {"status": "cached", "count": len(cached), "elapsed": 0.0}
+            elif not self.breakers[name].allow():
+                meta["sources"][name] = {"status": "skipped", "count": 0, "elapsed": 0.0,
+                                         "reason": self.breakers[name].skip_reason()}
+            else:
+                pending.append(name)
+        return cached_results, pending
+
+    def _since_for(self, since, name):
+        # since is one "YYYY-MM-DD" date for every source or a {source: date} dict
+        return since.get(name) if isinstance(since, dict) else since
+
+    def _call_source(self, name, term, start_year, limit_per_source, only_free, since=None, stats=None):
+        # since is only passed when set, so clients without date filters keep working
+        with source_scope(stats, name):
+            if since:
+                data = self.clients[name].search(term, start_year, limit_per_source, only_free, since=since)
+            else:
+                data = self.clients[name].search(term, start_year, limit_per_source, only_free)
+        return [as_paper(item) for item in data]
+
+    def _pages(self, name, limit_per_source):
+        # Read from the class so budgets never force a client to be built
+        page_size = getattr(SOURCE_CLIENTS.get(name), "PAGE_SIZE", None)
+        return max(1, -(-limit_per_source // page_size)) if page_size else 1
+
+    def _budget(self, name, limit_per_source=1):
+        # Budgets are per page, so deep pulls get one budget for every page they need
+        return self.source_budgets.get(name, self.search_deadline) * self._pages(name, limit_per_source)
+
+    def _deadline(self, deadline, sources, limit_per_source):
+        if deadline is not None:
+            return deadline
+        return self.search_deadline * max([self._pages(n, limit_per_source) for n in sources] or [1])
+
+    def _record_source(self, meta, name, status, elapsed, count=0, reason=None, hedged=False):
+        entry = {"status": status, "count": count, "elapsed": round(elapsed, 3), "hedged": hedged}
+        if reason:
+            entry["reason"] = reason
+        meta["sources"][name] = entry
+        if status == "ok":
+            self.breakers[name].record_success()
+        elif status in ("error", "timeout"):
+            self.breakers[name].record_failure(reason)
+        else:
+            # Being cut by the global deadline is not held against the source, but a
+            # half-open trial cut that way must not keep the breaker waiting forever
+            self.breakers[name].release_trial()
+
+    def search_source(self, name, term, start_year=None, limit_per_source=5, only_free=False):
+        """
+        Query one source through the cache and its circuit breaker (used by batch mode).
+        Unlike search_all, failures raise so the caller can retry later.
+        """
+        if start_year is None:
+            start_year = get_current_year() - 10
+        cached = self._get_cached(name, term, start_year, limit_per_source, only_free)
+        if cached is not None:
+            return cached
+        breaker = self.breakers[name]
+        if not breaker.allow():
+            raise SourceUnavailable(f"{name}: {breaker.skip_reason()}")
+        try:
+            data = self._call_source(name, term, start_year, limit_per_source, only_free)
+        except SearchCancelled:
+            breaker.release_trial()
+            raise
+        except Exception as e:
+            breaker.record_failure(str(e) or type(e).__name__)
+            raise
+        breaker.record_success()
+        self._store_cached(name, term, start_year, limit_per_source, only_free, data)
+        self._store_local(name, term, start_year, limit_per_source, only_free, data)
+        return data
+
+    def search_all(self, term, active_sources=None, limit_per_source=5, start_year=None, only_free=False, on_update=None, deadline=None, mode=None, since=None, cancel=None):
+        """
+        Run all sources and return the final ranked SearchResults. If on_update is given it
+        is called with every intermediate snapshot from search_iter (and the final list).
+        mode overrides the manager's mode (remote / local_first / offline) for this call.
+        since ("YYYY-MM-DD", or a dict per source) asks the sources only for records added
+        or published from that date on; see watch.py.
+        cancel is a cancellation.CancelToken; once cancelled the search stops sending
+        requests and raises SearchCancelled.
+        """
+        results = SearchResults()
+        for snapshot in self.search_iter(term, active_sources, limit_per_source, start_year, only_free, deadline, mode, since, cancel):
+            results = snapshot
+            if on_update:
+                on_update(snapshot)
+        return results
+
+    def search_iter(self, term, active_sources=None, limit_per_source=5, start_year=None, only_free=False, deadline=None, mode=None, since=None, cancel=None):
+        """
+        Yield merged, deduplicated and scored snapshots as each source completes.
+        Intermediate snapshots are copies and are not enriched; the last one yielded
+        is the enriched final result, identical to what search_all returns.
+        Sources slower than their budget (or the overall deadline) are abandoned and
+        reported in the result's meta instead of holding up the search.
+        Without an explicit cancel token the one bound by cancel_scope() (if any) is used.
+        """
+        import concurrent.futures
         if active_sources is None: active_sources = self.clients.keys()
+        mode = self._resolve_mode(mode)
+        token = cancel if cancel is not None else current_token()
+        if token is not None:
+            token.raise_if_cancelled()
         
         if start_year is None:
             start_year = get_current_year() - 10
 
-        all_results = []
-        with concurrent.futures.ThreadPoolExecutor(max_workers=5) as executor:
-            future_to_source = {}
-            for name in active_sources:
-                if name in self.clients:
-                    future_to_source[executor.submit(self.clients[name].search, term, start_year, limit_per_source, only_free)] = name
+        meta = {"sources": {}}
+        stats = SearchStats()
+        started = time.monotonic()
+        deadline_at = started + self._deadline(deadline, active_sources, limit_per_source)
+        all_results, pending = self._split_cached(term, active_sources, limit_per_source, start_year, only_free, meta, mode, since, stats)
+
+        prefetched = {}
+        # Sources still waiting for an answer; if the search ends early (cancelled, or the
+        # caller stops iterating) their half-open circuit breaker trials are handed back
+        open_sources = set(pending)
+        try:
+            if pending:
+                if all_results:
+                    yield self._snapshot(term, all_results, meta)
+
+                executor = self._get_executor()
+
+                def submit(func, *args):
+                    # Worker threads run under this search's cancel token
+                    return executor.submit(run_in_scope, token, func, *args)
+
+                args = (term, start_year, limit_per_source, only_free)
+                calls = {}
+                hedged = set()
+                for name in pending:
+                    calls[submit(self._call_source, name, *args, self._since_for(since, name), stats)] = name
             
-            for future in concurrent.futures.as_completed(future_to_source):
-                try:
-                    data = future.result()
+                # Enrichment lookups start as soon as a source returns, overlapping slower sources
+                lookups = []
+                while open_sources:
+                    now = time.monotonic()
+                    wake_at = [deadline_at] + [started + self._budget(n, limit_per_source) for n in open_sources]
+                    if self.hedge:
+                        wake_at += [started + self._budget(n, limit_per_source) * self.HEDGE_AFTER for n in open_sources if n not in hedged]
+                    if token is not None:
+                        wake_at.append(now + self.CANCEL_POLL)
+                    done, _ = concurrent.futures.wait(
+                        [f for f, n in calls.items() if n in open_sources],
+                        timeout=max(0.0, min(wake_at) - now),
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                    if token is not None and token.cancelled:
+                        # Drop queued calls; running ones stop at their next request or page
+                        for future in list(calls) + lookups:
+                            future.cancel()
+                        raise SearchCancelled()
+
+                    new_data = False
+                    for future in done:
+                        name = calls.pop(future)
+                        if name not in open_sources: continue
+                        elapsed = time.monotonic() - started
+                        try:
+                            data = future.result()
+                        except Exception as e:
+                            if name in calls.values():
+                                continue  # the hedged twin may still succeed
+                            if self.hedge and name not in hedged and time.monotonic() < deadline_at:
+                                hedged.add(name)
+                                calls[submit(self._call_source, name, *args, self._since_for(since, name), stats)] = name
+                                continue
+                            open_sources.discard(name)
+                            self._record_source(meta, name, "error", elapsed, reason=str(e) or type(e).__name__, hedged=name in hedged)
+                            continue
+                        open_sources.discard(name)
+                        self._record_source(meta, name, "ok", elapsed, count=len(data), hedged=name in hedged)
+                        self._store_cached(name, term, start_year, limit_per_source, only_free, data, self._since_for(since, name))
+                        self._store_local(name, term, start_year, limit_per_source, only_free, data, self._since_for(since, name))
+                        all_results.extend(data)
+                        new_data = new_data or bool(data)
+                        dois = self._enrichment_dois(data)
+                        if dois:
+                            lookups.append(submit(self._lookup_dois, dois, stats))
+
+                    now = time.monotonic()
+                    for name in list(open_sources):
+                        budget = self._budget(name, limit_per_source)
+                        if now >= deadline_at or now >= started + budget:
+                            status = "deadline" if now >= deadline_at and now < started + budget else "timeout"
+                            reason = f"no response within {min(budget, deadline_at - started):.1f}s"
+                            open_sources.discard(name)
+                            self._record_source(meta, name, status, now - started, reason=reason, hedged=name in hedged)
+                            for future in [f for f, n in calls.items() if n == name]:
+                                future.cancel()
+                                del calls[future]
+                        elif self.hedge and name not in hedged and now >= started + budget * self.HEDGE_AFTER:
+                            hedged.add(name)
+                            calls[submit(self._call_source, name, *args, self._since_for(since, name), stats)] = name
+
+                    if open_sources and new_data:
+                        yield self._snapshot(term, all_results, meta)
+
+                done, _ = concurrent.futures.wait(lookups, timeout=max(0.0, deadline_at - time.monotonic()))
+                for future in done:
+                    try:
+                        prefetched.update(future.result())
+                    except Exception: pass
+        except BaseException:
+            for name in open_sources:
+                self.breakers[name].release_trial()
+            raise
+
+        meta["elapsed"] = round(time.monotonic() - started, 3)
+        stats.add_stage("fanout", time.monotonic() - started)
+        # Answers served entirely from the local index never touch the network
+        fetch_missing = time.monotonic() < deadline_at and (bool(pending) or mode == "remote")
+        with cancel_scope(token):
+            if token is not None:
+                token.raise_if_cancelled()
+            results = self._finalize(term, all_results, prefetched, meta=meta, fetch_missing=fetch_missing, stats=stats)
+        stats.add_stage("total", time.monotonic() - started)
+        self._dump_stats(stats)
+        yield results
+
+    async def search_all_async(self, term, active_sources=None, limit_per_source=5, start_year=None, only_free=False, on_update=None, deadline=None, mode=None, since=None, cancel=None):
+        """
+        Asyncio variant of search_all, with the same arguments. Source calls run on the
+        manager's shared worker pool over the pooled keep-alive session, limited to
+        MAX_PER_HOST in-flight requests per source host. Every worker call runs under the
+        search's cancel token; cancelling the awaiting task cancels that token too, so the
+        worker threads stop at their next request or page.
+        """
+        import asyncio
+        if active_sources is None: active_sources = list(self.clients.keys())
+        mode = self._resolve_mode(mode)
+        token = cancel if cancel is not None else current_token()
+        if token is None:
+            token = CancelToken()
+        token.raise_if_cancelled()
+
+        if start_year is None:
+            start_year = get_current_year() - 10
+
+        loop = asyncio.get_running_loop()
+        executor = self._get_executor()
+        meta = {"sources": {}}
+        stats = SearchStats()
+        started = time.monotonic()
+        deadline = self._deadline(deadline, active_sources, limit_per_source)
+        all_results, pending = self._split_cached(term, active_sources, limit_per_source, start_year, only_free, meta, mode, since, stats)
+
+        def run(func, *args):
+            # Worker threads run under this search's cancel token
+            return loop.run_in_executor(executor, run_in_scope, token, func, *args)
+
+        async def call_source(name):
+            async with self._host_limit(loop, name):
+                return await run(self._call_source, name, term, start_year, limit_per_source, only_free,
+                                 self._since_for(since, name), stats)
+
+        async def run_source(name):
+            budget = self._budget(name, limit_per_source)
+            state = {"hedged": False}
+            try:
+                data = await asyncio.wait_for(self._hedged_call(call_source, name, budget, state), timeout=budget)
+            except SearchCancelled:
+                raise
+            except asyncio.TimeoutError:
+                self._record_source(meta, name, "timeout", time.monotonic() - started,
+                                    reason=f"no response within {budget:.1f}s", hedged=state["hedged"])
+                return []
+            except Exception as e:
+                self._record_source(meta, name, "error", time.monotonic() - started,
+                                    reason=str(e) or type(e).__name__, hedged=state["hedged"])
+                return []
+            self._record_source(meta, name, "ok", time.monotonic() - started, count=len(data), hedged=state["hedged"])
+            self._store_cached(name, term, start_year, limit_per_source, only_free, data, self._since_for(since, name))
+            await run(self._store_local, name, term, start_year, limit_per_source, only_free, data, self._since_for(since, name))
+            return data
+
+        tasks = [asyncio.ensure_future(run_source(name)) for name in pending]
+        lookups = []
+        try:
+            try:
+                for completed, next_done in enumerate(asyncio.as_completed(tasks, timeout=deadline), 1):
+                    data = await next_done
+                    token.raise_if_cancelled()
                     all_results.extend(data)
-                except Exception: pass
+                    dois = self._enrichment_dois(data)
+                    if dois:
+                        lookups.append(run(self._lookup_dois, dois, stats))
+                    if on_update and data and completed < len(tasks):
+                        on_update(await run(self._snapshot, term, all_results, meta))
+            except asyncio.TimeoutError:
+                for name, task in zip(pending, tasks):
+                    if not task.done():
+                        task.cancel()
+                        self._record_source(meta, name, "deadline", time.monotonic() - started,
+                                            reason=f"no response within {deadline:.1f}s")
+
+            prefetched = {}
+            for found in await asyncio.gather(*lookups, return_exceptions=True):
+                if isinstance(found, dict):
+                    prefetched.update(found)
+        except BaseException:
+            # Cancelled (task or token) or failed: stop the worker threads too
+            token.cancel()
+            for name, task in zip(pending, tasks):
+                if not task.done():
+                    self.breakers[name].release_trial()
+            for task in tasks + lookups:
+                task.cancel()
+            raise
+
+        meta["elapsed"] = round(time.monotonic() - started, 3)
+        stats.add_stage("fanout", time.monotonic() - started)
+        fetch_missing = bool(pending) or mode == "remote"
+        results = await run(lambda: self._finalize(term, all_results, prefetched, meta=meta, fetch_missing=fetch_missing, stats=stats))
+        stats.add_stage("total", time.monotonic() - started)
+        self._dump_stats(stats)
+        if on_update:
+            on_update(results)
+        return results
+
+    async def _hedged_call(self, call_source, name, budget, state):
+        import asyncio
+        if not self.hedge:
+            return await call_source(name)
+        first = asyncio.ensure_future(call_source(name))
+        done, _ = await asyncio.wait({first}, timeout=budget * self.HEDGE_AFTER)
+        if done and first.exception() is None:
+            return first.result()
+        state["hedged"] = True
+        attempts = {first, asyncio.ensure_future(call_source(name))}
+        try:
+            last_error = None
+            while attempts:
+                done, attempts = await asyncio.wait(attempts, return_when=asyncio.FIRST_COMPLETED)
+                for attempt in done:
+                    if attempt.exception() is None:
+                        return attempt.result()
+                    last_error = attempt.exception()
+            raise last_error
+        finally:
+            for attempt in attempts:
+                attempt.cancel()
+
+    def _host_limit(self, loop, name):
+        # Semaphores belong to one event loop, so they are kept per loop
+        import asyncio
+        limits = self._host_limits.setdefault(loop, {})
+        if name not in limits:
+            limits[name] = asyncio.Semaphore(self.MAX_PER_HOST)
+        return limits[name]
+
+    def _snapshot(self, term, all_results, meta):
+        # Work on copies so the caller can render while later sources keep arriving
+        return self._finalize(term, [item.copy() for item in all_results], meta=copy.deepcopy(meta), enrich=False)
 
-        merged = self._merge_and_deduplicate(all_results)
-        enriched = self._enrich_missing_data(merged)
+    def _finalize(self, term, all_results, prefetched=None, meta=None, enrich=True, fetch_missing=True, stats=None):
+        # Snapshots are not timed; only the final pass gets a stats object
+        timer = stats.stage if stats is not None else (lambda name: contextlib.nullcontext())
+        with timer("merge"):
+            merged = self._merge_and_deduplicate(all_results)
+        with timer("enrich"):
+            enriched = self._enrich_missing_data(merged, prefetched, fetch_missing, stats) if enrich else merged
         
         # --- Scoring & Sorting ---
-        for paper in enriched:
-            paper['year'] = self._extract_year(paper.get('year'))
-            paper['relevance_score'] = self.calculate_score(paper, term)
-            cites = paper.get('citations')
-            if not isinstance(cites, int):
-                paper['citations'] = 0
+        with timer("score"):
+            self.rank_results(enriched, term)
+            for paper in enriched:
+                paper['year'] = self._extract_year(paper.get('year'))
+                cites = paper.get('citations')
+                if not isinstance(cites, int):
+                    paper['citations'] = 0
 
         # Sort: Relevance DESC, then Citations DESC
-        enriched.sort(key=lambda x: (-x['relevance_score'], -x['citations']))
-        
-        return enriched
+        with timer("sort"):
+            enriched.sort(key=lambda x: (-x['relevance_score'], -x['citations']))
+
+        if stats is not None:
+            for name, info in (meta or {}).get("sources", {}).items():
+                stats.set_source(name, status=info["status"], count=info["count"])
+        return SearchResults(enriched, meta, stats)
+
+    def _dump_stats(self, stats):
+        if not self.metrics_path: return
+        try:
+            stats.write(self.metrics_path)
+        except Exception as e:
+            print(f"Metrics Error: {e}")
+
+    def _get_cached(self, name, term, start_year, limit, only_free, stats=None):
+        if self.cache is None: return None
+        try:
+            cached = self.cache.get(name, query_key(term, start_year, limit, only_free))
+            if stats is not None:
+                stats.cache_hit(cached is not None)
+            return None if cached is None else [as_paper(item) for item in cached]
+        except Exception as e:
+            print(f"Cache Error: {e}")
+            return None
+
+    def _store_cached(self, name, term, start_year, limit, only_free, data, since=None):
+        # Empty lists usually mean a swallowed network error, so they are not cached
+        if self.cache is None or not data or since: return
+        try:
+            self.cache.set(name, query_key(term, start_year, limit, only_free), data)
+        except Exception as e:
+            print(f"Cache Error: {e}")
+
+    def _is_covered(self, name, term, start_year, limit, only_free):
+        try:
+            return self.local_index.covered(term, name, start_year, only_free, limit)
+        except Exception as e:
+            print(f"Local Index Error: {e}")
+            return False
+
+    def _search_local(self, name, term, start_year, limit, only_free):
+        try:
+            return [as_paper(item) for item in self.local_index.search(term, [name], start_year, only_free, limit)]
+        except Exception as e:
+            print(f"Local Index Error: {e}")
+            return []
+
+    def _store_local(self, name, term, start_year, limit, only_free, data, since=None):
+        # Same rule as the cache: an empty answer does not count as coverage
+        if self.local_index is None or not data: return
+        try:
+            # A date-filtered delta is indexed but does not mark the query as covered
+            self.local_index.add(data, name, None if since else term, start_year, only_free, limit)
+        except Exception as e:
+            print(f"Local Index Error: {e}")
 
     def _merge_and_deduplicate(self, all_items):
-        def get_priority(item):
-            src = item.get('source', '')
-            if src in self.priority_order:
-                return self.priority_order.index(src)
-            return 99
-        
-        all_items.sort(key=get_priority)
-        final_list = []
-        seen_titles = set()
-        
-        def normalize(text): 
-            return "".join(e for e in str(text) if e.isalnum()).lower()
+        # Identifier-first + near-duplicate title matching; duplicates are merged, not dropped
+        return DedupEngine(self.priority_order).merge(all_items)
 
-        for item in all_items:
-            title = item.get('title', '')
-            norm_title = normalize(title)
-            if not norm_title: continue
-            
-            if norm_title not in seen_titles:
-                seen_titles.add(norm_title)
-                final_list.append(item)
-        return final_list
+    def _needs_enrichment(self, item):
+        abstract_text = item.get('abstract') or ""
+        return len(abstract_text) < 50 or item.get('citations') == 0
+
+    def _enrichment_dois(self, items):
+        dois = []
+        for item in items:
+            doi = normalize_doi(item.get('doi'))
+            if doi and self._needs_enrichment(item):
+                dois.append(doi)
+        return dois
+
+    def _fetch_doi_batch(self, dois):
+        """One OpenAlex request for up to ENRICH_BATCH_SIZE DOIs via the multi-value filter."""
+        params = {
+            "filter": "doi:" + "|".join(dois),
+            "per-page": len(dois),
+            "select": "doi,abstract_inverted_index,cited_by_count,open_access"
+        }
+        r = self.clients["OpenAlex"].session.get(OpenAlexClient.BASE_URL, params=params, timeout=10)
+        r.raise_for_status()
+        found = {}
+        for work in r.json().get("results", []):
+            doi = normalize_doi(work.get("doi"))
+            if not doi: continue
+            found[doi] = {
+                "abstract": reconstruct_abstract(work.get("abstract_inverted_index")),
+                "citations": work.get("cited_by_count", 0),
+                "oa_url": (work.get("open_access") or {}).get("oa_url")
+            }
+        return found
+
+    def _lookup_dois(self, dois, stats=None):
+        """Resolve DOI -> OpenAlex metadata, using the persistent cache and batched requests."""
+        metadata = {}
+        missing = []
+        for doi in dict.fromkeys(dois):
+            cached = self.cache.get(ENRICH_NAMESPACE, doi) if self.cache is not None else None
+            if stats is not None and self.cache is not None:
+                stats.cache_hit(cached is not None)
+            if cached is not None:
+                metadata[doi] = cached
+            else:
+                missing.append(doi)
+
+        # Batches run one after another: lookups already run as tasks on the manager's pool
+        with source_scope(stats, ENRICH_NAMESPACE):
+            for i in range(0, len(missing), ENRICH_BATCH_SIZE):
+                batch = missing[i:i + ENRICH_BATCH_SIZE]
+                try:
+                    found = self._fetch_doi_batch(batch)
+                except SearchCancelled:
+                    raise
+                except Exception as e:
+                    print(f"Enrichment Error: {e}")
+                    continue
+                for doi in batch:
+                    # Unknown DOIs are cached as {} so they are not looked up again
+                    meta = found.get(doi, {})
+                    metadata[doi] = meta
+                    if self.cache is not None:
+                        self.cache.set(ENRICH_NAMESPACE, doi, meta)
+        return metadata
+
+    def _enrich_missing_data(self, results, prefetched=None, fetch_missing=True, stats=None):
+        metadata = dict(prefetched or {})
+        remaining = [doi for doi in self._enrichment_dois(results) if doi not in metadata]
+        if remaining and fetch_missing:
+            metadata.update(self._lookup_dois(remaining, stats))
 
-    def _enrich_missing_data(self, results):
         for item in results:
-            doi = item.get('doi')
+            doi = normalize_doi(item.get('doi'))
+            data = metadata.get(doi) if doi else None
+            if not data: continue
+
             abstract_text = item.get('abstract') or ""
             needs_abstract = len(abstract_text) < 50
             needs_citations = item.get('citations') == 0
-            
-            if (needs_abstract or needs_citations) and doi:
-                try:
-                    clean_doi = doi.replace("https://doi.org/", "")
-                    url = f"https://api.openalex.org/works/https://doi.org/{clean_doi}"
-                    r = requests.get(url, timeout=3)
-                    if r.status_code == 200:
-                        data = r.json()
-                        if needs_abstract:
-                            abs_idx = data.get("abstract_inverted_index")
-                            if abs_idx:
-                                word_list = sorted([(pos, w) for w, positions in abs_idx.items() for pos in positions])
-                                new_abstract = " ".join([w[1] for w in word_list])
-                                item['abstract'] = new_abstract + " [Enriched]"
-                        if item.get('pdf_url') == "N/A":
-                             item['pdf_url'] = data.get("open_access", {}).get("oa_url", "N/A")
-                        if needs_citations:
-                             item['citations'] = data.get("cited_by_count", 0)
-                except Exception: pass
+            if not (needs_abstract or needs_citations): continue
+
+            if needs_abstract and data.get("abstract"):
+                item['abstract'] = data["abstract"] + " [Enriched]"
+            if item.get('pdf_url') == "N/A":
+                item['pdf_url'] = data.get("oa_url") or "N/A"
+            if needs_citations:
+                item['citations'] = data.get("citations", 0)
         return results
 
     def save_to_csv(self, data, filename):
-        keys = ["source", "title", "citations", "relevance_score", "year", "journal", "authors", "url", "pdf_url", "abstract"]
+        import csv
+        keys = ["source", "title", "citations", "relevance_score", "year", "journal", "authors", "url", "pdf_url", "abstract", "doi"]
         try:
             with open(filename, 'w', newline='', encoding='utf-8-sig') as f:
                 writer = csv.DictWriter(f, fieldnames=keys)
@@ -364,6 +1090,24 @@ class UnifiedSearchManager:
             print(f"CSV Error: {e}")
             return False
 
+    def save_to_jsonl(self, data, filename):
+        """Stream results (any iterable) to JSON Lines, keeping ints and lists typed"""
+        try:
+            export_jsonl(data, filename)
+            return True
+        except Exception as e:
+            print(f"JSONL Error: {e}")
+            return False
+
+    def save_to_parquet(self, data, filename):
+        """Stream results to a typed, compressed Parquet file (needs pyarrow)"""
+        try:
+            export_parquet(data, filename)
+            return True
+        except Exception as e:
+            print(f"Parquet Error: {e}")
+            return False
+
     def save_to_text(self, data, filename):
         """Save results as a readable text file"""
         try:
@@ -0,0 +1,209 @@
+"""
+Saved "watch" queries that refresh incrementally.
+
+A watch stores a query (term, sources, start year, free-only, limit), the merged result
+set found so far and, per source, a high-water mark: the date of the last successful
+fetch. The first refresh pulls the full window; later refreshes pass `since` to the
+sources so they return only records indexed (PubMed, Europe PMC) or published
+(Semantic Scholar, OpenAlex, PLOS) from that date on, minus a few days of overlap for
+late indexing. Deltas are merged into the stored set and the new papers are reported.
+
+Usage:
+    python watch.py add phage "phage therapy" --sources PubMed "Europe PMC" --limit 50
+    python watch.py refresh phage
+    python watch.py list
+"""
+import argparse
+import datetime
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from dedup import DedupEngine, normalize_title
+from identifiers import normalize_doi, normalize_pmid, normalize_pmcid
+from records import as_paper, json_default
+
+DEFAULT_WATCH_PATH = os.path.join(os.path.expanduser("~"), ".science_fetcher", "watch.db")
+# Days re-requested before each high-water mark, for records indexed after their date
+OVERLAP_DAYS = 7
+
+
+def identities(item):
+    """Keys under which a record is considered the same paper across refreshes."""
+    keys = []
+    for field, normalize in (("doi", normalize_doi), ("pmid", normalize_pmid), ("pmcid", normalize_pmcid)):
+        value = normalize(item.get(field))
+        if value:
+            keys.append((field, value))
+    title = normalize_title(item.get('title'))
+    if title:
+        keys.append(("title", title))
+    return keys
+
+
+class WatchStore:
+    def __init__(self, path=None, overlap_days=OVERLAP_DAYS):
+        self.path = path or DEFAULT_WATCH_PATH
+        self.overlap_days = overlap_days
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS watches ("
+                " name TEXT PRIMARY KEY, term TEXT NOT NULL, sources TEXT, start_year INTEGER,"
+                " only_free INTEGER, max_results INTEGER, created_at REAL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS marks ("
+                " name TEXT, source TEXT, high_water TEXT, PRIMARY KEY (name, source))"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS papers ("
+                " name TEXT, position INTEGER, data TEXT NOT NULL, first_seen TEXT, PRIMARY KEY (name, position))"
+            )
+
+    def add(self, name, term, sources=None, start_year=None, only_free=False, max_results=20):
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO watches (name, term, sources, start_year, only_free, max_results, created_at)"
+                " VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (name, term, json.dumps(list(sources)) if sources else None, start_year,
+                 int(bool(only_free)), max_results, time.time()))
+
+    def get(self, name):
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT name, term, sources, start_year, only_free, max_results FROM watches WHERE name = ?",
+                (name,)).fetchone()
+        if row is None:
+            raise KeyError(f"no watch named '{name}'")
+        return {"name": row[0], "term": row[1], "sources": json.loads(row[2]) if row[2] else None,
+                "start_year": row[3], "only_free": bool(row[4]), "max_results": row[5]}
+
+    def names(self):
+        with self._lock:
+            return [r[0] for r in self._conn.execute("SELECT name FROM watches ORDER BY name")]
+
+    def remove(self, name):
+        with self._lock, self._conn:
+            for table in ("watches", "marks", "papers"):
+                self._conn.execute(f"DELETE FROM {table} WHERE name = ?", (name,))
+
+    def high_water(self, name):
+        """{source: "YYYY-MM-DD"} of the last successful fetch per source."""
+        with self._lock:
+            return dict(self._conn.execute("SELECT source, high_water FROM marks WHERE name = ?", (name,)))
+
+    def papers(self, name):
+        with self._lock:
+            rows = self._conn.execute("SELECT data FROM papers WHERE name = ? ORDER BY position", (name,)).fetchall()
+        return [as_paper(json.loads(r[0])) for r in rows]
+
+    def _save(self, name, papers, marks):
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM papers WHERE name = ?", (name,))
+            self._conn.executemany(
+                "INSERT INTO papers (name, position, data, first_seen) VALUES (?, ?, ?, ?)",
+                [(name, i, json.dumps(p, default=json_default), p.get('first_seen')) for i, p in enumerate(papers)])
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO marks (name, source, high_water) VALUES (?, ?, ?)",
+                [(name, source, mark) for source, mark in marks.items()])
+
+    def since_dates(self, name):
+        """Per-source `since` dates for the next refresh (sources never fetched are absent)."""
+        since = {}
+        for source, mark in self.high_water(name).items():
+            date = datetime.date.fromisoformat(mark) - datetime.timedelta(days=self.overlap_days)
+            since[source] = date.isoformat()
+        return since
+
+    def refresh(self, manager, name):
+        """
+        Fetch what is new for a watch, merge it into the stored set and return
+        {"new": [...], "papers": [...all, ranked...], "meta": {...}, "since": {...}}.
+        """
+        watch = self.get(name)
+        today = datetime.date.today().isoformat()
+        since = self.since_dates(name)
+        results = manager.search_all(watch["term"], watch["sources"], watch["max_results"],
+                                     watch["start_year"], watch["only_free"], since=since or None)
+
+        papers = self.papers(name)
+        seen = {}
+        for paper in papers:
+            for key in identities(paper):
+                seen.setdefault(key, paper)
+
+        engine = DedupEngine(manager.priority_order)
+        new = []
+        for item in results:
+            match = next((seen[k] for k in identities(item) if k in seen), None)
+            if match is not None:
+                # Already known: keep the stored record, refresh its citations/abstract/links
+                engine.merge_into(match, item)
+                continue
+            item['first_seen'] = today
+            papers.append(item)
+            new.append(item)
+            for key in identities(item):
+                seen.setdefault(key, item)
+
+        manager.rank_results(papers, watch["term"])
+        papers.sort(key=lambda x: (-x['relevance_score'], -(x.get('citations') or 0)))
+
+        # Only sources that answered move their high-water mark forward
+        marks = {source: today for source, info in results.meta.get("sources", {}).items()
+                 if info.get("status") == "ok"}
+        self._save(name, papers, marks)
+        return {"new": new, "papers": papers, "meta": results.meta, "since": since}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def main(argv=None):
+    from unified_client import UnifiedSearchManager
+
+    parser = argparse.ArgumentParser(description="Saved literature queries with incremental refresh.")
+    sub = parser.add_subparsers(dest="command", required=True)
+    add = sub.add_parser("add", help="Save a watch query")
+    add.add_argument("name")
+    add.add_argument("term")
+    add.add_argument("--sources", nargs="+", help="Sources to query (default: all)")
+    add.add_argument("--limit", type=int, default=20, help="Results per source per refresh")
+    add.add_argument("--start-year", type=int, help="Earliest publication year (default: 10 years back)")
+    add.add_argument("--free-only", action="store_true", help="Only free full text")
+    refresh = sub.add_parser("refresh", help="Fetch new papers for a watch")
+    refresh.add_argument("name")
+    sub.add_parser("list", help="List saved watches")
+    parser.add_argument("--db", help="Watch database (default: ~/.science_fetcher/watch.db)")
+    args = parser.parse_args(argv)
+
+    store = WatchStore(args.db)
+    if args.command == "add":
+        store.add(args.name, args.term, args.sources, args.start_year, args.free_only, args.limit)
+        print(f"Saved watch '{args.name}'.")
+    elif args.command == "list":
+        for name in store.names():
+            watch = store.get(name)
+            marks = ", ".join(f"{s}: {d}" for s, d in sorted(store.high_water(name).items())) or "never refreshed"
+            print(f"{name}: '{watch['term']}' ({marks})")
+    else:
+        report = store.refresh(UnifiedSearchManager(), args.name)
+        print(f"{len(report['new'])} new of {len(report['papers'])} papers for '{args.name}'.")
+        for paper in report["new"]:
+            print(f"  + [{paper.get('source')}] {paper.get('title')} ({paper.get('year')})")
+        failed = [f"{n}: {i['status']}" for n, i in report["meta"].get("sources", {}).items() if i["status"] != "ok"]
+        if failed:
+            print(f"Not refreshed - {', '.join(failed)}")
+    store.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())